@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from pathlib import Path
+from time import perf_counter
+
+from aoc import runner
+from aoc import reader
+
+
+#
+# Solve one day against lots of input files (one per user, say) in one process, or one pool of processes, rather than
+# starting Python once per file.  Each worker imports the solver once, so its compiled patterns and lookup tables are
+# reused for every file it's given, and each file is parsed once for all the parts asked for.  Results are written to
+# stdout as JSON lines, one per file/part, in the order of the files ...
+#
+#   {"day": 7, "part": 1, "input": "inputs/alice.txt", "answer": 255048101, "parse_time": 0.004, "solve_time": 0.012}
+#
+# A file that fails gets an "error" rather than an "answer" and the rest carry on.
+#
+
+#
+# The input files named by a source: a directory (every file in it), a glob pattern, a file, or '-' for a manifest of
+# file names on stdin, one per line
+#
+def expand_source(source, stdin = sys.stdin):
+  if source == '-':
+    return [line.strip() for line in stdin if line.strip()]
+  path = Path(source)
+  if path.is_dir():
+    return sorted(str(child) for child in path.iterdir() if child.is_file() and not child.name.startswith('.'))
+  if path.exists():
+    return [source]
+  return sorted(glob(source, recursive = True))
+
+
+def input_files(sources, stdin = sys.stdin):
+  files = []
+  for source in sources:
+    files.extend(expand_source(source, stdin))
+  return files
+
+
+#
+# Runs in the workers.  Parse the file once and solve each part from that.
+#
+def solve_file(day, parts, file_name):
+  try:
+    module, _ = runner.load_solver(day)
+    start = perf_counter()
+    parsed = module.parse(reader.read(file_name))
+    parse_time = perf_counter() - start
+  except Exception as e:
+    return [{ 'day' : day, 'part' : part, 'input' : file_name, 'error' : f'{type(e).__name__}: {e}' } for part in parts]
+  results = []
+  for part in parts:
+    result = { 'day' : day, 'part' : part, 'input' : file_name }
+    try:
+      start = perf_counter()
+      result['answer'] = module.solve_parsed(part, parsed)
+      result['parse_time'] = parse_time
+      result['solve_time'] = perf_counter() - start
+    except Exception as e:
+      result['error'] = f'{type(e).__name__}: {e}'
+    results.append(result)
+  return results
+
+
+#
+# Yield the results for each file, in file order, as soon as they (and those for the files before them) are ready.  The
+# files are handed to the workers in chunks so that small inputs don't cost a round trip each.
+#
+def solve_files(day, parts, files, num_workers = 1):
+  if num_workers <= 1 or len(files) <= 1:
+    for file_name in files:
+      yield from solve_file(day, parts, file_name)
+    return
+  chunk_size = max(1, min(64, len(files) // (num_workers * 4)))
+  with ProcessPoolExecutor(max_workers = num_workers) as executor:
+    for results in executor.map(solve_file, [day] * len(files), [parts] * len(files), files, chunksize = chunk_size):
+      yield from results
+
+
+def parse_args(args):
+  parser = argparse.ArgumentParser(description = 'Solve one day against many input files, writing JSON lines.')
+  parser.add_argument('day', type = int)
+  parser.add_argument('sources', nargs = '+', metavar = 'SOURCE',
+                      help = "an input file, a directory of them, a glob pattern, or '-' for a list of files on stdin")
+  parser.add_argument('--parts', type = runner.parse_days, default = [1, 2], help = "'1', '2' or '1,2' (default)")
+  parser.add_argument('--jobs', type = int, default = os.cpu_count() or 1,
+                      help = 'number of worker processes, 1 to do everything in this process (default: CPU count)')
+  parser.add_argument('-o', '--output', help = 'write the JSON lines to this file rather than stdout')
+  return parser.parse_args(args)
+
+
+def main(args = None):
+  args = parse_args(args)
+  files = input_files(args.sources)
+  output = open(args.output, 'w') if args.output else sys.stdout
+  errors = 0
+  try:
+    for result in solve_files(args.day, args.parts, files, args.jobs):
+      errors += 'error' in result
+      output.write(json.dumps(result, default = str) + '\n')
+      output.flush()
+  finally:
+    if args.output:
+      output.close()
+  return 1 if errors else 0
+
+
+if __name__ == '__main__':
+  exit(main())
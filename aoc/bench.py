@@ -0,0 +1,461 @@
+import sys
+import json
+import argparse
+import subprocess
+from math import log
+from statistics import median
+from time import perf_counter, process_time
+
+from aoc import runner
+from aoc import generate
+from aoc import cache
+from aoc import instrument
+
+
+#
+# The input files we benchmark against in each day directory, in the order we report them
+#
+DEFAULT_INPUTS = ['input.txt', 'test-input*.txt']
+
+
+def input_files(day, patterns):
+  files = []
+  for pattern in patterns:
+    for path in sorted((runner.ROOT / f'day{day}').glob(pattern)):
+      if path.name not in files:
+        files.append(path.name)
+  return files
+
+
+def job_key(day, part, file_name):
+  return f'day{day}/{part if isinstance(part, str) else f"part{part}"}/{file_name}'
+
+
+#
+# What measure() times.  'solve' is the solver itself, 'cache' is the solver through aoc.cache (so after the warmup
+# runs it's the time to fetch a cached answer), and 'parse' is just the parse() of a day that has one, through the cache
+# if that's on too.
+#
+def measured_fn(module, part, mode):
+  if mode == 'parse':
+    if not cache.has_parse(module):
+      raise ValueError(f'{module.__name__} has no parse()')
+    if cache.enabled:
+      return lambda data: cache.parse(module, data)[0]
+    return module.parse
+  if mode == 'cache':
+    return lambda data: cache.solve(module, part, data)[0]
+  return lambda data: module.solve(part, data)
+
+
+#
+# For --both, parse once and solve both parts from that, timing the three separately.  The wall and cpu times are for
+# the whole thing.
+#
+def measure_both(module, data, warmup, repeat):
+  timings = { 'parse' : [], 'part1' : [], 'part2' : [], 'wall' : [], 'cpu' : [] }
+  for n in range(warmup + repeat):
+    wall_start, cpu_start = perf_counter(), process_time()
+    parsed = module.parse(data)
+    parse_end = perf_counter()
+    answer1 = module.solve_parsed(1, parsed)
+    part1_end = perf_counter()
+    answer2 = module.solve_parsed(2, parsed)
+    if n < warmup:
+      continue
+    timings['part2'].append(perf_counter() - part1_end)
+    timings['part1'].append(part1_end - parse_end)
+    timings['parse'].append(parse_end - wall_start)
+    timings['wall'].append(perf_counter() - wall_start)
+    timings['cpu'].append(process_time() - cpu_start)
+  result = { name : median(times) for name, times in timings.items() }
+  result.update({ 'answer' : [answer1, answer2], 'wall_min' : min(timings['wall']) })
+  return result
+
+
+#
+# Runs in a child process so that each solver gets its own peak RSS.  Import the solver, do the warmup runs and then the
+# timed runs, and print a JSON record to stdout for the parent to pick up.  With memory there's one more run after
+# those, under tracemalloc, for the peak traced memory and the top allocation sites (see instrument.trace_memory).
+#
+def measure(day, part, file_name, warmup, repeat, mode = 'solve', memory = False):
+  import resource
+  module, import_time = runner.load_solver(day)
+  data = runner.read_input(day, file_name)
+  if mode == 'both':
+    result = measure_both(module, data, warmup, repeat)
+    result.update({ 'import_time' : import_time, 'rss_kb' : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss })
+    if memory:
+      both = lambda: [module.solve_parsed(part, parsed) for parsed in [module.parse(data)] for part in (1, 2)]
+      result.update(instrument.trace_memory(both)[1])
+    return result
+  fn = measured_fn(module, part, mode)
+  for _ in range(warmup):
+    fn(data)
+  wall_times = []
+  cpu_times = []
+  for _ in range(repeat):
+    wall_start, cpu_start = perf_counter(), process_time()
+    answer = fn(data)
+    wall_times.append(perf_counter() - wall_start)
+    cpu_times.append(process_time() - cpu_start)
+  if mode == 'parse':
+    answer = None  # Parsed inputs can be big and needn't be JSON, we only want the time
+  result = {
+    'answer' : answer,
+    'import_time' : import_time,
+    'wall' : median(wall_times),
+    'wall_min' : min(wall_times),
+    'cpu' : median(cpu_times),
+    'rss_kb' : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  }
+  if memory:
+    result.update(instrument.trace_memory(fn, data)[1])
+  return result
+
+
+def run_child(day, part, file_name, warmup, repeat, timeout, mode = 'solve', memory = False):
+  args = [sys.executable, '-m', 'aoc.bench', '--measure', f'{day}:{part}:{file_name}',
+          '--warmup', str(warmup), '--repeat', str(repeat), '--mode', mode] + (['--memory'] if memory else [])
+  try:
+    completed = subprocess.run(args, capture_output = True, text = True, timeout = timeout, cwd = runner.ROOT)
+  except subprocess.TimeoutExpired:
+    return { 'error' : f'timeout after {timeout}s' }
+  if completed.returncode != 0:
+    lines = completed.stderr.strip().splitlines()
+    return { 'error' : lines[-1] if lines else f'exit code {completed.returncode}' }
+  return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+#
+# Cold start.  Time a fresh interpreter that does nothing but import a day's solver (or nothing at all, for day None)
+# and take its -X importtime report, which gives what each module's import cost itself and with what it imported ...
+#
+#   import time: self [us] | cumulative | imported package
+#   import time:       309 |        309 |   day7
+#
+def parse_importtime(report):
+  times = {}
+  for line in report.splitlines():
+    if not line.startswith('import time:'):
+      continue
+    self_us, cumulative_us, name = line[len('import time:'):].split('|')
+    if self_us.strip().isdigit():
+      times[name.strip()] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+  return times
+
+
+def time_startup(day):
+  code = f'import day{day}.day{day}' if day else 'pass'
+  start = perf_counter()
+  completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output = True, text = True,
+                             cwd = runner.ROOT)
+  wall = perf_counter() - start
+  if completed.returncode != 0:
+    raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+  return wall, parse_importtime(completed.stderr)
+
+
+#
+# The median wall time of repeat cold starts of each day, and how much longer that is than starting a bare interpreter.
+# import_time is what the day's own imports cost, i.e. the modules that the bare interpreter doesn't import anyway, and
+# heaviest lists the worst of those by their own time.
+#
+# The first start of anything is slower (the interpreter and the modules aren't in the page cache yet, and a day's
+# bytecode may need writing), so each day gets a start that we throw away first.  Then the bare and day starts take
+# turns, so that both see the machine in the same state, and overhead is the difference of their medians.  If that
+# comes out negative the day is within the noise of a bare start, so we record 0 and set noisy rather than report an
+# impossible saving.
+#
+def run_startup(days, repeat, progress = None):
+  if sys.flags.dont_write_bytecode:
+    print('PYTHONDONTWRITEBYTECODE is set, so stale bytecode is compiled on every start', file = sys.stderr)
+  _, bare_imports = time_startup(None)
+  results = {}
+  for day in days:
+    result = { 'day' : day, 'part' : 'startup', 'input' : '-', 'answer' : None }
+    try:
+      time_startup(day)
+      bare_walls, walls, imports = [], [], []
+      for _ in range(repeat):
+        bare_walls.append(time_startup(None)[0])
+        wall, times = time_startup(day)
+        walls.append(wall)
+        imports.append(times)
+    except RuntimeError as e:
+      result['error'] = str(e)
+    else:
+      extra = [{ name : t for name, t in times.items() if name not in bare_imports } for times in imports]
+      import_times = [sum(self_time for self_time, _ in times.values()) for times in extra]
+      heaviest = sorted(extra[-1].items(), key = lambda item: item[1][0], reverse = True)[:3]
+      overhead = median(walls) - median(bare_walls)
+      result.update({
+        'wall' : median(walls),
+        'wall_min' : min(walls),
+        'bare_wall' : median(bare_walls),
+        'overhead' : max(0.0, overhead),
+        'noisy' : overhead < 0,
+        'import_time' : median(import_times),
+        'modules' : len(extra[-1]),
+        'heaviest' : [[name, self_time] for name, (self_time, _) in heaviest]
+      })
+    results[job_key(day, 'startup', '-')] = result
+    if progress: progress(result)
+  return results
+
+
+def run_benchmarks(jobs, warmup, repeat, timeout, progress = None, mode = 'solve', memory = False):
+  results = {}
+  for day, part, file_name in jobs:
+    result = run_child(day, part, file_name, warmup, repeat, timeout, mode, memory)
+    result.update({ 'day' : day, 'part' : part, 'input' : file_name })
+    results[job_key(day, part, file_name)] = result
+    if progress: progress(result)
+  return results
+
+
+#
+# Compare results against a baseline.  A measurement regresses if it's more than threshold (a fraction) worse than the
+# baseline and also worse by more than an absolute floor, so we don't flag noise on sub-millisecond solvers.  A changed
+# answer is always flagged.  A metric only one of them measured, e.g. peak_bytes when only one was run with --memory,
+# isn't compared.
+#
+METRICS = { 'wall' : 0.005, 'cpu' : 0.005, 'rss_kb' : 1024, 'parse' : 0.005, 'part1' : 0.005, 'part2' : 0.005,
+            'import_time' : 0.002, 'peak_bytes' : 1024 * 1024 }
+
+def find_regressions(results, baseline, threshold):
+  regressions = []
+  for key, result in results.items():
+    if key not in baseline or 'error' in result or 'error' in baseline[key]:
+      continue
+    base = baseline[key]
+    if result['answer'] != base['answer']:
+      regressions.append((key, 'answer', base['answer'], result['answer']))
+    for metric, floor in METRICS.items():
+      if metric not in base or metric not in result:
+        continue
+      old, new = base[metric], result[metric]
+      if new > old * (1 + threshold) and new - old > floor:
+        regressions.append((key, metric, old, new))
+  return regressions
+
+
+def format_metric(metric, value):
+  if metric == 'rss_kb':
+    return f'{value / 1024:.1f}MB'
+  if metric == 'peak_bytes':
+    return runner.format_bytes(value)
+  if metric == 'answer':
+    return str(value)
+  return runner.format_time(value)
+
+
+def print_result(result):
+  key = job_key(result['day'], result['part'], result['input'])
+  if 'error' in result:
+    print(f"{key:<44} error: {result['error']}")
+    return
+  if result['part'] == 'startup':
+    heaviest = ', '.join(f'{name} {runner.format_time(self_time)}' for name, self_time in result['heaviest'])
+    print(f"{key:<44} wall {runner.format_time(result['wall']):>9}"
+          f"  over bare {runner.format_time(result['overhead']):>9}{'~' if result.get('noisy') else ' '}"
+          f"  imports {runner.format_time(result['import_time']):>9} ({result['modules']})  {heaviest}")
+    return
+  answer = str(result['answer'])
+  wall = runner.format_time(result['wall'])
+  cpu = runner.format_time(result['cpu'])
+  rss = format_metric('rss_kb', result['rss_kb'])
+  line = f'{key:<44} {answer:<20} wall {wall:>9}  cpu {cpu:>9}  rss {rss:>8}'
+  if 'parse' in result:
+    line += ''.join(f'  {name} {runner.format_time(result[name]):>9}' for name in ('parse', 'part1', 'part2'))
+  if 'peak_bytes' in result:
+    line += f"  peak {runner.format_bytes(result['peak_bytes']):>8}"
+  print(line)
+
+
+def print_regressions(regressions, threshold):
+  if not regressions:
+    print(f'No regressions (threshold {threshold:.0%})')
+    return
+  print(f'{len(regressions)} regression(s) (threshold {threshold:.0%}):')
+  for key, metric, old, new in regressions:
+    print(f'  {key:<44} {metric:<7} {format_metric(metric, old)} -> {format_metric(metric, new)}')
+
+
+#
+# For a scaling sweep, generate (or reuse) an input for each day at each scale and benchmark those instead of the
+# files in the day directories
+#
+def parse_scales(s):
+  return [float(x) for x in s.split(',')]
+
+
+def scaling_jobs(days, parts, scales, seed):
+  jobs = []
+  for day in days:
+    for scale in scales:
+      file_name = generate.generated_input(day, scale, seed)
+      jobs += [(day, part, file_name) for part in parts]
+  return jobs
+
+
+#
+# The slope of the least squares fit of log(time) against log(scale), i.e. the k in time ~ scale^k.  Roughly 1 means
+# linear, 2 quadratic and so on.  Returns None if there aren't at least two successful timings.
+#
+def scaling_exponent(points):
+  points = [(log(scale), log(time)) for scale, time in points if time > 0]
+  if len(points) < 2:
+    return None
+  mean_x = sum(x for x, _ in points) / len(points)
+  mean_y = sum(y for _, y in points) / len(points)
+  numerator = sum((x - mean_x) * (y - mean_y) for x, y in points)
+  denominator = sum((x - mean_x) ** 2 for x, _ in points)
+  return numerator / denominator if denominator else None
+
+
+#
+# Collect the wall times from a sweep by day/part as a list of (scale, time) points
+#
+def scaling_series(results, scales, seed):
+  series = {}
+  for result in results.values():
+    if 'error' in result:
+      continue
+    for scale in scales:
+      if result['input'] == generate.generated_file_name(scale, seed):
+        series.setdefault((result['day'], result['part']), []).append((scale, result['wall']))
+  return series
+
+
+def print_scaling(results, scales, seed):
+  series = scaling_series(results, scales, seed)
+  header = ''.join(f"{f'x{scale:g}':>11}" for scale in scales)
+  print(f"{'':<12}{header}{'exponent':>10}")
+  for day, part in sorted(series):
+    times = dict(series[(day, part)])
+    row = ''.join(f'{runner.format_time(times[scale]) if scale in times else "-":>11}' for scale in scales)
+    exponent = scaling_exponent(series[(day, part)])
+    exponent = f'{exponent:.2f}' if exponent is not None else '-'
+    print(f'{f"day{day}/part{part}":<12}{row}{exponent:>10}')
+
+
+def plot_scaling(path, results, scales, seed):
+  try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+  except ImportError:
+    print(f'matplotlib is not installed, not writing {path}')
+    return
+  series = scaling_series(results, scales, seed)
+  figure, axes = plt.subplots()
+  for day, part in sorted(series):
+    points = sorted(series[(day, part)])
+    point_scales, point_times = zip(*points)
+    axes.plot(point_scales, point_times, marker = 'o', label = f'day{day}/part{part}')
+  axes.set_xscale('log')
+  axes.set_yscale('log')
+  axes.set_xlabel('input scale')
+  axes.set_ylabel('wall time (s)')
+  axes.legend(fontsize = 'small', ncol = 2)
+  figure.savefig(path)
+
+
+def load_baseline(path):
+  with open(path, 'r') as file:
+    return json.load(file)['results']
+
+
+def save_baseline(path, results, warmup, repeat):
+  with open(path, 'w') as file:
+    json.dump({ 'warmup' : warmup, 'repeat' : repeat, 'results' : results }, file, indent = 2, sort_keys = True)
+
+
+def parse_args(args):
+  parser = argparse.ArgumentParser(description = 'Benchmark solvers and check for regressions against a baseline.')
+  parser.add_argument('--days', type = runner.parse_days, default = None, help = "e.g. '1,3,5-7' (default: all)")
+  parser.add_argument('--parts', type = runner.parse_days, default = [1, 2], help = "'1', '2' or '1,2' (default)")
+  parser.add_argument('--inputs', default = ','.join(DEFAULT_INPUTS),
+                      help = 'comma separated file name patterns within each day directory')
+  parser.add_argument('--warmup', type = int, default = 1, help = 'untimed runs before measuring (default 1)')
+  parser.add_argument('--repeat', type = int, default = 3, help = 'timed runs, we report the median (default 3)')
+  parser.add_argument('--timeout', type = float, default = 600, help = 'seconds allowed per solver (default 600)')
+  parser.add_argument('--save', metavar = 'FILE', help = 'write the results as a JSON baseline')
+  parser.add_argument('--compare', metavar = 'FILE', help = 'flag regressions against a JSON baseline')
+  parser.add_argument('--threshold', type = float, default = 0.10,
+                      help = 'fractional slowdown that counts as a regression (default 0.10)')
+  parser.add_argument('--scales', type = parse_scales, default = None,
+                      help = "benchmark generated inputs at these scales instead, e.g. '1,10,100'")
+  parser.add_argument('--seed', type = int, default = 0, help = 'seed for generated inputs (default 0)')
+  parser.add_argument('--plot', metavar = 'FILE', help = 'with --scales, plot time against scale (needs matplotlib)')
+  parser.add_argument('--cache', action = 'store_true',
+                      help = 'run the solvers through aoc.cache, so the timed runs fetch cached answers')
+  parser.add_argument('--both', action = 'store_true',
+                      help = 'parse each input once and solve both parts from it, timing the parse and parts '
+                             'separately')
+  parser.add_argument('--parse-only', action = 'store_true',
+                      help = 'only time parse() for the days that have one (through the cache with --cache)')
+  parser.add_argument('--memory', action = 'store_true',
+                      help = 'also record the tracemalloc peak and top allocation sites, from one extra untimed run')
+  parser.add_argument('--startup', action = 'store_true',
+                      help = 'time a cold start of each day (importing it) with -X importtime, rather than solving')
+  parser.add_argument('--measure', help = argparse.SUPPRESS)
+  parser.add_argument('--mode', default = 'solve', help = argparse.SUPPRESS)
+  return parser.parse_args(args)
+
+
+def main(args = None):
+  args = parse_args(args)
+
+  if args.measure:
+    day, part, file_name = args.measure.split(':', 2)
+    part = int(part) if part.isdigit() else part
+    print(json.dumps(measure(int(day), part, file_name, args.warmup, args.repeat, args.mode, args.memory)))
+    return 0
+
+  if args.startup:
+    days = args.days if args.days else runner.available_days()
+    results = run_startup(days, args.repeat, progress = print_result)
+    return finish(args, results)
+
+  if args.cache:
+    cache.set_enabled(True)
+  mode = 'both' if args.both else 'parse' if args.parse_only else 'cache' if args.cache else 'solve'
+  days = args.days if args.days else runner.available_days()
+  if args.parse_only:
+    # parse() doesn't depend on the part
+    days = [day for day in days if cache.has_parse(runner.load_solver(day)[0])]
+    args.parts = args.parts[:1]
+  if args.both:
+    args.parts = ['both']
+  if args.scales:
+    jobs = scaling_jobs(days, args.parts, args.scales, args.seed)
+  else:
+    patterns = args.inputs.split(',')
+    jobs = [(day, part, file_name) for day in days for file_name in input_files(day, patterns) for part in args.parts]
+  results = run_benchmarks(jobs, args.warmup, args.repeat, args.timeout, progress = print_result, mode = mode,
+                           memory = args.memory)
+
+  if args.scales:
+    print()
+    print_scaling(results, args.scales, args.seed)
+    if args.plot:
+      plot_scaling(args.plot, results, args.scales, args.seed)
+
+  return finish(args, results)
+
+
+def finish(args, results):
+  if args.save:
+    save_baseline(args.save, results, args.warmup, args.repeat)
+  if args.compare:
+    regressions = find_regressions(results, load_baseline(args.compare), args.threshold)
+    print_regressions(regressions, args.threshold)
+    if regressions:
+      return 1
+  return 0
+
+
+if __name__ == '__main__':
+  exit(main())
@@ -0,0 +1,206 @@
+import os
+import sys
+import zlib
+import pickle
+import hashlib
+import argparse
+from pathlib import Path
+from types import ModuleType
+
+
+#
+# An on disk cache of answers and, for days that opt in, parsed inputs.  Entries are content addressed: the key is a
+# hash of the solver's version (a hash of its source and of the aoc modules it uses), the part and a hash of the input,
+# so editing a solver or its input just means its old entries stop being used.  Nothing needs invalidating by hand.
+#
+# A day opts in to caching its parsed input by having both of ...
+#
+#   parse(data)                -> anything picklable, e.g. the settled bricks in day22
+#   solve_parsed(part, parsed) -> the answer, without changing parsed
+#
+# Entries are pickled and zlib compressed, one file each.  Reading an entry touches its file, and after writing one we
+# delete the least recently used entries until the whole cache is under max_bytes.
+#
+# It's off by default.  The runner and the benchmark go through solve() here when given --cache.
+#
+ROOT = Path(__file__).resolve().parent.parent
+
+enabled = bool(os.environ.get('AOC_CACHE'))
+cache_dir = Path(os.environ.get('AOC_CACHE_DIR', ROOT / '.cache'))
+max_bytes = int(os.environ.get('AOC_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+SUFFIX = '.pickle.z'
+
+versions = {}
+
+
+def set_enabled(on, directory = None):
+  global enabled, cache_dir
+  enabled = on
+  # Worker processes started after this pick the settings up from the environment
+  os.environ['AOC_CACHE'] = '1' if on else ''
+  if directory:
+    cache_dir = Path(directory)
+    os.environ['AOC_CACHE_DIR'] = str(cache_dir)
+
+
+#
+# The aoc modules a module uses, whether it imported the module (from aoc import reader) or something from it (from
+# aoc.grid import Grid)
+#
+def aoc_imports(module):
+  for value in vars(module).values():
+    name = value.__name__ if isinstance(value, ModuleType) else getattr(value, '__module__', None)
+    if isinstance(name, str) and name.startswith('aoc.') and name in sys.modules:
+      yield sys.modules[name]
+
+
+#
+# The source files a solver's answers depend on: its own and those of the aoc modules it uses, and the ones they use in
+# turn (e.g. reader uses iters), all the way down
+#
+def source_files(module):
+  files = { module.__file__ }
+  stack = [module]
+  while stack:
+    for imported in aoc_imports(stack.pop()):
+      if imported.__file__ not in files:
+        files.add(imported.__file__)
+        stack.append(imported)
+  return sorted(files)
+
+
+def solver_version(module):
+  if module.__name__ not in versions:
+    digest = hashlib.sha256(module.__name__.encode())
+    for file_name in source_files(module):
+      digest.update(Path(file_name).read_bytes())
+    versions[module.__name__] = digest.hexdigest()
+  return versions[module.__name__]
+
+
+def input_digest(data):
+  return hashlib.sha256(data.encode() if isinstance(data, str) else data).hexdigest()
+
+
+def make_key(kind, module, part, data):
+  return hashlib.sha256(f'{kind}:{solver_version(module)}:{part}:{input_digest(data)}'.encode()).hexdigest()
+
+
+def has_parse(module):
+  return hasattr(module, 'parse') and hasattr(module, 'solve_parsed')
+
+
+def entry_path(key):
+  return cache_dir / f'{key}{SUFFIX}'
+
+
+#
+# Returns (True, value) for a hit and (False, None) for a miss
+#
+def get(key):
+  path = entry_path(key)
+  try:
+    value = pickle.loads(zlib.decompress(path.read_bytes()))
+  except FileNotFoundError:
+    return False, None
+  except (zlib.error, pickle.UnpicklingError, EOFError):
+    path.unlink(missing_ok = True)  # A damaged entry is just a miss
+    return False, None
+  os.utime(path)
+  return True, value
+
+
+def put(key, value):
+  path = entry_path(key)
+  cache_dir.mkdir(parents = True, exist_ok = True)
+  tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+  tmp_path.write_bytes(zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+  tmp_path.replace(path)
+  evict()
+
+
+def entries():
+  result = []
+  for path in cache_dir.glob(f'*{SUFFIX}'):
+    try:
+      stat = path.stat()
+    except FileNotFoundError:
+      continue  # Another process evicted it
+    result.append((stat.st_mtime, stat.st_size, path))
+  return result
+
+
+#
+# Delete the least recently used entries until the cache fits in max_bytes
+#
+def evict():
+  items = sorted(entries())
+  total = sum(size for _, size, _ in items)
+  for _, size, path in items:
+    if total <= max_bytes:
+      break
+    path.unlink(missing_ok = True)
+    total -= size
+
+
+def clear():
+  for _, _, path in entries():
+    path.unlink(missing_ok = True)
+
+
+#
+# A day's parsed input, from the cache if it's there, otherwise parsed and cached.  Returns the parsed input and whether
+# it came from the cache.
+#
+def parse(module, data):
+  key = make_key('parse', module, None, data)
+  hit, parsed = get(key)
+  if not hit:
+    parsed = module.parse(data)
+    put(key, parsed)
+  return parsed, hit
+
+
+#
+# Solve a day/part through the cache.  Returns the answer and where it came from: 'answer' if the answer was cached,
+# 'parse' if the day's parsed input was, or None if we had to do all the work.  Either way what we worked out is cached
+# for next time.
+#
+def solve(module, part, data):
+  answer_key = make_key('answer', module, part, data)
+  hit, answer = get(answer_key)
+  if hit:
+    return answer, 'answer'
+  source = None
+  if has_parse(module):
+    parsed, hit = parse(module, data)
+    if hit:
+      source = 'parse'
+    answer = module.solve_parsed(part, parsed)
+  else:
+    answer = module.solve(part, data)
+  put(answer_key, answer)
+  return answer, source
+
+
+def parse_args(args):
+  parser = argparse.ArgumentParser(description = 'Show or clear the answer and parse cache.')
+  parser.add_argument('--dir', help = f'cache directory (default: $AOC_CACHE_DIR or {cache_dir})')
+  parser.add_argument('--clear', action = 'store_true', help = 'delete every entry')
+  return parser.parse_args(args)
+
+
+def main(args = None):
+  global cache_dir
+  args = parse_args(args)
+  if args.dir:
+    cache_dir = Path(args.dir)
+  if args.clear:
+    clear()
+  items = entries()
+  print(f'{cache_dir}: {len(items)} entries, {sum(size for _, size, _ in items)} bytes (max {max_bytes})')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+from time import perf_counter
+
+from aoc import runner
+from aoc import generate
+from aoc import bench
+
+
+#
+# Correctness checks, rather than timings, though we record those as we go.  Two kinds ...
+#
+# Answers.  answers.json at the top of the repo has the expected answer for each day/part/input file (keyed like the
+# benchmark, e.g. 'day5/part2/test-input.txt') that has been checked by hand, against problem.txt for the test inputs
+# and the puzzle site for input.txt.  We run each of them in its own child process, with a timeout, as aoc.bench does,
+# and compare.  --record runs the day/parts given and writes what they get, for when there's a new input or a fixed
+# solver, so check the diff before committing it.
+#
+# Engines.  A day can have other ways of getting the same answers, faster on some inputs or in some environments, as a
+# dict ENGINES of name to fn(part, data), which returns NotImplemented for a part it doesn't do.  solve() is the
+# reference.  We run each engine and solve() on generated inputs (see aoc.generate) at a few scales and seeds and
+# compare, which covers the inputs much bigger, or stranger, than the real ones that the engines are for.
+#
+# Generators.  The engines are only checked at small scales, to keep the check quick, but the benchmark sweeps go up to
+# 100x or more, so we also run each day's generator at a large scale, in its own child process with the timeout.  One
+# that runs out of things to make (day 19 used to, of workflow names) then fails here rather than hanging a sweep.
+#
+ANSWERS_FILE = runner.ROOT / 'answers.json'
+
+
+def load_answers(path = ANSWERS_FILE):
+  if not path.exists():
+    return {}
+  with open(path, 'r') as file:
+    return json.load(file)
+
+
+def save_answers(answers, path = ANSWERS_FILE):
+  with open(path, 'w') as file:
+    json.dump(answers, file, indent = 2, sort_keys = True)
+    file.write('\n')
+
+
+def answer_jobs(days, parts, answers = None):
+  jobs = []
+  for day in days:
+    for file_name in bench.input_files(day, bench.DEFAULT_INPUTS):
+      for part in parts:
+        if answers is None or bench.job_key(day, part, file_name) in answers:
+          jobs.append((day, part, file_name))
+  return jobs
+
+
+def check_answer(result, answers):
+  key = bench.job_key(result['day'], result['part'], result['input'])
+  result['expected'] = answers[key]
+  if 'error' in result:
+    result['status'] = 'error'
+  else:
+    result['status'] = 'ok' if result['answer'] == result['expected'] else 'wrong'
+  print_answer(result)
+
+
+def print_answer(result):
+  key = bench.job_key(result['day'], result['part'], result['input'])
+  if 'error' in result:
+    print(f"{key:<44} {'error':<6} {result['error']}")
+    return
+  line = f"{key:<44} {result.get('status', ''):<6} {str(result['answer']):<20} {runner.format_time(result['wall']):>9}"
+  if result.get('status') == 'wrong':
+    line += f"  expected {result['expected']}"
+  print(line)
+
+
+def check_answers(days, parts, timeout):
+  answers = load_answers()
+  jobs = answer_jobs(days, parts, answers)
+  results = bench.run_benchmarks(jobs, 0, 1, timeout, progress = lambda result: check_answer(result, answers))
+  unrecorded = len(answer_jobs(days, parts)) - len(jobs)
+  if unrecorded:
+    print(f'{unrecorded} day/part/input(s) have no recorded answer, see --record')
+  return results
+
+
+#
+# Solvers that fail or time out on an input (e.g. day 20 part 2 has no 'rx' in the test inputs) leave what was there
+#
+def record_answers(days, parts, timeout):
+  answers = load_answers()
+  results = bench.run_benchmarks(answer_jobs(days, parts), 0, 1, timeout, progress = print_answer)
+  for key, result in results.items():
+    if 'error' not in result:
+      answers[key] = result['answer']
+  save_answers(answers)
+  return results
+
+
+def timed(fn, *args):
+  start = perf_counter()
+  try:
+    return fn(*args), perf_counter() - start
+  except Exception as e:
+    return { 'error' : f'{type(e).__name__}: {e}' }, perf_counter() - start
+
+
+#
+# Each engine of each day against solve() on generated inputs.  The reference answer for each input is worked out once
+# and shared by all of the day's engines.
+#
+def check_engines(days, parts, scales, seeds):
+  results = {}
+  for day in days:
+    module, _ = runner.load_solver(day)
+    engines = getattr(module, 'ENGINES', {})
+    if not engines:
+      continue
+    for scale in scales:
+      for seed in range(seeds):
+        data = generate.generate(day, scale, seed)
+        for part in parts:
+          expected, reference_time = timed(module.solve, part, data)
+          for name, engine in engines.items():
+            answer, engine_time = timed(engine, part, data)
+            if answer is NotImplemented:
+              continue
+            result = { 'day' : day, 'part' : part, 'engine' : name, 'scale' : scale, 'seed' : seed,
+                       'expected' : expected, 'answer' : answer, 'reference_time' : reference_time,
+                       'engine_time' : engine_time, 'status' : 'ok' if answer == expected else 'wrong' }
+            results[f"day{day}/part{part}/{name}/scale-{scale:g}-seed-{seed}"] = result
+            print_engine(result)
+  return results
+
+
+GENERATOR_SCALE = 100
+
+def check_generators(days, scale, timeout):
+  results = {}
+  for day in days:
+    args = [sys.executable, '-m', 'aoc.generate', str(day), '--scale', f'{scale:g}', '--output', os.devnull]
+    result = { 'day' : day, 'scale' : scale }
+    start = perf_counter()
+    try:
+      completed = subprocess.run(args, capture_output = True, text = True, timeout = timeout, cwd = runner.ROOT)
+    except subprocess.TimeoutExpired:
+      result['error'] = f'timeout after {timeout}s'
+    else:
+      if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        result['error'] = lines[-1] if lines else f'exit code {completed.returncode}'
+    result['wall'] = perf_counter() - start
+    result['status'] = 'error' if 'error' in result else 'ok'
+    results[f'day{day}/generate/scale-{scale:g}'] = result
+    print_generator(result)
+  return results
+
+
+def print_generator(result):
+  key = f"day{result['day']}/generate"
+  line = f"{key:<32} x{result['scale']:<6g} {result['status']:<6}"
+  line += f" {result['error']}" if 'error' in result else f" {runner.format_time(result['wall']):>9}"
+  print(line)
+
+
+def print_engine(result):
+  key = f"day{result['day']}/part{result['part']}/{result['engine']}"
+  line = (f"{key:<32} x{result['scale']:<6g} seed {result['seed']:<3} {result['status']:<6}"
+          f" {runner.format_time(result['reference_time']):>9} -> {runner.format_time(result['engine_time']):>9}")
+  if result['status'] == 'wrong':
+    line += f"  expected {result['expected']}, got {result['answer']}"
+  print(line)
+
+
+def failures(results):
+  return [key for key, result in results.items() if result.get('status') != 'ok']
+
+
+def parse_args(args):
+  parser = argparse.ArgumentParser(description = 'Check the solvers against recorded answers and their engines against '
+                                                 'solve() on generated inputs.')
+  parser.add_argument('--days', type = runner.parse_days, default = None, help = "e.g. '1,3,5-7' (default: all)")
+  parser.add_argument('--parts', type = runner.parse_days, default = [1, 2], help = "'1', '2' or '1,2' (default)")
+  parser.add_argument('--timeout', type = float, default = 60, help = 'seconds allowed per solver (default 60)')
+  parser.add_argument('--scales', type = bench.parse_scales, default = [0.1, 1],
+                      help = "scales of the generated inputs for the engines (default '0.1,1')")
+  parser.add_argument('--seeds', type = int, default = 2, help = 'generated inputs per scale (default 2)')
+  group = parser.add_mutually_exclusive_group()
+  group.add_argument('--answers-only', action = 'store_true', help = "don't cross-check the engines")
+  group.add_argument('--engines-only', action = 'store_true', help = "don't check the recorded answers")
+  parser.add_argument('--generator-scale', type = float, default = GENERATOR_SCALE,
+                      help = f'scale to run each generator at, or 0 not to (default {GENERATOR_SCALE})')
+  group.add_argument('--record', action = 'store_true',
+                     help = 'run the given day/parts on their inputs and record the answers in answers.json')
+  parser.add_argument('--json', metavar = 'FILE', help = 'write all the results, with their timings, to FILE')
+  return parser.parse_args(args)
+
+
+def main(args = None):
+  args = parse_args(args)
+  days = args.days if args.days else runner.available_days()
+
+  if args.record:
+    record_answers(days, args.parts, args.timeout)
+    return 0
+
+  results = { 'answers' : {}, 'engines' : {}, 'generators' : {} }
+  if not args.engines_only:
+    results['answers'] = check_answers(days, args.parts, args.timeout)
+  if not args.answers_only:
+    if results['answers']: print()
+    results['engines'] = check_engines(days, args.parts, args.scales, args.seeds)
+    if args.generator_scale:
+      print()
+      results['generators'] = check_generators(days, args.generator_scale, args.timeout)
+
+  if args.json:
+    with open(args.json, 'w') as file:
+      json.dump(results, file, indent = 2, sort_keys = True)
+  failed = failures(results['answers']) + failures(results['engines']) + failures(results['generators'])
+  print()
+  checked = len(results['answers']) + len(results['engines']) + len(results['generators'])
+  print(f'{checked - len(failed)} of {checked} checks passed' + (f', failed: {", ".join(failed)}' if failed else ''))
+  return 1 if failed else 0
+
+
+if __name__ == '__main__':
+  exit(main())
@@ -0,0 +1,74 @@
+import os
+import json
+import socket
+import argparse
+
+from aoc import runner
+from aoc.daemon import DEFAULT_SOCKET
+
+
+#
+# A small client for aoc.daemon.  Each call makes its own connection, sends its requests and waits for all the
+# responses, so it's only meant for scripts and trying the daemon out ...
+#
+#   python3 -m aoc.daemon --preload 1-20,22 &
+#   python3 -m aoc.client 7 1 day7/input.txt
+#   python3 -m aoc.client --stats
+#
+def request(requests, socket_path = DEFAULT_SOCKET):
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+    connection.connect(socket_path)
+    for n, message in enumerate(requests):
+      connection.sendall((json.dumps({ 'id' : n, **message }) + '\n').encode())
+    connection.shutdown(socket.SHUT_WR)
+    with connection.makefile('r') as stream:
+      responses = [json.loads(line) for line in stream]
+  return sorted(responses, key = lambda response: response['id'])
+
+
+#
+# Solve each of a list of (day, part, path) jobs, all in flight at once.  Paths are made absolute since the daemon
+# doesn't share our working directory.
+#
+def solve_many(jobs, socket_path = DEFAULT_SOCKET):
+  requests = [{ 'op' : 'solve', 'day' : day, 'part' : part, 'path' : os.path.abspath(path) }
+              for day, part, path in jobs]
+  return request(requests, socket_path)
+
+
+def solve(day, part, path, socket_path = DEFAULT_SOCKET):
+  response = solve_many([(day, part, path)], socket_path)[0]
+  if 'error' in response:
+    raise RuntimeError(response['error'])
+  return response['answer']
+
+
+def parse_args(args):
+  parser = argparse.ArgumentParser(description = 'Ask aoc.daemon to solve a day/part, or about itself.')
+  parser.add_argument('day', type = int, nargs = '?')
+  parser.add_argument('part', type = runner.parse_days, nargs = '?', help = "'1', '2' or '1,2'")
+  parser.add_argument('path', nargs = '?', help = 'input file')
+  parser.add_argument('--socket', default = DEFAULT_SOCKET, help = f'socket path (default {DEFAULT_SOCKET})')
+  group = parser.add_mutually_exclusive_group()
+  group.add_argument('--ping', action = 'store_true')
+  group.add_argument('--stats', action = 'store_true')
+  group.add_argument('--shutdown', action = 'store_true')
+  return parser.parse_args(args)
+
+
+def main(args = None):
+  args = parse_args(args)
+  op = 'ping' if args.ping else 'stats' if args.stats else 'shutdown' if args.shutdown else None
+  if op:
+    responses = request([{ 'op' : op }], args.socket)
+  elif args.path:
+    responses = solve_many([(args.day, part, args.path) for part in args.part], args.socket)
+  else:
+    exit('Give a day, part(s) and input file, or one of --ping, --stats or --shutdown')
+  for response in responses:
+    print(json.dumps(response))
+  return 1 if any('error' in response for response in responses) else 0
+
+
+if __name__ == '__main__':
+  exit(main())
@@ -0,0 +1,158 @@
+from math import gcd
+
+
+#
+# Cycle detection for the days that step a simulation until it repeats, e.g. the spin cycles of the platform in day 14,
+# the counters in day 20 and the ghosts walking the network in day 8.  A simulation is a start state and a step function
+# that returns the next state.  Once a state repeats, everything after it repeats too, so the states run ...
+#
+#   s0, s1, ... s(start - 1), [s(start), ... s(start + length - 1)], [s(start), ...], ...
+#
+# ... and the state after any number of steps, a billion say, can be worked out from the first start + length of them.
+#
+# States are compared by key(state), by default the state itself, which must then be hashable.  The key should be a
+# compact fingerprint of the state, e.g. bytes(grid.cells) rather than a grid, or a tuple of just the parts of a bigger
+# state that decide what happens next.
+#
+class Cycle():
+  def __init__(self, start, length, states):
+    self.start = start      # Steps before the first state that repeats
+    self.length = length
+    self.states = states    # The states after 0, 1, ... start + length - 1 steps
+
+  def __repr__(self):
+    return f'Cycle(start = {self.start}, length = {self.length})'
+
+  #
+  # The number of steps at or before n at which the state is the same as after step n
+  #
+  def index(self, n):
+    if n < self.start + self.length:
+      return n
+    return self.start + (n - self.start) % self.length
+
+  def state_at(self, n):
+    return self.states[self.index(n)]
+
+
+#
+# Step from start until a state repeats, keeping each state's key in a dict so we see the repeat as soon as it happens,
+# or until we've taken limit steps.  Returns a Cycle, or None if we hit the limit first, and the states so far.
+#
+# The step function may change the state in place and return it, but then the states kept are all the same object, so
+# return something new (the fingerprint, say) if you want them.
+#
+def walk(step, start, key = None, limit = None):
+  seen = {}
+  states = []
+  state = start
+  n = 0
+  while True:
+    fingerprint = key(state) if key else state
+    if fingerprint in seen:
+      first = seen[fingerprint]
+      return Cycle(first, n - first, states), states
+    states.append(state)
+    if n == limit:
+      return None, states
+    seen[fingerprint] = n
+    state = step(state)
+    n += 1
+
+
+def find_cycle(step, start, key = None, limit = None):
+  cycle, _ = walk(step, start, key, limit)
+  if cycle is None:
+    raise ValueError(f'No cycle within {limit} steps')
+  return cycle
+
+
+#
+# Brent's algorithm.  Returns (start, length) like a Cycle but keeps only two states at a time, at the cost of stepping
+# about three times as often as find_cycle().  The step function mustn't change the state it's given.
+#
+def brent(step, start, key = None):
+  key = key or (lambda state: state)
+  # Find the length: the hare runs ahead and the tortoise teleports to it at each power of two
+  power = length = 1
+  tortoise = key(start)
+  hare = step(start)
+  while tortoise != key(hare):
+    if power == length:
+      tortoise = key(hare)
+      power *= 2
+      length = 0
+    hare = step(hare)
+    length += 1
+  # Then the start: run two states length apart until they meet
+  tortoise = hare = start
+  for _ in range(length):
+    hare = step(hare)
+  first = 0
+  while key(tortoise) != key(hare):
+    tortoise = step(tortoise)
+    hare = step(hare)
+    first += 1
+  return first, length
+
+
+#
+# The state after n steps without taking n steps, well, unless the cycle is only found after more than n.  With
+# low_memory we use brent() and then step to the answer, rather than keeping every state until the cycle is found.
+#
+def state_at(step, start, n, key = None, low_memory = False):
+  if low_memory:
+    first, length = brent(step, start, key)
+    steps = n if n < first + length else first + (n - first) % length
+    state = start
+    for _ in range(steps):
+      state = step(state)
+    return state
+  cycle, states = walk(step, start, key, limit = n)
+  return cycle.state_at(n) if cycle else states[n]
+
+
+#
+# The smallest t with t = a1 (mod m1) and t = a2 (mod m2), and the period it repeats with, or None if there isn't one.
+# The moduli needn't be coprime.
+#
+def combine(a1, m1, a2, m2):
+  g = gcd(m1, m2)
+  if (a2 - a1) % g:
+    return None
+  period = m1 // g * m2
+  k = (a2 - a1) // g * pow(m1 // g, -1, m2 // g) % (m2 // g)
+  return (a1 + k * m1) % period, period
+
+
+#
+# Several simulations, each a Cycle and the sorted steps at which something happens in it, e.g. a ghost stands on a
+# node ending in Z.  An event in the repeating part of a Cycle happens again every length steps.  Returns the first
+# step at which the event happens in all of them at once, or None if it never does.
+#
+def first_common_step(timelines):
+  def happens_at(t, cycle, events):
+    return cycle.index(t) in events
+
+  timelines = [(cycle, set(events)) for cycle, events in timelines]
+  # A step before every simulation is in its cycle must be an event before the cycle in the one that starts last
+  latest = max(timelines, key = lambda timeline: timeline[0].start)
+  for t in sorted(n for n in latest[1] if n < latest[0].start):
+    if all(happens_at(t, cycle, events) for cycle, events in timelines):
+      return t
+
+  # Otherwise it's in every cycle.  Try each combination of the events within the cycles, using the CRT.
+  earliest = latest[0].start
+  solutions = [(0, 1)]
+  for cycle, events in timelines:
+    in_cycle = [n for n in events if n >= cycle.start]
+    solutions = [solution for a, m in solutions for n in in_cycle
+                 if (solution := combine(a, m, n % cycle.length, cycle.length))]
+    if not solutions:
+      return None
+  best = None
+  for a, period in solutions:
+    t = a if a >= earliest else a + -(-(earliest - a) // period) * period
+    if best is None or t < best:
+      best = t
+  return best
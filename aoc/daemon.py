@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import signal
+import multiprocessing
+import asyncio
+import hashlib
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from aoc import runner
+from aoc import reader
+
+
+#
+# A long running solver server for tools that ask for answers over and over.  It listens on a Unix socket and keeps a
+# pool of worker processes with the solvers already imported, so a request doesn't pay for starting Python, importing
+# the solver or compiling its patterns.  Each worker also keeps the last few inputs it parsed, and the server keeps the
+# answers it has worked out, keyed by the SHA-256 of the input, so asking again about an unchanged file is answered
+# without going near a worker.
+#
+# The protocol is JSON lines.  A client can send as many requests on a connection as it likes, without waiting, and
+# gets a response for each one with the same id.  Responses come back as they're ready, which needn't be the order the
+# requests were sent in ...
+#
+#   {"id": 1, "op": "solve", "day": 7, "part": 1, "path": "/abs/path/day7/input.txt"}
+#   {"id": 1, "answer": 255048101, "cached": null, "time": 0.0143}
+#
+# cached is "answer" or "parse" if the answer or the parsed input was already to hand.  The other ops are "ping",
+# "stats" and "shutdown".  A request that fails gets {"id": ..., "error": "..."}.
+#
+# The workers import the solvers once, so restart the daemon after changing one.
+#
+DEFAULT_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or '/tmp', f'aoc-solver-{os.getuid()}.sock')
+
+
+#
+# Worker process state: the last few parsed inputs, keyed by (day, input digest)
+#
+parsed_inputs = OrderedDict()
+max_parsed_inputs = 8
+
+
+def init_worker(preload_days, max_parsed):
+  global max_parsed_inputs
+  max_parsed_inputs = max_parsed
+  for day in preload_days:
+    runner.load_solver(day)
+
+
+def solve_in_worker(day, part, path, digest):
+  module, _ = runner.load_solver(day)
+  start = perf_counter()
+  key = (day, digest)
+  parse_cached = key in parsed_inputs
+  if parse_cached:
+    parsed_inputs.move_to_end(key)
+    parsed = parsed_inputs[key]
+  else:
+    parsed = module.parse(reader.read(path))
+    parsed_inputs[key] = parsed
+    while len(parsed_inputs) > max_parsed_inputs:
+      parsed_inputs.popitem(last = False)
+  answer = module.solve_parsed(part, parsed)
+  return answer, parse_cached, perf_counter() - start
+
+
+def file_digest(path):
+  with open(path, 'rb') as file:
+    return hashlib.file_digest(file, 'sha256').hexdigest()
+
+
+class Server():
+  def __init__(self, executor, max_answers = 10_000):
+    self.executor = executor
+    self.max_answers = max_answers
+    self.answers = OrderedDict()   # (day, part, digest) -> answer
+    self.in_flight = {}            # (day, part, digest) -> future, so identical requests share one solve
+    self.stats = { 'requests' : 0, 'answer_hits' : 0, 'parse_hits' : 0, 'solves' : 0, 'errors' : 0 }
+    self.stopping = asyncio.Event()
+    self.connections = {}          # handler task -> (writer, its requests in progress), for the open connections
+
+  async def solve(self, day, part, path):
+    loop = asyncio.get_running_loop()
+    digest = await loop.run_in_executor(None, file_digest, path)
+    key = (day, part, digest)
+    if key in self.answers:
+      self.answers.move_to_end(key)
+      self.stats['answer_hits'] += 1
+      return { 'answer' : self.answers[key], 'cached' : 'answer', 'time' : 0.0 }
+    if key not in self.in_flight:
+      self.in_flight[key] = loop.run_in_executor(self.executor, solve_in_worker, day, part, path, digest)
+      self.stats['solves'] += 1
+    future = self.in_flight[key]
+    try:
+      answer, parse_cached, solve_time = await asyncio.shield(future)
+    finally:
+      self.in_flight.pop(key, None)
+    self.answers[key] = answer
+    while len(self.answers) > self.max_answers:
+      self.answers.popitem(last = False)
+    if parse_cached:
+      self.stats['parse_hits'] += 1
+    return { 'answer' : answer, 'cached' : 'parse' if parse_cached else None, 'time' : solve_time }
+
+  async def handle_request(self, request):
+    self.stats['requests'] += 1
+    op = request.get('op', 'solve')
+    if op == 'solve':
+      return await self.solve(int(request['day']), int(request['part']), request['path'])
+    if op == 'ping':
+      return { 'pong' : True }
+    if op == 'stats':
+      return { **self.stats, 'answers' : len(self.answers), 'in_flight' : len(self.in_flight) }
+    if op == 'shutdown':
+      self.stopping.set()
+      return { 'stopping' : True }
+    raise ValueError(f'Unknown op: {op}')
+
+  async def respond(self, line, writer, lock):
+    request_id = None
+    try:
+      request = json.loads(line)
+      request_id = request.get('id')
+      response = await self.handle_request(request)
+    except Exception as e:
+      self.stats['errors'] += 1
+      response = { 'error' : f'{type(e).__name__}: {e}' }
+    async with lock:
+      writer.write((json.dumps({ 'id' : request_id, **response }, default = str) + '\n').encode())
+      await writer.drain()
+
+  async def handle_connection(self, reader_stream, writer):
+    lock = asyncio.Lock()
+    tasks = set()
+    connection = asyncio.current_task()
+    self.connections[connection] = (writer, tasks)
+    try:
+      while line := await reader_stream.readline():
+        if line.strip():
+          task = asyncio.create_task(self.respond(line, writer, lock))
+          tasks.add(task)
+          task.add_done_callback(tasks.discard)
+      if tasks:
+        await asyncio.gather(*tasks)
+    except ConnectionResetError:
+      pass
+    finally:
+      writer.close()
+      del self.connections[connection]
+
+  #
+  # On the way out, let the requests in progress finish and send their responses, then close the connections that are
+  # still open, so their handlers see the end of the stream, and wait for them, rather than leave them to be cancelled
+  # when the event loop stops
+  #
+  async def close_connections(self):
+    requests = [task for _, tasks in self.connections.values() for task in tasks]
+    await asyncio.gather(*requests, return_exceptions = True)
+    for writer, _ in list(self.connections.values()):
+      writer.close()
+    await asyncio.gather(*self.connections, return_exceptions = True)
+
+
+async def serve(socket_path, num_workers, preload_days, max_parsed, max_answers):
+  if os.path.exists(socket_path):
+    os.unlink(socket_path)
+  # The workers are started on the first request, from a process that by then has an event loop and helper threads
+  # running, and forking one of those can leave the worker stuck on a lock it copied mid use.  Spawn them afresh
+  # instead.
+  context = multiprocessing.get_context('spawn')
+  with ProcessPoolExecutor(max_workers = num_workers, mp_context = context, initializer = init_worker,
+                           initargs = (preload_days, max_parsed)) as executor:
+    server = Server(executor, max_answers)
+    unix_server = await asyncio.start_unix_server(server.handle_connection, path = socket_path)
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+      loop.add_signal_handler(signal_number, server.stopping.set)
+    print(f'aoc.daemon listening on {socket_path} with {num_workers} worker(s)', file = sys.stderr)
+    try:
+      async with unix_server:
+        await server.stopping.wait()
+        await server.close_connections()
+    finally:
+      if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+
+def parse_args(args):
+  parser = argparse.ArgumentParser(description = 'Serve solver requests on a Unix socket.')
+  parser.add_argument('--socket', default = DEFAULT_SOCKET, help = f'socket path (default {DEFAULT_SOCKET})')
+  parser.add_argument('--jobs', type = int, default = os.cpu_count() or 1,
+                      help = 'number of worker processes (default: CPU count)')
+  parser.add_argument('--preload', type = runner.parse_days, default = [],
+                      help = "days to import in each worker up front, e.g. '1-20,22'")
+  parser.add_argument('--max-parsed', type = int, default = 8,
+                      help = 'parsed inputs each worker keeps (default 8)')
+  parser.add_argument('--max-answers', type = int, default = 10_000, help = 'answers the server keeps (default 10000)')
+  return parser.parse_args(args)
+
+
+def main(args = None):
+  args = parse_args(args)
+  asyncio.run(serve(args.socket, args.jobs, args.preload, args.max_parsed, args.max_answers))
+
+
+if __name__ == '__main__':
+  main()
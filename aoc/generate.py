@@ -0,0 +1,86 @@
+import argparse
+import importlib
+import random
+from math import sqrt
+
+from aoc import runner
+
+
+#
+# Generated inputs are written to this directory within each day directory (and reused) so that a sweep over several
+# scales doesn't regenerate them each time.  Being inside the day directory means they can be passed to the runner and
+# the benchmark as ordinary input file names.
+#
+GENERATED_DIR = '.generated'
+
+
+def make_rng(seed):
+  return random.Random(seed)
+
+
+#
+# Scale a count (lines, bricks, workflows, ...) by the scale factor
+#
+def scaled(n, scale):
+  return max(1, round(n * scale))
+
+
+#
+# Scale the dimensions of a grid so that its area, rather than each side, grows by the scale factor
+#
+def scaled_dims(width, height, scale):
+  factor = sqrt(scale)
+  return max(1, round(width * factor)), max(1, round(height * factor))
+
+
+def load_generator(day):
+  if str(runner.ROOT) not in runner.sys.path:
+    runner.sys.path.insert(0, str(runner.ROOT))
+  return importlib.import_module(f'day{day}.generate')
+
+
+def generate(day, scale, seed = 0):
+  return load_generator(day).generate(scale, make_rng(seed))
+
+
+def generated_file_name(scale, seed = 0):
+  return f'{GENERATED_DIR}/scale-{scale:g}-seed-{seed}.txt'
+
+
+#
+# Return the file name, relative to the day directory, of a generated input for a day at a given scale, generating it
+# first if we haven't already
+#
+def generated_input(day, scale, seed = 0):
+  file_name = generated_file_name(scale, seed)
+  path = runner.ROOT / f'day{day}' / file_name
+  if not path.exists():
+    path.parent.mkdir(parents = True, exist_ok = True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as file:
+      file.write(generate(day, scale, seed))
+    tmp_path.replace(path)
+  return file_name
+
+
+def parse_args(args):
+  parser = argparse.ArgumentParser(description = 'Generate a synthetic puzzle input for a day at a given scale.')
+  parser.add_argument('day', type = int)
+  parser.add_argument('--scale', type = float, default = 1, help = 'size relative to a real input (default 1)')
+  parser.add_argument('--seed', type = int, default = 0)
+  parser.add_argument('-o', '--output', help = 'write to this file rather than stdout')
+  return parser.parse_args(args)
+
+
+def main(args = None):
+  args = parse_args(args)
+  data = generate(args.day, args.scale, args.seed)
+  if args.output:
+    with open(args.output, 'w') as file:
+      file.write(data)
+  else:
+    print(data, end = '')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,140 @@
+#
+# A 2-D grid of single byte cells, e.g. the maps in days 10, 11, 13, 14, 16 and 17, stored row by row in one flat
+# bytearray.  That's one byte per cell rather than a list of lists of one character strings, and a cell is one index
+# into one buffer rather than two.
+#
+# grid[x, y] gets and sets cells as one character strings, which is convenient but not fast.  Hot loops should work on
+# grid.cells directly with byte values (ord('#') etc) and flat indexes from grid.index(x, y) ...
+#
+#   cells, width = grid.cells, grid.width
+#   i = y * width + x
+#   if cells[i] == ROCK: ...
+#   i += width  # one step south
+#
+# x is the column and y is the row, with (0, 0) in the top left corner.
+#
+class Grid():
+  def __init__(self, width, height, cells = None, fill = '.'):
+    self.width = width
+    self.height = height
+    self.cells = bytearray(fill.encode() * (width * height)) if cells is None else cells
+    if len(self.cells) != width * height:
+      raise ValueError(f'Expected {width * height} cells for a {width}x{height} grid, got {len(self.cells)}')
+
+  #
+  # Make a grid from a list of equal length lines, either str or bytes-like (e.g. the line views from aoc.reader).  The
+  # lines are joined straight into the grid's cells, which are the one copy of them the grid needs, since it can change.
+  #
+  @classmethod
+  def from_lines(cls, lines):
+    lines = list(lines)
+    width = len(lines[0]) if lines else 0
+    if lines and isinstance(lines[0], str):
+      return cls(width, len(lines), bytearray(''.join(lines), 'ascii'))
+    return cls(width, len(lines), bytearray().join(lines))
+
+  #
+  # Make a grid from a whole input, either a str or a bytes-like buffer.  The grid can change, so it needs its own copy
+  # of a buffer.  We copy it in one go and take the newlines out with replace(), which copies it again but for an input
+  # the size of a grid is much quicker than joining the lines one by one.
+  #
+  @classmethod
+  def from_text(cls, data):
+    if isinstance(data, str):
+      return cls.from_lines(line for line in data.splitlines() if line)
+    cells = bytearray(data)
+    width = cells.find(b'\n')
+    if width > 0 and cells[width - 1] == ord('\r'):
+      width -= 1
+    cells = cells.replace(b'\r', b'').replace(b'\n', b'')
+    if width == -1:
+      return cls(len(cells), 1 if cells else 0, cells)
+    return cls(width, len(cells) // width if width else 0, cells)
+
+  def __repr__(self):
+    return f'Grid({self.width}x{self.height})'
+
+  def __str__(self):
+    return '\n'.join(self.lines())
+
+  def __eq__(self, other):
+    return isinstance(other, Grid) and self.width == other.width and self.cells == other.cells
+
+  def __getitem__(self, xy):
+    x, y = xy
+    return chr(self.cells[y * self.width + x])
+
+  def __setitem__(self, xy, value):
+    x, y = xy
+    self.cells[y * self.width + x] = ord(value)
+
+  def index(self, x, y):
+    return y * self.width + x
+
+  def xy(self, index):
+    y, x = divmod(index, self.width)
+    return x, y
+
+  def in_bounds(self, x, y):
+    return 0 <= x < self.width and 0 <= y < self.height
+
+  #
+  # Views onto a row or a column.  They share the grid's buffer so they're cheap to make, and compare equal if their
+  # contents are equal.  Use bytes(view) for something hashable.
+  #
+  def row(self, y):
+    return memoryview(self.cells)[y * self.width:(y + 1) * self.width]
+
+  def col(self, x):
+    return memoryview(self.cells)[x::self.width]
+
+  def rows(self):
+    return [self.row(y) for y in range(self.height)]
+
+  def cols(self):
+    return [self.col(x) for x in range(self.width)]
+
+  def lines(self):
+    return [self.row(y).tobytes().decode('ascii') for y in range(self.height)]
+
+  #
+  # The (x, y) coordinates of the cells next to (x, y) that are within the grid, North, East, South, West and then the
+  # diagonals if asked for
+  #
+  def neighbours(self, x, y, diagonal = False):
+    offsets = ((0, -1), (1, 0), (0, 1), (-1, 0))
+    if diagonal:
+      offsets += ((1, -1), (1, 1), (-1, 1), (-1, -1))
+    for dx, dy in offsets:
+      nx, ny = x + dx, y + dy
+      if 0 <= nx < self.width and 0 <= ny < self.height:
+        yield nx, ny
+
+  #
+  # The (x, y) of the first cell containing value, or None
+  #
+  def find(self, value):
+    index = self.cells.find(value.encode())
+    return None if index == -1 else self.xy(index)
+
+  def find_all(self, value):
+    target = value.encode()
+    index = self.cells.find(target)
+    while index != -1:
+      yield self.xy(index)
+      index = self.cells.find(target, index + 1)
+
+  def count(self, value):
+    return self.cells.count(value.encode())
+
+  def copy(self):
+    return Grid(self.width, self.height, bytearray(self.cells))
+
+  def transposed(self):
+    return Grid(self.height, self.width, bytearray(b''.join(col.tobytes() for col in self.cols())))
+
+  #
+  # The cells as bytes, for use as a dict key or set member when we're looking for repeated states
+  #
+  def key(self):
+    return bytes(self.cells)
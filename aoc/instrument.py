@@ -0,0 +1,121 @@
+import os
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+
+#
+# Counters and timers that any solver can bump, e.g. node expansions in a search or cache hits in a recursion.  Like
+# aoc.trace, updates in hot loops should be guarded so they cost one test when instrumentation is off ...
+#
+#   if __debug__ and instrument.enabled: instrument.counters['expansions'] += 1
+#
+# The runner turns this on (--counters), resets it before each day/part and collects a snapshot afterwards, so solvers
+# don't need to put the day in counter names.  The AOC_INSTRUMENT environment variable turns it on for a day run
+# directly.
+#
+enabled = bool(os.environ.get('AOC_INSTRUMENT'))
+
+counters = Counter()
+timers = defaultdict(float)
+
+
+def set_enabled(on):
+  global enabled
+  enabled = on
+  # Worker processes started after this pick the setting up from the environment
+  os.environ['AOC_INSTRUMENT'] = '1' if on else ''
+
+
+def count(name, n = 1):
+  if enabled:
+    counters[name] += n
+
+
+#
+# Time a block of code and add the time to a named timer ...
+#
+#   with instrument.timer('parse'):
+#     ...
+#
+@contextmanager
+def timer(name):
+  if not enabled:
+    yield
+    return
+  start = perf_counter()
+  try:
+    yield
+  finally:
+    timers[name] += perf_counter() - start
+
+
+def reset():
+  counters.clear()
+  timers.clear()
+
+
+def snapshot():
+  return { 'counters' : dict(counters), 'timers' : dict(timers) }
+
+
+#
+# Run fn(*args) under cProfile.  Returns the result of the call and the pstats text report of the top functions by
+# sort key.  If path is given the raw stats are also written there, for snakeviz, pstats etc.  The profiling modules are
+# imported here, since the solvers import this module and most runs never profile.
+#
+def profile(fn, *args, path = None, sort = 'cumulative', limit = 20):
+  import io
+  import cProfile
+  import pstats
+  profiler = cProfile.Profile()
+  result = profiler.runcall(fn, *args)
+  if path:
+    profiler.dump_stats(path)
+  stream = io.StringIO()
+  pstats.Stats(profiler, stream = stream).sort_stats(sort).print_stats(limit)
+  return result, stream.getvalue()
+
+
+#
+# Run fn(*args) with tracemalloc on.  Returns the result of the call and a report of the peak traced memory and where
+# the memory was allocated at about that point: the top limit source lines by size, as [file:line, bytes, blocks].
+# Memory that's freed by the time fn returns doesn't show in a snapshot taken afterwards, so a thread takes one every
+# interval seconds while fn runs and we keep the one with the most memory traced (or the final state, if that's more).
+# Everything runs a few times slower with tracemalloc on, so don't time it at the same time.
+#
+def trace_memory(fn, *args, limit = 10, interval = 0.05):
+  import threading
+  import tracemalloc
+  largest = { 'size' : 0, 'snapshot' : None }
+  done = threading.Event()
+
+  def take_snapshot():
+    size, _ = tracemalloc.get_traced_memory()
+    if size > largest['size']:
+      largest.update(size = size, snapshot = tracemalloc.take_snapshot())
+
+  def sample():
+    while not done.wait(interval):
+      take_snapshot()
+
+  tracemalloc.start()
+  sampler = threading.Thread(target = sample, daemon = True)
+  sampler.start()
+  try:
+    result = fn(*args)
+    take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    done.set()
+    sampler.join()
+    tracemalloc.stop()
+  allocations = []
+  if largest['snapshot']:
+    ignore = [tracemalloc.Filter(False, file_name)
+              for file_name in (__file__, tracemalloc.__file__, threading.__file__)]
+    snapshot = largest['snapshot'].filter_traces(ignore)
+    for statistic in snapshot.statistics('lineno')[:limit]:
+      frame = statistic.traceback[0]
+      allocations.append([f'{frame.filename}:{frame.lineno}', statistic.size, statistic.count])
+  return result, { 'peak_bytes' : peak, 'allocations' : allocations }
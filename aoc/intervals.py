@@ -0,0 +1,192 @@
+from bisect import bisect_right
+
+
+#
+# Intervals and n-dimensional boxes of integers, for the days that work on whole ranges of values at once rather than
+# one value at a time: the seed ranges in day 5, the part ratings in day 19 and the brick footprints in day 22.
+#
+# An interval is a tuple (lo, hi) of the integers lo <= x < hi, i.e. half open like range(), so its length is hi - lo
+# and (lo, at) and (at, hi) split it without overlapping.  Use closed(first, last) for inputs that give both ends.  An
+# empty interval is None rather than a tuple with lo >= hi, so the functions that can make one return None.
+#
+# A box is a tuple of intervals, one per axis, e.g. ((x_lo, x_hi), (y_lo, y_hi)) for a rectangle.
+#
+def closed(first, last):
+  return first, last + 1
+
+
+def length(interval):
+  lo, hi = interval
+  return hi - lo
+
+
+#
+# Two intervals overlap iff each starts before the other ends
+#
+def overlaps(a, b):
+  return a[0] < b[1] and b[0] < a[1]
+
+
+def intersect(a, b):
+  lo = a[0] if a[0] > b[0] else b[0]
+  hi = a[1] if a[1] < b[1] else b[1]
+  return (lo, hi) if lo < hi else None
+
+
+#
+# The parts of an interval below at and from at upwards, either of which may be None
+#
+def split(interval, at):
+  lo, hi = interval
+  if at <= lo:
+    return None, interval
+  if at >= hi:
+    return interval, None
+  return (lo, at), (at, hi)
+
+
+#
+# What's left of a after taking away b, as a list of none, one or two intervals
+#
+def subtract(a, b):
+  if not overlaps(a, b):
+    return [a]
+  result = []
+  if a[0] < b[0]:
+    result.append((a[0], b[0]))
+  if b[1] < a[1]:
+    result.append((b[1], a[1]))
+  return result
+
+
+#
+# Sorted, non-overlapping intervals covering the same values as the given ones.  Intervals that touch are merged too.
+#
+def union(intervals):
+  result = []
+  for lo, hi in sorted(intervals):
+    if result and lo <= result[-1][1]:
+      if hi > result[-1][1]:
+        result[-1] = (result[-1][0], hi)
+    else:
+      result.append((lo, hi))
+  return result
+
+
+#
+# The number of values in any of the intervals, counting each only once
+#
+def count(intervals):
+  return sum(hi - lo for lo, hi in union(intervals))
+
+
+def volume(box):
+  result = 1
+  for lo, hi in box:
+    result *= hi - lo
+  return result
+
+
+def boxes_overlap(a, b):
+  for (a_lo, a_hi), (b_lo, b_hi) in zip(a, b):
+    if a_lo >= b_hi or b_lo >= a_hi:
+      return False
+  return True
+
+
+def box_intersect(a, b):
+  result = []
+  for a_interval, b_interval in zip(a, b):
+    interval = intersect(a_interval, b_interval)
+    if interval is None:
+      return None
+    result.append(interval)
+  return tuple(result)
+
+
+#
+# The parts of a box below at and from at upwards along one axis, either of which may be None
+#
+def split_box(box, axis, at):
+  below, above = split(box[axis], at)
+  return (box[:axis] + (below,) + box[axis + 1:] if below else None,
+          box[:axis] + (above,) + box[axis + 1:] if above else None)
+
+
+#
+# What's left of box a after taking away box b, as a list of disjoint boxes (at most two per axis).  We slice off the
+# parts of a outside b one axis at a time, and what's left at the end is the intersection, which we drop.
+#
+def box_subtract(a, b):
+  if not boxes_overlap(a, b):
+    return [a]
+  result = []
+  rest = a
+  for axis, (lo, hi) in enumerate(b):
+    below, rest = split_box(rest, axis, lo)
+    if below: result.append(below)
+    rest, above = split_box(rest, axis, hi)
+    if above: result.append(above)
+  return result
+
+
+#
+# The number of points in any of the boxes, counting each only once
+#
+def box_count(boxes):
+  disjoint = []
+  for box in boxes:
+    pieces = [box]
+    for other in disjoint:
+      pieces = [piece for p in pieces for piece in box_subtract(p, other)]
+    disjoint += pieces
+  return sum(volume(box) for box in disjoint)
+
+
+#
+# A function that adds an offset to the values in each of a set of non-overlapping source intervals and leaves any other
+# value as it is, e.g. a day 5 map.  pieces are (lo, hi, offset).  The intervals are kept sorted, with their starts in a
+# list of their own for bisect, so mapping a value is a binary search and mapping a whole interval splits it at the
+# boundaries of the source intervals it crosses.
+#
+class OffsetMap():
+  def __init__(self, pieces):
+    self.pieces = sorted(pieces)
+    self.starts = [lo for lo, _, _ in self.pieces]
+
+  def __repr__(self):
+    return f'OffsetMap({self.pieces})'
+
+  def __call__(self, x):
+    n = bisect_right(self.starts, x) - 1
+    if n >= 0:
+      lo, hi, offset = self.pieces[n]
+      if x < hi:
+        return x + offset
+    return x
+
+  #
+  # The images of the intervals, which needn't be in order or disjoint any more, since each piece moves by its own
+  # offset
+  #
+  def map_intervals(self, intervals):
+    result = []
+    pieces = self.pieces
+    for lo, hi in intervals:
+      # Start at the last piece starting at or before lo, which may cover it
+      n = max(bisect_right(self.starts, lo) - 1, 0)
+      while lo < hi and n < len(pieces):
+        piece_lo, piece_hi, offset = pieces[n]
+        if piece_lo >= hi:
+          break
+        if lo < piece_lo:
+          result.append((lo, piece_lo))
+          lo = piece_lo
+        if lo < piece_hi:
+          end = piece_hi if piece_hi < hi else hi
+          result.append((lo + offset, end + offset))
+          lo = end
+        n += 1
+      if lo < hi:
+        result.append((lo, hi))
+    return result
@@ -0,0 +1,59 @@
+from collections import deque
+from itertools import islice, pairwise
+
+
+#
+# Generators for walking over sequences a few items at a time.  These replace the partition() helpers that used to be
+# copied into several days.  That partition() appended every item to every open bucket, so even a plain pairwise walk
+# made a new list per pair.  Everything here is lazy, works on any iterable (including a generator over the lines of a
+# big input) and yields tuples.  pairwise is itertools.pairwise, imported here so the days get all of these from one
+# place.
+#
+
+
+#
+# Every run of n consecutive items.  There aren't any if the iterable has fewer than n items.  For n == 2 use
+# pairwise(), which is itertools.pairwise and quicker still.
+# Examples
+#   windows([1, 2, 3, 4, 5], 3) -> (1, 2, 3), (2, 3, 4), (3, 4, 5)
+#
+def windows(iterable, n):
+  iterator = iter(iterable)
+  window = deque(islice(iterator, n - 1), maxlen = n)
+  for item in iterator:
+    window.append(item)
+    yield tuple(window)
+
+
+#
+# Split an iterable into tuples of size items.  The last one is shorter if the items don't divide evenly.
+# Examples
+#   chunks([1, 2, 3, 4, 5, 6, 7], 2) -> (1, 2), (3, 4), (5, 6), (7,)
+#
+def chunks(iterable, size):
+  iterator = iter(iterable)
+  if size == 2:
+    # The common case (ranges given as start/length pairs etc) doesn't need islice
+    for first in iterator:
+      second = next(iterator, iterator)
+      yield (first,) if second is iterator else (first, second)
+    return
+  while chunk := tuple(islice(iterator, size)):
+    yield chunk
+
+
+#
+# Split an iterable of lines into blocks separated by blank lines (or whatever is_separator picks out).  Each block is a
+# list of lines.  Runs of separators don't make empty blocks.
+#
+def split_blocks(lines, is_separator = None):
+  block = []
+  for line in lines:
+    if (not line) if is_separator is None else is_separator(line):
+      if block:
+        yield block
+        block = []
+    else:
+      block.append(line)
+  if block:
+    yield block
@@ -0,0 +1,56 @@
+import argparse
+from timeit import Timer
+
+
+#
+# Microbenchmarks for the shared helpers in aoc, each against the code it replaced.  Unlike aoc.bench these time small
+# functions in process with timeit.  Each module here has a cases(size) function that returns a list of
+# (group, name, fn) cases, where fn takes no arguments and the first case in a group is the baseline the others in that
+# group are compared with.
+#
+MODULES = ['iters', 'parsing']
+
+
+#
+# The best time per call of fn in seconds.  timeit picks the number of calls per run so a run takes at least 0.2s.
+#
+def time_call(fn, repeat = 5):
+  timer = Timer(fn)
+  number, _ = timer.autorange()
+  return min(timer.repeat(repeat = repeat, number = number)) / number
+
+
+def format_time(seconds):
+  if seconds >= 1:
+    return f'{seconds:.2f}s'
+  if seconds >= 1e-3:
+    return f'{seconds * 1e3:.1f}ms'
+  return f'{seconds * 1e6:.1f}us'
+
+
+def run_cases(cases, repeat = 5, only = None):
+  results = []
+  baselines = {}
+  print(f'{"group":<16} {"case":<32} {"time":>10} {"speedup":>8}')
+  for group, name, fn in cases:
+    if only and only not in group and only not in name:
+      continue
+    seconds = time_call(fn, repeat)
+    baseline = baselines.setdefault(group, seconds)
+    results.append({ 'group' : group, 'case' : name, 'seconds' : seconds, 'speedup' : baseline / seconds })
+    print(f'{group:<16} {name:<32} {format_time(seconds):>10} {baseline / seconds:>7.2f}x')
+  return results
+
+
+def parse_args(args, description):
+  parser = argparse.ArgumentParser(description = description)
+  parser.add_argument('--size', type = int, default = 10_000, help = 'number of items per case (default 10000)')
+  parser.add_argument('--repeat', type = int, default = 5, help = 'timed runs per case, we report the best (default 5)')
+  parser.add_argument('--only', metavar = 'TEXT', help = 'only run cases whose group or name contains TEXT')
+  return parser.parse_args(args)
+
+
+def main(module, args = None):
+  args = parse_args(args, 'Microbenchmark shared helpers against the code they replaced.')
+  run_cases(module.cases(args.size), args.repeat, args.only)
+  return 0
@@ -0,0 +1,20 @@
+import sys
+from importlib import import_module
+
+from aoc import microbench
+
+
+#
+# Run every microbenchmark module, e.g. python3 -m aoc.microbench --size 1000
+#
+def main(args = None):
+  args = microbench.parse_args(args, 'Run all the microbenchmarks.')
+  for name in microbench.MODULES:
+    module = import_module(f'aoc.microbench.{name}')
+    print(f'\n{module.__name__}')
+    microbench.run_cases(module.cases(args.size), args.repeat, args.only)
+  return 0
+
+
+if __name__ == '__main__':
+  exit(main(sys.argv[1:]))
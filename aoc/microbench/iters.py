@@ -0,0 +1,97 @@
+import sys
+from collections import deque
+from itertools import chain, tee
+
+from aoc import iters
+from aoc import microbench
+
+
+#
+# The helpers that aoc.iters replaced, as they were in the days, kept here as baselines
+#
+def partition_impl(iterable, bucket_size, offset):
+  buckets = deque()
+  n = 0
+  for item in iterable:
+    if n % offset == 0:
+      buckets.append([])
+    for bucket in buckets:
+      bucket.append(item)
+    if len(buckets[0]) == bucket_size:
+      yield buckets.popleft()
+    n += 1
+  while len(buckets) > 0:
+    yield buckets.popleft()
+
+
+def split_list(iterable, separator_fn):
+  list = []
+  for item in iterable:
+    if separator_fn(item):
+      yield list
+      list.clear()
+      continue
+    list.append(item)
+  yield list
+
+
+def generate_lines_window(lines):
+  iter_current, iter_lead, iter_lag = tee(enumerate(lines), 3)
+
+  while True:
+    try:
+      blank_line = ''
+      current_line_index, current_line = next(iter_current)
+      current_line = current_line.rstrip('\n')
+      if len(blank_line) == 0:
+        blank_line = '.' * len(current_line)
+
+      if current_line_index == 0:
+        lag_line = blank_line
+        _ = next(iter_lead)
+      else:
+        _, lag_line = next(iter_lag)
+        lag_line = lag_line.rstrip('\n')
+
+      _, lead_line = next(iter_lead)
+      lead_line = lead_line.rstrip('\n')
+
+      yield lag_line, current_line, lead_line
+
+    except StopIteration:
+      yield lag_line, current_line, blank_line
+      return
+
+
+def padded_windows(lines):
+  blank_line = '.' * len(lines[0])
+  return iters.windows(chain([blank_line], lines, [blank_line]), 3)
+
+
+#
+# Each case consumes the whole generator and does a little work per item, the way the days use them
+#
+def cases(size):
+  numbers = list(range(size))
+  lines = [f'{n:010d}' for n in range(size)]
+  blocked_lines = [line if n % 8 else '' for n, line in enumerate(lines)]
+  return [
+    ('pairwise', 'partition(x, 2, 1)', lambda: [p[1] - p[0] for p in partition_impl(numbers, 2, 1) if len(p) == 2]),
+    ('pairwise', 'iters.pairwise', lambda: [b - a for a, b in iters.pairwise(numbers)]),
+    ('windows(3)', 'partition(x, 3, 1)', lambda: sum(len(w) for w in partition_impl(numbers, 3, 1))),
+    ('windows(3)', 'iters.windows', lambda: sum(len(w) for w in iters.windows(numbers, 3))),
+    ('windows(8)', 'partition(x, 8, 1)', lambda: sum(len(w) for w in partition_impl(numbers, 8, 1))),
+    ('windows(8)', 'iters.windows', lambda: sum(len(w) for w in iters.windows(numbers, 8))),
+    ('chunks(2)', 'partition(x, 2)', lambda: sum(a for a, *_ in partition_impl(numbers, 2, 2))),
+    ('chunks(2)', 'iters.chunks', lambda: sum(a for a, *_ in iters.chunks(numbers, 2))),
+    ('chunks(16)', 'partition(x, 16)', lambda: sum(len(c) for c in partition_impl(numbers, 16, 16))),
+    ('chunks(16)', 'iters.chunks', lambda: sum(len(c) for c in iters.chunks(numbers, 16))),
+    ('blocks', 'split_list', lambda: sum(len(b) for b in split_list(blocked_lines, lambda line: line == ''))),
+    ('blocks', 'iters.split_blocks', lambda: sum(len(b) for b in iters.split_blocks(blocked_lines))),
+    ('day3 window', 'tee window', lambda: sum(len(w[1]) for w in generate_lines_window(lines))),
+    ('day3 window', 'padded iters.windows', lambda: sum(len(w[1]) for w in padded_windows(lines))),
+  ]
+
+
+if __name__ == '__main__':
+  exit(microbench.main(sys.modules[__name__], sys.argv[1:]))
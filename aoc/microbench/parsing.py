@@ -0,0 +1,146 @@
+import re
+import sys
+
+from aoc import generate
+from aoc import microbench
+from aoc import runner
+
+
+#
+# The per line parsers that aoc.parsing replaced, as they were in the days (less their tracing), kept here as baselines
+#
+def day2_parse_game(line):
+  def process_color(color_data):
+    match = re.match(r'^(\d+)\s+(\w+)$', color_data)
+    if match:
+      color_count, color = match.groups()
+      return (color, int(color_count))
+    raise Exception(f"color_data does not match regex: '{color_data}'")
+
+  def process_draw(draw_data):
+    cube_counts = { }
+    for color in re.split(r',\s*', draw_data):
+      color, color_count = process_color(color)
+      cube_counts[color] = color_count
+    return cube_counts
+
+  match = re.match(r'^Game (\d+):\s+(.+)\s*$', line)
+  if match:
+    game_number, game_data = match.groups()
+    return int(game_number), [process_draw(draw) for draw in re.split(r';\s*', game_data)]
+  raise Exception(f'Line does not match regex: {line}')
+
+
+def day2_parse(text):
+  return [day2_parse_game(line) for line in text.splitlines()]
+
+
+#
+# Day 2's parse() keeps only the most cubes of each color in a game, so we compare it on those
+#
+def day2_records(games):
+  return [(game_number, *(max((draw.get(color, 0) for draw in draws), default = 0)
+                          for color in ('red', 'green', 'blue')))
+          for game_number, draws in games]
+
+
+def day4_parse_card_data(line):
+  bits = re.split(r'\s*:\s*', line)
+  card_number = re.split(r'\s+', bits[0])[1]
+  winning_numbers_string, numbers_string = re.split(r'\s*\|\s*', bits[1])
+  winning_numbers = set()
+  for n in re.split(r'\s+', winning_numbers_string):
+    winning_numbers.add(int(n))
+  numbers = list(map(lambda n: int(n), re.split(r'\s+', numbers_string)))
+  return int(card_number), winning_numbers, numbers
+
+
+def day4_parse(text):
+  return [day4_parse_card_data(line) for line in text.splitlines()]
+
+
+def day8_parse(text):
+  lines = iter(text.splitlines())
+  network = {}
+  a_nodes = []
+  path = next(lines)
+  _ = next(lines)
+  pattern = r'^([0-9A-Z]{3})\s+=\s+\(([0-9A-Z]{3}),\s+([0-9A-Z]{3})\)$'
+  for line in lines:
+    result = re.search(pattern, line)
+    if result:
+      node_name, left, right = result.groups()
+      network[node_name] = { 'L' : left, 'R' : right}
+      if node_name[2] == 'A': a_nodes.append(node_name)
+  return (path, network, a_nodes)
+
+
+def day19_read_workflows(rows):
+  workflows_by_name = {}
+  for row in rows:
+    if re.match(r'^\s*$', row): break
+    rule_match = re.match(r'^(\w+){([^{}]+)}$', row)
+    if not rule_match: continue
+    workflow_name, rules_string = rule_match.groups()
+    workflow = []
+    workflows_by_name[workflow_name] = workflow
+    for rule_string in rules_string.split(','):
+      match_no_filter = re.match(r'^(\w+)$', rule_string)
+      rule = { 'workflow_name' : workflow_name }
+      if match_no_filter:
+        rule['action'] = match_no_filter.groups()[0]
+      else:
+        match_filter = re.match(r'^(\w+)(<|>)(\d+):(\w+)$', rule_string)
+        if match_filter:
+          property_name, op, value, action = match_filter.groups()
+          rule.update(property_name = property_name, op = op, value = int(value), action = action)
+      workflow.append(rule)
+  return workflows_by_name
+
+
+def day19_parse_part_string(part_string):
+  part = {}
+  match = re.match(r'{([^{}]+)}', part_string)
+  if not match: return None
+  for kv in match.groups()[0].split(','):
+    k, v = kv.split('=')
+    part[k] = int(v)
+  return part
+
+
+def day19_parse(text):
+  rows = iter(text.splitlines())
+  workflows_by_name = day19_read_workflows(rows)
+  return workflows_by_name, [part for part in map(day19_parse_part_string, rows) if part is not None]
+
+
+#
+# A generated input for a day with about size lines
+#
+def generated_text(day, size):
+  lines_at_scale_1 = generate.generate(day, 1).count('\n')
+  return generate.generate(day, size / lines_at_scale_1)
+
+
+#
+# Each case parses a whole generated input, old way and new, with the parse() the day has now
+#
+def cases(size):
+  result = []
+  for day, legacy_parse in ((2, day2_parse), (4, day4_parse), (8, day8_parse), (19, day19_parse)):
+    module, _ = runner.load_solver(day)
+    text = generated_text(day, size)
+    expected, parsed = legacy_parse(text), module.parse(text)
+    if day == 2:
+      expected, parsed = day2_records(expected), parsed.records()
+    if expected != parsed:
+      raise AssertionError(f'day{day}: the baseline and parse() disagree')
+    result += [
+      (f'day{day} parse', 'per field re calls', lambda text = text, fn = legacy_parse: fn(text)),
+      (f'day{day} parse', 'aoc.parsing records', lambda text = text, fn = module.parse: fn(text)),
+    ]
+  return result
+
+
+if __name__ == '__main__':
+  exit(microbench.main(sys.modules[__name__], sys.argv[1:]))
@@ -0,0 +1,15 @@
+from importlib.util import find_spec
+
+
+#
+# Optional dependencies, e.g. NumPy, that a day uses if they're installed and does without otherwise.  We only look for
+# each module once, and without importing it, since the import is the slow part and the day may not need it for an
+# input this small.
+#
+found = {}
+
+
+def available(name):
+  if name not in found:
+    found[name] = find_spec(name) is not None
+  return found[name]
@@ -0,0 +1,65 @@
+import re
+
+
+#
+# Shared parsing for the days whose inputs are lines of records in a fixed format, e.g. day 8's 'AAA = (BBB, CCC)'.
+# Each record type is one pattern, compiled once when the day is imported, that captures every field of the record,
+# rather than a re.match or re.split per field on every line.  Each field can have a converter, e.g. int, applied to
+# what it captured ...
+#
+#   NODE = parsing.Record(r'(\w{3}) = \((\w{3}), (\w{3})\)')
+#   name, left, right = NODE.parse('AAA = (BBB, CCC)')
+#   nodes = NODE.findall(text)  # Every node in a whole input, in one pass
+#
+# Patterns are compiled with re.MULTILINE so that ^ and $ match at line boundaries in findall().  Optional groups that
+# don't take part in a match are left as None rather than converted.
+#
+class Record():
+  def __init__(self, pattern, *converters):
+    self.regex = re.compile(pattern, re.MULTILINE)
+    if converters and len(converters) != self.regex.groups:
+      raise ValueError(f'{len(converters)} converters for {self.regex.groups} groups in {pattern!r}')
+    # Only the fields that have a converter, as (index, converter), so a record of plain text costs nothing more
+    self.converters = [(n, convert) for n, convert in enumerate(converters) if convert is not None]
+
+  def convert(self, groups):
+    if not self.converters:
+      return groups
+    groups = list(groups)
+    for n, convert in self.converters:
+      if groups[n] is not None:
+        groups[n] = convert(groups[n])
+    return tuple(groups)
+
+  #
+  # The fields of a line that must be exactly one record.  Raises ValueError if it isn't.
+  #
+  def parse(self, line):
+    match = self.regex.fullmatch(line)
+    if not match:
+      raise ValueError(f'Expected {self.regex.pattern!r}, got {line!r}')
+    return self.convert(match.groups())
+
+  #
+  # The fields of a line if it's a record, otherwise None
+  #
+  def match(self, line):
+    match = self.regex.fullmatch(line)
+    return self.convert(match.groups()) if match else None
+
+  #
+  # The fields of every record in text, in order, skipping anything in between that isn't one
+  #
+  def findall(self, text):
+    return [self.convert(match.groups()) for match in self.regex.finditer(text)]
+
+
+#
+# Converters for fields that are lists of numbers separated by whitespace, e.g. ' 41 48 83 86 17 '
+#
+def int_list(s):
+  return [int(x) for x in s.split()]
+
+
+def int_set(s):
+  return { int(x) for x in s.split() }
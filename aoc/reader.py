@@ -0,0 +1,121 @@
+import mmap
+
+from aoc import iters
+from aoc.grid import Grid
+
+
+#
+# Shared input handling.  The runner and the benchmark read each input with read(), which memory maps the file rather
+# than decoding it into a str, so a solver gets either a str (when it's run directly or called from other code) or a
+# bytes-like buffer.  The functions here take either.  Solvers that parse through them (grids, blocks, lists of ints)
+# never need a str per line, and a solver that really wants text can call text(data) once up front.
+#
+# Lines of a buffer are memoryview slices of it, so they don't copy anything.  They compare equal to bytes, work with
+# bytes regexes and int(), and bytes(line) or text(line) turns one into something more convenient when that matters.
+# text(), buffer() and grid() do copy the whole input, into a str, bytes or grid of its own.
+#
+
+#
+# The patterns for ints(), for str and for buffers.  They're compiled on first use so that the days which never call
+# ints() don't pay for importing re.
+#
+int_patterns = None
+newline_pattern = None
+
+
+#
+# Memory map a file read-only.  The map stays valid after the file is closed.  You can't map an empty file so we return
+# empty bytes for one of those.
+#
+def read(path):
+  with open(path, 'rb') as file:
+    try:
+      return mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+    except ValueError:
+      return b''
+
+
+#
+# The input as a str, decoded straight from a buffer
+#
+def text(data):
+  if isinstance(data, str):
+    return data
+  return str(data, 'ascii')
+
+
+#
+# The input as bytes, for a solver that scans the raw bytes itself.  This copies a buffer, on purpose, rather than
+# passing it on, so that what the solver parses from it can be cached (see aoc.cache), which a memory map can't.
+#
+def buffer(data):
+  if isinstance(data, str):
+    return data.encode('ascii')
+  return bytes(data)
+
+
+#
+# The index of each newline in a buffer.  A memory map or bytes finds them itself.  A memoryview can't, so a bytes regex
+# reads it where it is instead.
+#
+def newlines(data):
+  global newline_pattern
+  if isinstance(data, memoryview):
+    if newline_pattern is None:
+      import re
+      newline_pattern = re.compile(b'\n')
+    return [match.start() for match in newline_pattern.finditer(data)]
+  result = []
+  newline = data.find(b'\n')
+  while newline != -1:
+    result.append(newline)
+    newline = data.find(b'\n', newline + 1)
+  return result
+
+
+def lines(data):
+  if isinstance(data, str):
+    return data.splitlines()
+  view = memoryview(data)
+  result = []
+  start = 0
+  for newline in newlines(data) + [len(view)]:
+    if start >= len(view):
+      break
+    stop = newline - 1 if newline > start and view[newline - 1] == 13 else newline  # Drop a '\r' too
+    result.append(view[start:stop])
+    start = newline + 1
+  return result
+
+
+#
+# All the integers in a line (or a whole input), e.g. '   Time:  7  15   30' -> [7, 15, 30]
+#
+def ints(data):
+  global int_patterns
+  if int_patterns is None:
+    import re
+    int_patterns = (re.compile(r'-?\d+'), re.compile(rb'-?\d+'))
+  str_pattern, bytes_pattern = int_patterns
+  if isinstance(data, str):
+    return [int(x) for x in str_pattern.findall(data)]
+  return [int(x) for x in bytes_pattern.findall(data)]
+
+
+def int_lists(data):
+  return [ints(line) for line in lines(data)]
+
+
+#
+# Split the lines of an input into blocks separated by blank lines.  Each block is a list of lines.  Runs of blank lines
+# don't make empty blocks.
+#
+def blocks(data):
+  return iters.split_blocks(lines(data))
+
+
+#
+# A fixed width grid of single byte cells
+#
+def grid(data):
+  return Grid.from_text(data)
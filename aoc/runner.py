@@ -0,0 +1,344 @@
+import os
+import sys
+import json
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+from aoc import trace
+from aoc import instrument
+from aoc import reader
+from aoc import cache
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+#
+# The days we have solvers for, found by looking for dayN/dayN.py files.  There's no day 21 (yet).
+#
+def available_days():
+  days = []
+  for path in ROOT.glob('day*/day*.py'):
+    if path.stem == path.parent.name and path.stem[3:].isdigit():
+      days.append(int(path.stem[3:]))
+  return sorted(days)
+
+
+solvers = {}
+
+
+#
+# Import the solver module for a day the first time it's asked for and remember how long the import took.  Returns the
+# module and the import time in seconds (0 if it was already loaded).
+#
+def load_solver(day):
+  if day in solvers:
+    return solvers[day], 0.0
+  if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+  start = perf_counter()
+  module = importlib.import_module(f'day{day}.day{day}')
+  import_time = perf_counter() - start
+  solvers[day] = module
+  return module, import_time
+
+
+def input_path(day, file_name):
+  path = Path(file_name)
+  if path.is_absolute() or path.exists():
+    return path
+  return ROOT / f'day{day}' / file_name
+
+
+#
+# The input as a memory mapped buffer (see aoc.reader), which every solve() accepts as well as a str
+#
+def read_input(day, file_name):
+  return reader.read(input_path(day, file_name))
+
+
+#
+# Run one day/part against one input file and return a result record with the answer and timings.  If instrumentation
+# is on the record also has the counters and timers the solver updated.  If profile_dir is given we run the solver
+# under cProfile, write the stats to dayN-partP.prof in that directory and add the text report to the record.  With
+# memory we run it under tracemalloc (see instrument.trace_memory) and add the peak and the top allocation sites.  If
+# the cache is on we go through it (see aoc.cache) and the record says what, if anything, came from it.
+#
+# A solver that raises gets a record with an error rather than an answer, as in aoc.bench and aoc.batch, so one failure
+# doesn't stop the rest of the jobs.
+#
+def error_result(day, part, file_name, e):
+  return { 'day' : day, 'part' : part, 'input' : file_name, 'error' : f'{type(e).__name__}: {e}' }
+
+
+def run_one(day, part, file_name = 'input.txt', profile_dir = None, memory = False):
+  try:
+    return solve_one(day, part, file_name, profile_dir, memory)
+  except Exception as e:
+    return error_result(day, part, file_name, e)
+
+
+def solve_one(day, part, file_name, profile_dir, memory):
+  module, import_time = load_solver(day)
+  data = read_input(day, file_name)
+  instrument.reset()
+  start = perf_counter()
+  if profile_dir:
+    profile_path = Path(profile_dir) / f'day{day}-part{part}.prof'
+    answer, profile_report = instrument.profile(module.solve, part, data, path = profile_path)
+  elif memory:
+    answer, memory_report = instrument.trace_memory(module.solve, part, data)
+  elif cache.enabled:
+    answer, cached = cache.solve(module, part, data)
+  else:
+    answer = module.solve(part, data)
+  solve_time = perf_counter() - start
+  result = {
+    'day' : day,
+    'part' : part,
+    'input' : file_name,
+    'answer' : answer,
+    'import_time' : import_time,
+    'solve_time' : solve_time
+  }
+  if instrument.enabled:
+    result.update(instrument.snapshot())
+  if cache.enabled and not (profile_dir or memory):
+    result['cached'] = cached
+  if profile_dir:
+    result['profile'] = str(profile_path)
+    result['profile_report'] = profile_report
+  if memory:
+    result.update(memory_report)
+    result['rss_kb'] = peak_rss_kb()
+  return result
+
+
+#
+# The peak RSS of this process so far.  In a worker that's the most any of the jobs it has run needed, so use --jobs 1
+# or a single day/part to see one solver's.
+#
+def peak_rss_kb():
+  import resource
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+#
+# Parse a day's input once and solve both parts from the one parsed input.  Returns a result record for each part.  They
+# both have the parse time and each has the solve time for just that part.
+#
+def run_both(day, file_name = 'input.txt'):
+  try:
+    module, import_time = load_solver(day)
+    data = read_input(day, file_name)
+    start = perf_counter()
+    if cache.enabled:
+      parsed, cached = cache.parse(module, data)
+    else:
+      parsed = module.parse(data)
+    parse_time = perf_counter() - start
+  except Exception as e:
+    return [error_result(day, part, file_name, e) for part in (1, 2)]
+  results = []
+  for part in (1, 2):
+    instrument.reset()
+    start = perf_counter()
+    try:
+      answer = module.solve_parsed(part, parsed)
+    except Exception as e:
+      results.append(error_result(day, part, file_name, e))
+      continue
+    solve_time = perf_counter() - start
+    result = {
+      'day' : day,
+      'part' : part,
+      'input' : file_name,
+      'answer' : answer,
+      'import_time' : import_time if part == 1 else 0.0,
+      'parse_time' : parse_time,
+      'solve_time' : solve_time
+    }
+    if instrument.enabled:
+      result.update(instrument.snapshot())
+    if cache.enabled:
+      result['cached'] = 'parse' if cached else None
+    results.append(result)
+  return results
+
+
+#
+# The day/parts that take seconds rather than milliseconds on our real input, slowest first.  With a process pool we
+# start these first so that the whole run takes about as long as the slowest one rather than a slow one starting last.
+#
+SLOW_JOBS = [(12, 2), (4, 2), (14, 2), (20, 2), (17, 1), (17, 2), (19, 2)]
+
+
+#
+# Jobs are (day, part, ...) for run_one or (day, file_name) for run_both, where a day's priority is its slowest part's
+#
+def schedule_order(jobs):
+  def priority(n):
+    day, part = jobs[n][0], jobs[n][1]
+    parts = [part] if isinstance(part, int) else [1, 2]
+    return min(SLOW_JOBS.index((day, part)) if (day, part) in SLOW_JOBS else len(SLOW_JOBS) for part in parts)
+  return sorted(range(len(jobs)), key = priority)
+
+
+#
+# Run the jobs, in a pool of worker processes if num_workers > 1.  Either way the results come back in the same order
+# as the jobs.  With both the jobs are for run_both and we return its results for every job one after the other.
+#
+def run(jobs, num_workers = 1, both = False):
+  fn = run_both if both else run_one
+  if num_workers <= 1 or len(jobs) <= 1:
+    results = [fn(*job) for job in jobs]
+  else:
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers = min(num_workers, len(jobs))) as executor:
+      futures = { n : executor.submit(fn, *jobs[n]) for n in schedule_order(jobs) }
+      for n, future in futures.items():
+        results[n] = future.result()
+  return [result for results_for_job in results for result in results_for_job] if both else results
+
+
+#
+# Parse a list of days like '1,3,5-7' into [1, 3, 5, 6, 7]
+#
+def parse_days(s):
+  days = []
+  for item in s.split(','):
+    if '-' in item:
+      first, last = item.split('-')
+      days.extend(range(int(first), int(last) + 1))
+    else:
+      days.append(int(item))
+  return days
+
+
+def format_time(seconds):
+  if seconds < 1:
+    return f'{seconds * 1000:.1f}ms'
+  return f'{seconds:.2f}s'
+
+
+def format_bytes(n):
+  if n < 1024 * 1024:
+    return f'{n / 1024:.1f}KB'
+  return f'{n / (1024 * 1024):.1f}MB'
+
+
+def format_counters(result):
+  items = [f"cached {result['cached']}"] if result.get('cached') else []
+  if 'peak_bytes' in result:
+    items += [f"peak={format_bytes(result['peak_bytes'])}", f"rss={format_bytes(result['rss_kb'] * 1024)}"]
+  items += [f'{name}={value}' for name, value in result.get('counters', {}).items()]
+  items += [f'{name}={format_time(value)}' for name, value in result.get('timers', {}).items()]
+  return ', '.join(items)
+
+
+#
+# With --both there's a parse column too.  A day's parse time is shown (and counted) once, on its part 1 row.
+#
+def print_results(results, total_time):
+  both = any('parse_time' in result for result in results)
+  parse_header = f" {'parse':>10}" if both else ''
+  print(f"{'day':>3} {'part':>4}  {'answer':<20}{parse_header} {'solve':>10} {'import':>10}")
+  for result in results:
+    if 'error' in result:
+      print(f"{result['day']:>3} {result['part']:>4}  error: {result['error']}")
+      continue
+    answer = str(result['answer'])
+    parse_time = ''
+    if both:
+      parse_time = f" {format_time(result['parse_time']) if result['part'] == 1 else '':>10}"
+    solve_time = format_time(result['solve_time'])
+    import_time = format_time(result['import_time'])
+    print(f"{result['day']:>3} {result['part']:>4}  {answer:<20}{parse_time} {solve_time:>10} {import_time:>10}  "
+          f"{format_counters(result)}".rstrip())
+  results = [result for result in results if 'error' not in result]
+  solve_total = sum(result['solve_time'] for result in results)
+  import_total = sum(result['import_time'] for result in results)
+  parse_total = ''
+  if both:
+    parse_total = f"parse total: {format_time(sum(r['parse_time'] for r in results if r['part'] == 1))}, "
+  print(f'{parse_total}solve total: {format_time(solve_total)}, import total: {format_time(import_total)}, '
+        f'wall: {format_time(total_time)}')
+
+
+#
+# The top allocation sites for each day/part, as of about when its traced memory peaked
+#
+def print_allocations(results):
+  for result in results:
+    if 'error' in result:
+      continue
+    print(f"\nday{result['day']}/part{result['part']}: peak {format_bytes(result['peak_bytes'])}")
+    for site, size, count in result['allocations']:
+      site = site.replace(f'{ROOT}{os.sep}', '')
+      print(f'  {format_bytes(size):>9} {count:>9} blocks  {site}')
+
+
+def parse_args(args):
+  parser = argparse.ArgumentParser(description = 'Run any set of days/parts in one process.')
+  parser.add_argument('--days', type = parse_days, default = None, help = "e.g. '1,3,5-7' (default: all)")
+  parser.add_argument('--parts', type = parse_days, default = [1, 2], help = "'1', '2' or '1,2' (default)")
+  parser.add_argument('--input', default = 'input.txt', help = 'input file name within each day directory')
+  parser.add_argument('--both', action = 'store_true',
+                      help = 'parse each input once and solve both parts from it, timing the parse separately')
+  parser.add_argument('--jobs', type = int, default = os.cpu_count() or 1,
+                      help = 'number of worker processes, 1 to run everything in this process (default: CPU count)')
+  parser.add_argument('--counters', action = 'store_true', help = 'collect the counters and timers the solvers update')
+  parser.add_argument('--profile', metavar = 'DIR',
+                      help = 'run each solver under cProfile and write dayN-partP.prof files to DIR')
+  parser.add_argument('--memory', action = 'store_true',
+                      help = 'trace allocations with tracemalloc and report the peak and where it was allocated')
+  parser.add_argument('--cache', action = 'store_true',
+                      help = 'reuse cached answers and parsed inputs, and cache new ones (see aoc.cache)')
+  parser.add_argument('--cache-dir', metavar = 'DIR', help = f'cache directory (default: {cache.cache_dir})')
+  parser.add_argument('--json', metavar = 'FILE', help = 'also write the results, with any counters, as JSON')
+  parser.add_argument('--trace', type = int, default = None,
+                      help = 'trace level for the solvers, written to stderr (default: $AOC_TRACE or 0)')
+  return parser.parse_args(args)
+
+
+def main(args = None):
+  args = parse_args(args)
+  if args.both and args.profile:
+    exit('--profile runs each part on its own, so it can\'t be used with --both')
+  if args.memory and (args.both or args.profile):
+    exit('--memory traces each part on its own, so it can\'t be used with --both or --profile')
+  if args.trace is not None:
+    trace.set_level(args.trace)
+  if args.counters:
+    instrument.set_enabled(True)
+  if args.cache:
+    cache.set_enabled(True, args.cache_dir)
+  if args.profile:
+    Path(args.profile).mkdir(parents = True, exist_ok = True)
+  days = args.days if args.days else available_days()
+  if args.both:
+    jobs = [(day, args.input) for day in days]
+  else:
+    jobs = [(day, part, args.input, args.profile, args.memory) for day in days for part in args.parts]
+  start = perf_counter()
+  results = run(jobs, args.jobs, args.both)
+  print_results(results, perf_counter() - start)
+  if args.profile:
+    for result in results:
+      if 'error' in result:
+        continue
+      print(f"\nday{result['day']}/part{result['part']}: {result['profile']}")
+      print(result['profile_report'])
+  if args.memory:
+    print_allocations(results)
+  if args.json:
+    with open(args.json, 'w') as file:
+      json.dump(results, file, indent = 2, default = str)
+  return 1 if any('error' in result for result in results) else 0
+
+
+if __name__ == '__main__':
+  exit(main())
@@ -0,0 +1,158 @@
+import heapq
+
+from aoc import instrument
+
+
+#
+# Graph searches for the days that look for paths through a grid or some other graph of states.  States are integers in
+# range(size), e.g. a grid cell's flat index (y * width + x, see aoc.grid) or that times the number of directions plus
+# a direction, so distances and parents are kept in lists rather than dicts of tuples.  The day supplies ...
+#
+#   neighbours(state)  The states next to state, for reachable() and bfs(), or (state, cost) pairs for the others
+#   is_goal(state)     Whether we can stop at state.  The searches return as soon as they expand a goal.
+#   heuristic(state)   For astar(), a lower bound on the cost from state to a goal
+#
+# With instrument on, each search counts the states it expands and the entries it pushes onto its queue.
+#
+INFINITY = float('inf')
+
+
+class Result():
+  def __init__(self, cost, goal, distances, parents):
+    self.cost = cost            # The cost to the goal, or INFINITY if there's no path to one
+    self.goal = goal            # The goal we got to, or None
+    self.distances = distances  # The best cost found to each state, for the states we got to
+    self.parents = parents      # The state before each state on the best path to it, or -1
+
+  def __repr__(self):
+    return f'Result(cost = {self.cost}, goal = {self.goal})'
+
+  #
+  # The states from a start to the goal
+  #
+  def path(self):
+    if self.goal is None:
+      return []
+    result = [self.goal]
+    while self.parents[result[-1]] >= 0:
+      result.append(self.parents[result[-1]])
+    return result[::-1]
+
+
+#
+# The states that can be reached from the starts, in the order we first get to them (depth first)
+#
+def reachable(starts, neighbours, size):
+  seen = bytearray(size)
+  stack = []
+  for state in starts:
+    if not seen[state]:
+      seen[state] = 1
+      stack.append(state)
+  result = []
+  while stack:
+    state = stack.pop()
+    if __debug__ and instrument.enabled: instrument.counters['expansions'] += 1
+    result.append(state)
+    for next_state in neighbours(state):
+      if not seen[next_state]:
+        seen[next_state] = 1
+        stack.append(next_state)
+  return result
+
+
+#
+# The number of steps from the nearest start to each state, or -1 for the states that can't be reached
+#
+def bfs(starts, neighbours, size):
+  distances = [-1] * size
+  frontier = []
+  for state in starts:
+    if distances[state] < 0:
+      distances[state] = 0
+      frontier.append(state)
+  distance = 0
+  while frontier:
+    distance += 1
+    next_frontier = []
+    for state in frontier:
+      if __debug__ and instrument.enabled: instrument.counters['expansions'] += 1
+      for next_state in neighbours(state):
+        if distances[next_state] < 0:
+          distances[next_state] = distance
+          next_frontier.append(next_state)
+    frontier = next_frontier
+  return distances
+
+
+#
+# A* from the starts, all at cost 0, to the first goal expanded.  With no heuristic (or one that's always 0) this is
+# Dijkstra's algorithm.  The heuristic mustn't overestimate or the cost may not be the least.  Without a goal it goes
+# on until every reachable state has been expanded, and the distances are the least cost to each.
+#
+# The heap holds (priority, cost, state).  We don't remove an entry when we find a cheaper way to its state, we just
+# skip it when it comes off the heap with a cost that's no longer the best.
+#
+def astar(starts, neighbours, size, is_goal = None, heuristic = None):
+  distances = [INFINITY] * size
+  parents = [-1] * size
+  heap = []
+  for state in starts:
+    distances[state] = 0
+    heap.append((heuristic(state) if heuristic else 0, 0, state))
+  heapq.heapify(heap)
+  while heap:
+    _, cost, state = heapq.heappop(heap)
+    if cost > distances[state]:
+      continue
+    if __debug__ and instrument.enabled: instrument.counters['expansions'] += 1
+    if is_goal and is_goal(state):
+      return Result(cost, state, distances, parents)
+    for next_state, step_cost in neighbours(state):
+      next_cost = cost + step_cost
+      if next_cost < distances[next_state]:
+        distances[next_state] = next_cost
+        parents[next_state] = state
+        heapq.heappush(heap, (next_cost + heuristic(next_state) if heuristic else next_cost, next_cost, next_state))
+        if __debug__ and instrument.enabled: instrument.counters['pushes'] += 1
+  return Result(INFINITY, None, distances, parents)
+
+
+def dijkstra(starts, neighbours, size, is_goal = None):
+  return astar(starts, neighbours, size, is_goal)
+
+
+#
+# Dijkstra's algorithm with Dial's bucket queue, for step costs that are small integers, at most max_cost.  The states
+# at cost d wait in bucket d % (max_cost + 1), and every state waiting has a cost from d to d + max_cost, so the buckets
+# can be reused round and round and we take them in order without a heap.
+#
+def dial(starts, neighbours, size, max_cost, is_goal = None):
+  distances = [INFINITY] * size
+  parents = [-1] * size
+  buckets = [[] for _ in range(max_cost + 1)]
+  for state in starts:
+    distances[state] = 0
+    buckets[0].append(state)
+  waiting = len(buckets[0])
+  cost = 0
+  while waiting:
+    bucket = buckets[cost % (max_cost + 1)]
+    while bucket:
+      state = bucket.pop()
+      waiting -= 1
+      if distances[state] != cost:
+        continue
+      if __debug__ and instrument.enabled: instrument.counters['expansions'] += 1
+      if is_goal and is_goal(state):
+        return Result(cost, state, distances, parents)
+      for next_state, step_cost in neighbours(state):
+        next_cost = cost + step_cost
+        if next_cost < distances[next_state]:
+          distances[next_state] = next_cost
+          parents[next_state] = state
+          buckets[next_cost % (max_cost + 1)].append(next_state)
+          waiting += 1
+          if __debug__ and instrument.enabled: instrument.counters['pushes'] += 1
+    cost += 1
+  return Result(INFINITY, None, distances, parents)
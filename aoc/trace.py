@@ -0,0 +1,67 @@
+import os
+import sys
+
+
+#
+# Shared tracing for the solvers, replacing the debug_print helpers each day used to define for itself.
+#
+# Messages take a %-style format string and its arguments, and are only formatted if the trace level is at least the
+# level of the message, so a disabled call costs a function call and a comparison.  In hot loops guard the call as well,
+# which costs only the comparison ...
+#
+#   if __debug__ and trace.level >= 2: trace.log(2, '%s -> %s', source, target)
+#
+# ... and is compiled away completely when Python runs with -O, because __debug__ is then a constant False.
+#
+# The level comes from the AOC_TRACE environment variable (default 0, i.e. off) or set_level().  Output goes to stderr
+# so that it doesn't get mixed up with the answers.  event() writes one JSON object per line for tools to pick up.
+#
+# Every solver imports this, so it imports json and pprint only when something is written.  pprint pulls in dataclasses
+# and inspect, which used to be most of the time it took to start a day.
+#
+level = int(os.environ.get('AOC_TRACE') or 0)
+
+output = sys.stderr
+
+
+def set_level(n):
+  global level
+  level = n
+  # Worker processes started after this pick the level up from the environment
+  os.environ['AOC_TRACE'] = str(n)
+
+
+def enabled(n = 1):
+  return level >= n
+
+
+def log(n, message, *args, end = '\n'):
+  if level < n: return
+  output.write((message % args if args else message) + end)
+
+
+#
+# Pretty print a structure, e.g. the maps a solver has parsed
+#
+def pprint(n, x):
+  if level < n: return
+  import pprint
+  pprint.pprint(x, stream = output, indent = 4)
+
+
+def grid(n, rows):
+  if level < n: return
+  for row in rows:
+    output.write(''.join(row) + '\n')
+  output.write('\n')
+
+
+#
+# A structured event, written as a line of JSON ...
+#   {"event": "cycle", "day": 14, "start": 117, "length": 14}
+# Values that JSON can't represent are written as their repr().
+#
+def event(n, name, **fields):
+  if level < n: return
+  import json
+  output.write(json.dumps({ 'event' : name, **fields }, default = repr) + '\n')
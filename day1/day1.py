@@ -1,70 +1,236 @@
+import os
 import sys
-import re
+from collections import deque
+
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import reader
+from aoc import optional
+
 
 digit_words = ('zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine')
-rev_digit_words = list(map(lambda word: word[::-1], digit_words))
-pattern_start = r'(?:(\d|'
-pattern_end = r'))'
-pattern = pattern_start + '|'.join(digit_words) + pattern_end
-rev_pattern = pattern_start + '|'.join(rev_digit_words) + pattern_end
-
-lookup_table = {}
-
-def init():
-  #print(f"digit_words: {', '.join(digit_words)}")
-  #print(f"rev_digit_words: {', '.join(rev_digit_words)}")
-  #print(f'pattern: {pattern}')
-  #print(f'rev_pattern: {rev_pattern}')
-  for enumerable in (enumerate(range(10)), enumerate(digit_words), enumerate(rev_digit_words)):
-    for index, word in enumerable:
-      lookup_table[str(word)] = index
-  #print(lookup_table)
-
-def is_digit(c):
-  return c.isdigit()
-
-def process_line_1(line):
-  first_digit = next(filter(is_digit, line))
-  last_digit = next(filter(is_digit, line[::-1]))
-  return int(first_digit + last_digit)
-
-def find_digit(line, pattern):
-  #print(line)
-  matches = list(re.finditer(pattern, line))
-  #list(map(print, rev_matches))
-  return lookup_table[matches[0].group()]
-
-def process_line_2(line):
-  first_digit = find_digit(line, pattern)
-  last_digit = find_digit(line[::-1], rev_pattern)
-  #print(f'{index} Found: {first_digit}{last_digit}')
-  return first_digit * 10 + last_digit
-
-def part_n(process_line_fn):
-  with open(file_path, 'r') as file:
-    result = sum(map(process_line_fn, file))
-  print(result)
 
-def part_1():
-  part_n(process_line_1)
+NEWLINE = ord('\n')
+ZERO, NINE = ord('0'), ord('9')
+
+#
+# Finds the first and last digit of every line in one forward pass over the bytes of the input.  It's an Aho-Corasick
+# automaton for the numerals and the given digit words, turned into a DFA, i.e. a table of the next state for each state
+# and byte, so that each byte is one lookup.  A state is the longest tail of the line so far that's the start of a
+# numeral or word, so we see every word that ends at each byte, even when it overlaps the one before, e.g. 'twone' is a
+# 2 and then a 1.
+#
+# The states are numbered so that the ones where a numeral or word has just ended come last, from self.accepting on,
+# and a newline goes to state -1 from every state.  That keeps the scan loop to a lookup and a comparison for most bytes
+# and it allocates nothing per line.
+#
+class DigitScanner():
+  def __init__(self, words):
+    keys = [(str(digit).encode(), digit) for digit in range(10)] + [(word.encode(), digit)
+                                                                    for digit, word in enumerate(words)]
+    # The trie of the keys, with the digit of the key that ends at each node (or -1)
+    children = [{}]
+    digits = [-1]
+    for key, digit in keys:
+      node = 0
+      for b in key:
+        if b not in children[node]:
+          children.append({})
+          digits.append(-1)
+          children[node][b] = len(children) - 1
+        node = children[node][b]
+      digits[node] = digit
+
+    # Then the transitions, breadth first so that the failure link of each node (its longest proper tail that's also in
+    # the trie) has its transitions before we need them.  A node whose key doesn't end there outputs the digit of its
+    # failure link, if that's the end of a key.
+    transitions = [None] * len(children)
+    transitions[0] = [children[0].get(b, 0) for b in range(256)]
+    queue = deque((child, 0) for child in children[0].values())
+    while queue:
+      node, failure = queue.popleft()
+      if digits[node] < 0:
+        digits[node] = digits[failure]
+      transitions[node] = [children[node].get(b, transitions[failure][b]) for b in range(256)]
+      for b, child in children[node].items():
+        queue.append((child, transitions[failure][b]))
+
+    # Renumber the nodes, accepting ones last, with the root still 0
+    order = sorted(range(len(children)), key = lambda node: (digits[node] >= 0, node))
+    number = { node : n for n, node in enumerate(order) }
+    self.accepting = sum(1 for digit in digits if digit < 0)
+    self.digits = [digits[node] for node in order]
+    self.table = [[number[next_node] for next_node in transitions[node]] for node in order]
+    for row in self.table:
+      row[NEWLINE] = -1
+
+  #
+  # The sum of the calibration values, first digit * 10 + last digit, of the lines.  Lines with no digit count 0.
+  #
+  def sum_calibration_values(self, buffer):
+    table, digits, accepting = self.table, self.digits, self.accepting
+    total = 0
+    state = 0
+    first = last = -1
+    for b in buffer:
+      state = table[state][b]
+      if state >= accepting:
+        last = digits[state]
+        if first < 0: first = last
+      elif state < 0:
+        if first >= 0: total += first * 10 + last
+        first = -1
+        state = 0
+    if first >= 0: total += first * 10 + last
+    return total
+
+
+#
+# The scanners are built the first time each part runs.  Part 1 only looks for numerals.
+#
+scanners = {}
+
+def scanner(part):
+  if part not in scanners:
+    scanners[part] = DigitScanner(digit_words if part == 2 else ())
+  return scanners[part]
+
+
+#
+# Part 1 with NumPy, if it's installed, with no Python work per line.  A digit mask gives the positions of all the
+# digits, and then a binary search of those for the start and end of each line gives the index of each line's first
+# digit and one past its last.  A line has a digit iff those differ.
+#
+def numpy_sum_calibration_values(buffer):
+  import numpy as np
+  a = np.frombuffer(buffer, dtype = np.uint8)
+  newlines = np.flatnonzero(a == NEWLINE)
+  ends = newlines if len(a) and a[-1] == NEWLINE else np.append(newlines, len(a))
+  starts = np.concatenate(([0], newlines + 1))[:len(ends)]
+  digit_positions = np.flatnonzero((a >= ZERO) & (a <= NINE))
+  first = np.searchsorted(digit_positions, starts)
+  last = np.searchsorted(digit_positions, ends) - 1
+  has_digit = first <= last
+  first_digits = a[digit_positions[first[has_digit]]].astype(np.int64) - ZERO
+  last_digits = a[digit_positions[last[has_digit]]].astype(np.int64) - ZERO
+  return int(10 * first_digits.sum() + last_digits.sum())
+
+
+#
+# NumPy is optional, and takes longer to import than the scanner takes over a real input, so we only look for it when
+# part 1 has at least NUMPY_MIN_BYTES to do
+#
+NUMPY_MIN_BYTES = 2 << 20
+
+def sum_calibration_values(part, buffer):
+  if part == 1 and len(buffer) >= NUMPY_MIN_BYTES and optional.available('numpy'):
+    return numpy_sum_calibration_values(buffer)
+  return scanner(part).sum_calibration_values(buffer)
+
+
+def parse(data):
+  return reader.buffer(data)
 
-def part_2():
-  part_n(process_line_2)
+def part_1(buffer):
+  return sum_calibration_values(1, buffer)
 
+def part_2(buffer):
+  return sum_calibration_values(2, buffer)
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+#
+# For calibration files too big to want in one process.  We memory map the file, split it into chunks that end at
+# newlines and sum each chunk in a pool of worker processes.  Each worker maps the file for itself, so all that goes to
+# a worker is the (start, end) of a chunk and all that comes back is its sum.  Every chunk is whole lines, so the sums
+# just add up.  There are a few chunks per worker so that one slow chunk doesn't hold up the rest, but no chunks of
+# less than MIN_CHUNK_BYTES, so a small file doesn't start a pool at all.
+#
+MIN_CHUNK_BYTES = 1 << 20
 
-init()
+def chunk_bounds(buffer, num_chunks):
+  size = len(buffer)
+  bounds = []
+  start = 0
+  for n in range(1, num_chunks + 1):
+    if start >= size: break
+    end = buffer.find(b'\n', max(start, size * n // num_chunks)) + 1 if n < num_chunks else size
+    if end <= start: end = size  # No newline after the split point
+    bounds.append((start, end))
+    start = end
+  return bounds
 
-if part == '1':
-  part_1()
-elif part == '2':
-  part_2()
-else:
-  print('Unknown part')
-  exit(1)
+def sum_chunk(part, path, start, end):
+  with memoryview(reader.read(path)) as view, view[start:end] as chunk:
+    return sum_calibration_values(part, chunk)
+
+def solve_file(part, path, num_workers = None):
+  num_workers = num_workers or os.cpu_count()
+  buffer = reader.read(path)
+  num_chunks = max(1, min(num_workers * 4, len(buffer) // MIN_CHUNK_BYTES))
+  bounds = chunk_bounds(buffer, num_chunks)
+  if num_workers <= 1 or len(bounds) <= 1:
+    return sum(sum_chunk(part, path, start, end) for start, end in bounds)
+  from concurrent.futures import ProcessPoolExecutor
+  with ProcessPoolExecutor(max_workers = min(num_workers, len(bounds))) as executor:
+    futures = [executor.submit(sum_chunk, part, path, start, end) for start, end in bounds]
+    return sum(future.result() for future in futures)
+
+
+#
+# How we used to do it, a line at a time with a regex from the front for the first digit and another from the back, on
+# the reversed line, for the last, kept as the reference for aoc.check
+#
+def solve_by_lines(part, data):
+  import re
+  words = digit_words if part == 2 else ()
+  pattern = re.compile('|'.join([r'\d', *words]))
+  rev_pattern = re.compile('|'.join([r'\d', *(word[::-1] for word in words)]))
+  lookup_table = { str(digit) : digit for digit in range(10) }
+  for digit, word in enumerate(digit_words):
+    lookup_table[word] = lookup_table[word[::-1]] = digit
+  total = 0
+  for line in reader.text(data).splitlines():
+    first, last = pattern.search(line), rev_pattern.search(line[::-1])
+    if first:
+      total += lookup_table[first.group()] * 10 + lookup_table[last.group()]
+  return total
+
+def solve_with_numpy(part, data):
+  if part != 1 or not optional.available('numpy'):
+    return NotImplemented
+  return numpy_sum_calibration_values(reader.buffer(data))
+
+ENGINES = { 'lines' : solve_by_lines, 'numpy' : solve_with_numpy }
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
+
+if __name__ == '__main__':
+  if len(sys.argv) not in (3, 4):
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path> [<workers>]')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  if len(sys.argv) == 4:
+    print(solve_file(int(part), file_path, int(sys.argv[3])))
+    exit(0)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,27 @@
+from aoc.generate import scaled
+
+
+digit_words = ('one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine')
+letters = 'abcdefghijklmnopqrstuvwxyz'
+
+
+#
+# Lines of random letters with digits and digit words mixed in.  Every line gets at least one real digit so that part 1
+# can always find one.
+#
+def generate_line(rng):
+  tokens = [str(rng.randint(1, 9))]
+  for _ in range(rng.randint(1, 8)):
+    choice = rng.random()
+    if choice < 0.25:
+      tokens.append(str(rng.randint(1, 9)))
+    elif choice < 0.5:
+      tokens.append(rng.choice(digit_words))
+    else:
+      tokens.append(''.join(rng.choice(letters) for _ in range(rng.randint(1, 5))))
+  rng.shuffle(tokens)
+  return ''.join(tokens)
+
+
+def generate(scale, rng):
+  return '\n'.join(generate_line(rng) for _ in range(scaled(1000, scale))) + '\n'
@@ -1,35 +1,24 @@
+import os
 import sys
-import pprint
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
+from aoc import search
+from aoc.grid import Grid
 
-debug_level = 0
 
-def debug_print(s, level = 1):
-  if level > debug_level: return
-  print(s)
+def trace_surface(surface, inside_indexes, outside_indexes, level = 1):
+  if not trace.enabled(level): return
+  surface = surface.copy()
+  for i in inside_indexes:
+    surface.cells[i] = ord('I')
+  for i in outside_indexes:
+    surface.cells[i] = ord('O')
+  trace.grid(level, surface.lines())
 
-#
-# Print a more readable version of our maps
-#
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
-
-
-def debug_print_surface(surface, inside_coordinates, outside_coordinates, level = 1):
-  if level > debug_level: return
-  for coordinate in inside_coordinates:
-    x, y = list(map(int, coordinate.split(',')))
-    surface[y][x] = 'I'
-  for coordinate in outside_coordinates:
-    x, y = list(map(int, coordinate.split(',')))
-    surface[y][x] = 'O'
-  for row in surface:
-    for cell in row:
-      print(cell, end = '')
-    print()
-  
 
 moves = {
   'N' : [  0, -1 ],
@@ -49,34 +38,23 @@ pipes = {
 }
 
 
-def init(file_path):
-  with open(file_path, 'r') as lines:
-    start_x = 0
-    start_y = 0
-    surface = []
-    lines = (line.rstrip('\n') for line in lines)
-    for y, line in enumerate(lines):
-      debug_print(line)
-      row = []
-      for x, c in enumerate(line):
-        row.append(c)
-        if c == 'S':
-          start_x = x
-          start_y = y
-      surface.append(row)
-    return surface, start_x, start_y
+def init(data):
+  surface = Grid.from_text(data)
+  trace.grid(1, surface.lines())
+  start_x, start_y = surface.find('S')
+  return surface, start_x, start_y
 
 
 def calc_valid_moves(surface, start_x, start_y):
   valid_moves = []
-  surface_width, surface_height = len(surface[0]), len(surface)
+  surface_width, surface_height = surface.width, surface.height
   x, y = start_x, start_y
   for move, offset in moves.items():
     new_x = x + offset[0]
     new_y = y + offset[1]
     if new_x < 0 or new_x >= surface_width: continue
     if new_y < 0 or new_y >= surface_height: continue
-    new_cell = surface[new_y][new_x]
+    new_cell = surface[new_x, new_y]
     if new_cell == '.': continue
     if new_cell == 'S': continue   # Shouldn't happen
     pipe = pipes[new_cell]
@@ -87,54 +65,51 @@ def calc_valid_moves(surface, start_x, start_y):
   return valid_moves
 
 
-def follow_pipe(surface, start_x, start_y, initial_move):
-  x, y = start_x, start_y
-  cell = surface[y][x]
-  distance = 0
-  path = []
-  distances = {}
-  move = initial_move
-
-  debug_print('\nfollow_pipe ...', 2)
-  done = False
-  while not done:
-    coordinate = f'{x},{y}'
-    element = { 'x' : x, 'y' : y, 'coordinate' : coordinate, 'cell' : cell, 'distance' : distance }
-    debug_print(element, 2)
-    path.append(element)
-    distances[coordinate] = distance
-    offset = moves[move]
-    new_x = x + offset[0]
-    new_y = y + offset[1]
-    new_cell = surface[new_y][new_x]
-    if new_cell == 'S': break
-    move = pipes[new_cell]['to_moves'][move]
-    x, y, cell = new_x, new_y, new_cell
-    distance += 1
+#
+# The number of steps along the loop from the start to each cell, keyed by the cell's flat index in the surface (y *
+# width + x, see aoc.grid), or -1 for the cells not on the loop.  Each pipe leads to the cells at the ends of its to
+# moves and the start to those of its valid moves, and the loop's the only thing connected to the start, so a breadth
+# first search from the start goes both ways round it at once (see aoc.search.bfs).
+#
+def loop_distances(surface, start_x, start_y, valid_moves):
+  width, cells = surface.width, surface.cells
+
+  def offsets(pipe_moves):
+    return [moves[move][1] * width + moves[move][0] for move in pipe_moves]
 
-  return distances
+  pipe_offsets = { ord(pipe) : offsets(set(info['to_moves'].values())) for pipe, info in pipes.items() }
+  pipe_offsets[ord('S')] = offsets(valid_moves)
 
+  def neighbours(i):
+    return [i + offset for offset in pipe_offsets[cells[i]]]
 
-def part_n(file_path, fn):
-  surface, start_x, start_y = init(file_path)
-  debug_print(f'start_x = {start_x}, start_y  = {start_y}')
+  return search.bfs([start_y * width + start_x], neighbours, len(cells))
+
+
+#
+# Find the start and trace the loop once for both parts.  Returns (surface, start_x, start_y, valid_moves, distances).
+#
+def parse(data):
+  surface, start_x, start_y = init(data)
+  trace.log(1, 'start_x = %s, start_y  = %s', start_x, start_y)
 
   valid_moves = calc_valid_moves(surface, start_x, start_y)
-  debug_print(f'valid_moves: {valid_moves}')
+  trace.log(1, 'valid_moves: %s', valid_moves)
 
-  distances = follow_pipe(surface, start_x, start_y, valid_moves[0])
+  distances = loop_distances(surface, start_x, start_y, valid_moves)
 
-  fn(surface, start_x, start_y, valid_moves, distances)
+  return surface, start_x, start_y, valid_moves, distances
 
 
+#
+# The farthest point from the start is halfway round the loop
+#
 def part_1_fn(surface, start_x, start_y, valid_moves, distances):
-  path_length = len(distances)
-  max_distance = path_length / 2
-  print(max_distance)
+  return max(distances)
 
 
-def part_1(file_path):
-  part_n(file_path, part_1_fn)
+def part_1(parsed):
+  return part_1_fn(*parsed)
 
     
 def replace_s(surface, valid_moves, start_x, start_y):
@@ -144,50 +119,108 @@ def replace_s(surface, valid_moves, start_x, start_y):
     'S' : { 'N' : '|', 'E' : 'F', 'W' : '7'},
     'W' : { 'N' : 'J', 'E' : '-', 'S' : '7'}
   }
-  surface[start_y][start_x] = m[valid_moves[0]][valid_moves[1]]
+  surface[start_x, start_y] = m[valid_moves[0]][valid_moves[1]]
 
 
 def part_2_fn(surface, start_x, start_y, valid_moves, distances):
-  # Replace the starting 'S' with the appropriate pipe character to simplify the calcs below
+  # Replace the starting 'S' with the appropriate pipe character to simplify the calcs below.  That's on a copy of the
+  # surface so that part 1 can use the same one.
+  surface = surface.copy()
   replace_s(surface, valid_moves, start_x, start_y)
   
+  # Only keep the inside and outside cells if we're going to draw them
+  tracing = trace.enabled(1)
   count = 0
-  outside_coordinates = []
-  inside_coordinates = []
-  for y, row in enumerate(surface):
+  outside_indexes = []
+  inside_indexes = []
+  width = surface.width
+  for y, row in enumerate(surface.lines()):
     is_inside = False
     for x, cell in enumerate(row):
-      coordinate = f'{x},{y}'
-      if coordinate in distances.keys():
+      i = y * width + x
+      if distances[i] >= 0:
         if cell in ('|', 'J', 'L'):
           is_inside = not is_inside
-      else:
-        if is_inside:
-          count += 1
-          inside_coordinates.append(coordinate)
-        else:
-          outside_coordinates.append(coordinate)
+      elif is_inside:
+        count += 1
+        if tracing: inside_indexes.append(i)
+      elif tracing:
+        outside_indexes.append(i)
+
+  trace_surface(surface, inside_indexes, outside_indexes)
+
+  return count
+
+
+def part_2(parsed):
+  return part_2_fn(*parsed)
+
+
+#
+# How we used to do it, kept as the reference for aoc.check: the surface as a list of rows, and the loop walked a cell
+# at a time from the start into a set of (x, y), then each row scanned for the cells inside it.  The start counts as a
+# '|', 'J' or 'L' (a crossing) when one of its moves is north.
+#
+def solve_by_walk(part, data):
+  surface = reader.text(data).split()
+  start_y = next(y for y, row in enumerate(surface) if 'S' in row)
+  start_x = surface[start_y].index('S')
+  width, height = len(surface[0]), len(surface)
+
+  valid_moves = []
+  for move, (dx, dy) in moves.items():
+    x, y = start_x + dx, start_y + dy
+    if 0 <= x < width and 0 <= y < height and move in pipes.get(surface[y][x], {}).get('valid_from_moves', []):
+      valid_moves.append(move)
+
+  loop = set()
+  x, y, move = start_x, start_y, valid_moves[0]
+  while True:
+    loop.add((x, y))
+    x, y = x + moves[move][0], y + moves[move][1]
+    if surface[y][x] == 'S':
+      break
+    move = pipes[surface[y][x]]['to_moves'][move]
+  if part == 1:
+    return len(loop) // 2
+
+  count = 0
+  for y, row in enumerate(surface):
+    is_inside = False
+    for x, cell in enumerate(row):
+      if (x, y) in loop:
+        if cell in ('|', 'J', 'L') or (cell == 'S' and 'N' in valid_moves):
+          is_inside = not is_inside
+      elif is_inside:
+        count += 1
+  return count
+
+ENGINES = { 'walk' : solve_by_walk }
+
 
-  debug_print_surface(surface, inside_coordinates, outside_coordinates)
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
 
-  print(count)
 
+def solve(part, data):
+  return solve_parsed(part, parse(data))
 
-def part_2(file_path):
-  part_n(file_path, part_2_fn)
 
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
+  part = sys.argv[1]
+  file_path = sys.argv[2]
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
 
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,52 @@
+from aoc.generate import scaled_dims
+
+
+pipes_by_connections = {
+  frozenset('NS') : '|',
+  frozenset('EW') : '-',
+  frozenset('NE') : 'L',
+  frozenset('NW') : 'J',
+  frozenset('SW') : '7',
+  frozenset('SE') : 'F'
+}
+
+moves = { 'N' : (0, -1), 'E' : (1, 0), 'S' : (0, 1), 'W' : (-1, 0) }
+opposites = { 'N' : 'S', 'E' : 'W', 'S' : 'N', 'W' : 'E' }
+
+
+#
+# The loop is the outline of a 'skyline': it goes up the left hand side, along the tops of a row of columns of random
+# heights, down the right hand side and back along the bottom.  Columns are 2 cells wide and heights are odd so that no
+# two parts of the loop touch.  The start 'S' is the bottom left corner.  Everything that isn't on the loop is random
+# pipe junk, apart from the cells next to 'S' which are '.' so that 'S' only connects to the loop.
+#
+def loop_moves(rng, width, height):
+  bottom = height - 2
+  num_columns = (width - 3) // 2
+  tops = [rng.randrange(1, bottom - 1, 2) for _ in range(num_columns)]
+  steps = ['N'] * (bottom - tops[0])
+  for n, top in enumerate(tops):
+    steps += ['E'] * 2
+    next_top = tops[n + 1] if n + 1 < num_columns else bottom
+    steps += ['S' if next_top > top else 'N'] * abs(next_top - top)
+  steps += ['W'] * (2 * num_columns)
+  return steps
+
+
+def generate(scale, rng):
+  width, height = scaled_dims(140, 140, scale)
+  width, height = max(width, 7), max(height, 7)
+  grid = [[rng.choice('|-LJ7F..') for _ in range(width)] for _ in range(height)]
+
+  steps = loop_moves(rng, width, height)
+  x, y = 1, height - 2
+  for n, step in enumerate(steps):
+    next_step = steps[(n + 1) % len(steps)]
+    dx, dy = moves[step]
+    x, y = x + dx, y + dy
+    grid[y][x] = pipes_by_connections[frozenset((opposites[step], next_step))]
+
+  grid[height - 2][1] = 'S'
+  grid[height - 2][0] = '.'
+  grid[height - 1][1] = '.'
+  return '\n'.join(''.join(row) for row in grid) + '\n'
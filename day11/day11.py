@@ -1,60 +1,32 @@
+import os
 import sys
-import pprint
 from itertools import combinations
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc.grid import Grid
 
-debug_level = 0
 
-def debug_print(s, level = 1):
-  if level > debug_level: return
-  print(s)
-
-#
-# Print a more readable version of our maps
-#
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
-
-
-def debug_print_image(image, level = 1):
-  if level > debug_level: return
-  for row in image:
-    for c in row:
-      print(c, end = '')
-    print('')
-
-
-def init_image(file_path):
-  image = []
+def parse(data):
+  image = Grid.from_text(data)
   rows_with_galaxy = set()
   cols_with_galaxy = set()
   galaxies = {}
-  with open(file_path, 'r') as lines:
-    lines = (line.rstrip('\n') for line in lines)
-    galaxy_number = 1
-    for y, line in enumerate(lines):
-      row = []
-      for x, c in enumerate(line):
-        if c == '#':
-          cols_with_galaxy.add(x)
-          rows_with_galaxy.add(y)
-          galaxies[galaxy_number] = (x, y)
-          galaxy_number += 1
-        row.append(c)
-      image.append(row)
-
-  image_height = len(image)
-  image_width = len(image[0])
-  rows_without_galaxy = set(range(image_height)) - rows_with_galaxy
-  cols_without_galaxy = set(range(image_width)) - cols_with_galaxy
-
-  return image, rows_without_galaxy, cols_without_galaxy, galaxies
+  for galaxy_number, (x, y) in enumerate(image.find_all('#'), 1):
+    cols_with_galaxy.add(x)
+    rows_with_galaxy.add(y)
+    galaxies[galaxy_number] = (x, y)
+
+  rows_without_galaxy = set(range(image.height)) - rows_with_galaxy
+  cols_without_galaxy = set(range(image.width)) - cols_with_galaxy
+
+  # Both parts only need the empty rows and columns and where the galaxies are, not the image
+  return rows_without_galaxy, cols_without_galaxy, galaxies
   
 
-def part_n(file_path, expansion_factor):
-  _, rows_without_galaxy, cols_without_galaxy, galaxies = init_image(file_path)
+def part_n(parsed, expansion_factor):
+  rows_without_galaxy, cols_without_galaxy, galaxies = parsed
   num_galaxies = len(galaxies.keys())
   galaxy_pairs = combinations(range(1, num_galaxies + 1), 2)
 
@@ -76,7 +48,7 @@ def part_n(file_path, expansion_factor):
   #
   # It seems that the shortest path is just delta_x + delta_y
   #
-  shortest_paths = []
+  total = 0
   for pair in galaxy_pairs:
     galaxy0 = galaxies[pair[0]]
     galaxy1 = galaxies[pair[1]]
@@ -91,30 +63,42 @@ def part_n(file_path, expansion_factor):
     delta_x = max_x - min_x + (col_count * (expansion_factor - 1))
     delta_y = max_y - min_y + (row_count * (expansion_factor - 1))
     distance = delta_x + delta_y
-    shortest_paths.append(distance)
+    total += distance
   
-  print(sum(shortest_paths))
+  return total
   
 
-def part_1(file_path):
-  part_n(file_path, 2)
+def part_1(parsed):
+  return part_n(parsed, 2)
+
+
+def part_2(parsed):
+  return part_n(parsed, 1_000_000)
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
 
+def solve(part, data):
+  return solve_parsed(part, parse(data))
 
-def part_2(file_path):
-  part_n(file_path, 1_000_000)
 
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
+  part = sys.argv[1]
+  file_path = sys.argv[2]
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
 
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,18 @@
+from aoc.generate import scaled_dims
+
+
+#
+# Galaxies scattered at random, with about 5% of the rows and columns left empty so that there's something to expand
+#
+def generate(scale, rng):
+  width, height = scaled_dims(140, 140, scale)
+  empty_rows = set(rng.sample(range(height), height // 20))
+  empty_cols = set(rng.sample(range(width), width // 20))
+  lines = []
+  for y in range(height):
+    row = []
+    for x in range(width):
+      is_galaxy = y not in empty_rows and x not in empty_cols and rng.random() < 0.02
+      row.append('#' if is_galaxy else '.')
+    lines.append(''.join(row))
+  return '\n'.join(lines) + '\n'
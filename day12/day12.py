@@ -1,23 +1,15 @@
+import os
 import sys
-import pprint
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import instrument
+from aoc import reader
 
-cache = {}
-
-
-debug_level = 0
 
-def debug_print(s, level = 1):
-  if level > debug_level: return
-  print(s)
-
-#
-# Print a more readable version of our maps
-#
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
+cache = {}
 
 
 def replace_in_pattern(pattern, values):
@@ -59,74 +51,84 @@ def possible_records(space_length, block_lengths):
         yield '.' * n + '#' * block_length + '.' + line
 
 
+#
+# Each record as its pattern and its list of block lengths
+#
+def parse(data):
+  records = []
+  for line in reader.text(data).splitlines():
+    pattern, block_lengths_string = line.split(' ')
+    records.append((pattern, [int(x) for x in block_lengths_string.split(',')]))
+  return records
+
+
 #
 # Brute force ...
 #
-def part_1(file_path):
-  with open(file_path, 'r') as lines:
-    lines = (line.rstrip('\n') for line in lines)
-    counts = []
-    for line in lines:
-      pattern, block_lengths_string = line.split(' ')
-      block_lengths = list(map(int, block_lengths_string.split(',')))
-      count = 0
-      for record in possible_records(len(pattern), block_lengths):
-        if(filter_record(record, pattern)):
-          count += 1
-      counts.append(count)
-    print(sum(counts))
+def part_1(records):
+  counts = []
+  for pattern, block_lengths in records:
+    count = 0
+    for record in possible_records(len(pattern), block_lengths):
+      if(filter_record(record, pattern)):
+        count += 1
+    counts.append(count)
+  return sum(counts)
 
 
 #
 # i   - index of current char in pattern
 # bi  - index of current block_length in block_lengths
 # cbl - current block length
-# chc - cache hit count
-# cc  - call count
 #
-def process_line(pattern, block_lengths, i, bi, cbl, level = 0, chc = 0, cc = 0, use_cache = False):
-  cc += 1
-  pad = ' ' * level
+# We count calls and cache hits with aoc.instrument (see the stats below)
+#
+def process_line(pattern, block_lengths, i, bi, cbl, level = 0, use_cache = False):
+  if __debug__ and instrument.enabled: instrument.counters['calls'] += 1
   pattern_char = pattern[i] if i < len(pattern) else ''
-  debug_print(f"{pad}PL {level}: {pattern}, '{pattern_char}', {block_lengths}, {i}, {bi}, {cbl}", 2)
+  if __debug__ and trace.level >= 2:
+    trace.log(2, "%*sPL %s: %s, '%s', %s, %s, %s, %s",
+              level, '', level, pattern, pattern_char, block_lengths, i, bi, cbl)
   key = (i, bi, cbl)
   if key in cache:
-    chc += 1
-    debug_print(f'{pad}PL {level}: return from cache ({cache[key]}, {chc})', 2)
-    return (cache[key], chc, cc)
+    if __debug__ and instrument.enabled: instrument.counters['cache_hits'] += 1
+    if __debug__ and trace.level >= 2: trace.log(2, '%*sPL %s: return from cache (%s)', level, '', level, cache[key])
+    return cache[key]
   
   if i == len(pattern):
-    debug_print(f'{pad}PL {level}: past end of pattern', 2)
+    if __debug__ and trace.level >= 2: trace.log(2, '%*sPL %s: past end of pattern', level, '', level)
     if bi == len(block_lengths) and cbl == 0:
-      debug_print(f'{pad}PL {level}: MATCH return (1, {chc})', 2)
-      return (1, chc, cc)
+      if __debug__ and trace.level >= 2: trace.log(2, '%*sPL %s: MATCH return 1', level, '', level)
+      return 1
     elif bi == len(block_lengths) - 1 and block_lengths[bi] == cbl:
-      debug_print(f'{pad}PL {level}: MATCH - return (1, {chc})', 2)
-      return (1, chc, cc)
+      if __debug__ and trace.level >= 2: trace.log(2, '%*sPL %s: MATCH - return 1', level, '', level)
+      return 1
     else:
-      debug_print(f'{pad}PL {level}: NO MATCH return (0, {chc})', 2)
-      return (0, chc, cc)
+      if __debug__ and trace.level >= 2: trace.log(2, '%*sPL %s: NO MATCH return 0', level, '', level)
+      return 0
     
   count = 0
   for c in ['.', '#']:
-    debug_print(f'{pad}PL {level}: c = {c}', 2)
+    if __debug__ and trace.level >= 2: trace.log(2, '%*sPL %s: c = %s', level, '', level, c)
     if pattern[i] == c or pattern[i] == '?':
       if c == '.' and cbl == 0:
-        debug_print(f"{pad}PL {level}: '.', not in a block -> call PL for next pattern char", 2)
-        (subcount, chc, cc) = process_line(pattern, block_lengths, i + 1, bi, 0, level + 1, chc, cc, use_cache)
-        count += subcount
+        if __debug__ and trace.level >= 2:
+          trace.log(2, "%*sPL %s: '.', not in a block -> call PL for next pattern char", level, '', level)
+        count += process_line(pattern, block_lengths, i + 1, bi, 0, level + 1, use_cache)
       elif c == '.' and cbl > 0 and bi < len(block_lengths) and block_lengths[bi] == cbl:
-        debug_print(f"{pad}PL {level}: '.', end of block, more blocks -> call PL for next pattern char, next block", 2)
-        (subcount, chc, cc) = process_line(pattern, block_lengths, i + 1, bi + 1, 0, level + 1, chc, cc, use_cache)
-        count += subcount
+        if __debug__ and trace.level >= 2:
+          trace.log(2, "%*sPL %s: '.', end of block, more blocks -> call PL for next pattern char, next block",
+                    level, '', level)
+        count += process_line(pattern, block_lengths, i + 1, bi + 1, 0, level + 1, use_cache)
       elif c == '#':
-        debug_print(f"{pad}PL {level}: '#', in a block -> call PL for next pattern char in this block, cbl + 1", 2)
-        (subcount, chc, cc) = process_line(pattern, block_lengths, i + 1, bi, cbl + 1, level + 1, chc, cc, use_cache)
-        count += subcount
+        if __debug__ and trace.level >= 2:
+          trace.log(2, "%*sPL %s: '#', in a block -> call PL for next pattern char in this block, cbl + 1",
+                    level, '', level)
+        count += process_line(pattern, block_lengths, i + 1, bi, cbl + 1, level + 1, use_cache)
 
-  debug_print(f'{pad}PL {level}: return ({count}, {chc}, {cc})', 2)
+  if __debug__ and trace.level >= 2: trace.log(2, '%*sPL %s: return %s', level, '', level, count)
   if(use_cache): cache[key] = count
-  return (count, chc, cc)
+  return count
   
 
 #
@@ -136,52 +138,52 @@ def process_line(pattern, block_lengths, i, bi, cbl, level = 0, chc = 0, cc = 0,
 # Programming.  The caching logic is in the process_line function above.  Here are some stats from procesing
 # test-input.txt with and wihtout caching ...
 #
-# $ python3 day12.py 2 test-input.txt 1    // with caching
-# total_cache_hit_count = 109, total_call_count = 5484
-# 525152
+# $ python3 -m aoc.runner --days 12 --parts 2 --input test-input.txt --counters    // with caching
+# calls=5484, cache_hits=109
 #
-# $ python3 day12.py 2 test-input.txt 0    // without caching
-# total_cache_hit_count = 0, total_call_count = 8841827
-# 525152
+# ... and without caching (solve(2, data, use_cache = False)) ...
+# calls=8841827, cache_hits=0
 #
 # Total calls to process_line went from 8,841,827 to just 5,484
 #
-def part_2(file_path, use_cache):
-  with open(file_path, 'r') as lines:
-    lines = (line.rstrip('\n') for line in lines)
-    counts = []
-    total_cache_hit_count = 0
-    total_call_count = 0
-    for line in lines:
-      pattern, block_lengths_string = line.split(' ')
-      pattern = '?'.join([pattern] * 5)
-      block_lengths_string = ','.join([block_lengths_string] * 5)
-      block_lengths = [int(x) for x in block_lengths_string.split(',')]
-      cache.clear()
-      cache_hit_count = 0
-      (count, cache_hit_count, call_count) = process_line(pattern, block_lengths, 0, 0, 0, 0, 0, 0, use_cache)
-      debug_print(f'{pattern}, {block_lengths}, {count}, cache_hit_count = {cache_hit_count}')
-      counts.append(count)
-      total_cache_hit_count += cache_hit_count
-      total_call_count += call_count
-      debug_pretty_print(cache, 2)
-    print(f'total_cache_hit_count = {total_cache_hit_count}, total_call_count = {total_call_count}')
-    print(sum(counts))
-
-
-if len(sys.argv) != 4:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path> <use_cache>')
-  exit(1)
-
-part = sys.argv[1]
-file_path = sys.argv[2]
-use_cache = int(sys.argv[3])
-use_cache = True if use_cache == 1 else False
-
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path, use_cache)
-else:
-  print('Unknown part')
-  exit(1)
+def part_2(records, use_cache):
+  counts = []
+  for pattern, block_lengths in records:
+    pattern = '?'.join([pattern] * 5)
+    block_lengths = block_lengths * 5
+    cache.clear()
+    count = process_line(pattern, block_lengths, 0, 0, 0, 0, use_cache)
+    trace.log(1, '%s, %s, %s', pattern, block_lengths, count)
+    counts.append(count)
+    trace.pprint(2, cache)
+  return sum(counts)
+
+
+def solve_parsed(part, parsed, use_cache = True):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed, use_cache)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data, use_cache = True):
+  return solve_parsed(part, parse(data), use_cache)
+
+
+if __name__ == '__main__':
+  if len(sys.argv) not in (3, 4):
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path> [<use_cache>]')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+  use_cache = int(sys.argv[3]) if len(sys.argv) == 4 else 1
+  use_cache = True if use_cache == 1 else False
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read(), use_cache))
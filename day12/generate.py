@@ -0,0 +1,18 @@
+from aoc.generate import scaled
+
+
+#
+# Generate a random row of springs with at least one damaged one, work out its block lengths and then hide about half of
+# the springs behind '?'
+#
+def generate_line(rng):
+  length = rng.randint(6, 20)
+  springs = [rng.choice('#..') for _ in range(length)]
+  springs[rng.randrange(length)] = '#'
+  blocks = [len(block) for block in ''.join(springs).split('.') if block]
+  pattern = ''.join('?' if rng.random() < 0.45 else c for c in springs)
+  return f"{pattern} {','.join(map(str, blocks))}"
+
+
+def generate(scale, rng):
+  return '\n'.join(generate_line(rng) for _ in range(scaled(1000, scale))) + '\n'
@@ -1,36 +1,11 @@
+import os
 import sys
-import pprint
 
-
-debug_level = 0
-
-def debug_print(s, level = 1):
-  if level > debug_level: return
-  print(s)
-
-#
-# Print a more readable version of our maps
-#
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
-
-
-#
-# Split a list into an iterable of sublists based on a test of whether a given list element is a separator
-# Examples
-#   [1, 2, sep, 3, sep, sep, 4, 5, 6] -> [[1, 2], [3], [], [4, 5, 6]]
-#
-def split_list(iterable, separator_fn):
-  list = []
-  for item in iterable:
-    if separator_fn(item):
-      yield list
-      list.clear()
-      continue
-    list.append(item)
-  yield list
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import reader
+from aoc.grid import Grid
 
 
 #
@@ -50,7 +25,57 @@ def split_list(iterable, separator_fn):
 #       vv  test_col = 6, num_cols - test_col - 2 = 0, test_width = 0
 # xxxxxxxx
 #
-def find_reflection_col(grid_rows, target_diff_count):
+# We compare whole columns at a time and only count the differing cells when the columns aren't equal
+#
+def find_reflection_col(grid, target_diff_count):
+  cols = [bytes(col) for col in grid.cols()]
+  num_cols = grid.width
+  for test_col in range(num_cols - 1):
+    diff_count = 0
+    test_width = min(test_col, num_cols - test_col - 2)
+    for n in range(0, test_width + 1):
+      lc, rc = cols[test_col - n], cols[test_col + n + 1]
+      if lc != rc:
+        diff_count += sum(l != r for l, r in zip(lc, rc))
+    if diff_count == target_diff_count:
+      return test_col
+  return -1
+
+
+#
+# Each pattern, along with its transpose so that we can look for reflections across rows the same way as across columns
+#
+def parse(data):
+  grids = []
+  for lines in reader.blocks(data):
+    grid = Grid.from_lines(lines)
+    grids.append((grid, grid.transposed()))
+  return grids
+
+
+def part_n(grids, target_diff_count):
+  answer = 0
+  for grid, transposed in grids:
+    col = find_reflection_col(grid, target_diff_count)
+    if col != -1: answer += (col + 1)
+    row = find_reflection_col(transposed, target_diff_count)
+    if row != -1: answer += 100 * (row + 1)
+  return answer
+
+
+def part_1(grids):
+  return part_n(grids, 0)
+
+
+def part_2(grids):
+  return part_n(grids, 1)
+
+
+#
+# How we used to do it, kept as the reference for aoc.check: each pattern as a list of rows of characters, and every
+# cell either side of each candidate line compared with its reflection
+#
+def find_reflection_col_by_cells(grid_rows, target_diff_count):
   num_rows = len(grid_rows)
   num_cols = len(grid_rows[0])
   for test_col in range(num_cols - 1):
@@ -59,47 +84,53 @@ def find_reflection_col(grid_rows, target_diff_count):
     for n in range(0, test_width + 1):
       for row_n in range(num_rows):
         l, r = test_col - n, test_col + n + 1
-        lc, rc = grid_rows[row_n][l], grid_rows[row_n][r]
-        if lc != rc:
+        if grid_rows[row_n][l] != grid_rows[row_n][r]:
           diff_count += 1
     if diff_count == target_diff_count:
       return test_col
   return -1
 
 
-def part_n(file_path, target_diff_count):
-  with open(file_path, 'r') as lines:
-    lines = (line.rstrip('\n') for line in lines)
-    answer = 0
-    for grid in split_list(lines, lambda line: len(line) == 0):
-      grid_rows = [[c for c in line] for line in grid]
-      grid_cols = [[c for c in col] for col in zip(*grid_rows)]
-      col = find_reflection_col(grid_rows, target_diff_count)
-      if col != -1: answer += (col + 1)
-      row = find_reflection_col(grid_cols, target_diff_count)
-      if row != -1: answer += 100 * (row + 1)
-    print(answer)
+def solve_by_cells(part, data):
+  target_diff_count = part - 1
+  answer = 0
+  for pattern in reader.text(data).replace('\r', '').split('\n\n'):
+    grid_rows = [list(line) for line in pattern.split()]
+    if not grid_rows:
+      continue
+    grid_cols = [list(col) for col in zip(*grid_rows)]
+    col = find_reflection_col_by_cells(grid_rows, target_diff_count)
+    if col != -1: answer += (col + 1)
+    row = find_reflection_col_by_cells(grid_cols, target_diff_count)
+    if row != -1: answer += 100 * (row + 1)
+  return answer
+
+ENGINES = { 'cells' : solve_by_cells }
+
 
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
 
-def part_1(file_path):
-  part_n(file_path, 0)
 
+def solve(part, data):
+  return solve_parsed(part, parse(data))
 
-def part_2(file_path):
-  part_n(file_path, 1)
 
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
+  part = sys.argv[1]
+  file_path = sys.argv[2]
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
 
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
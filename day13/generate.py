@@ -0,0 +1,39 @@
+from aoc.generate import scaled
+
+
+def fold(n, mirror):
+  return 2 * mirror + 1 - n if mirror < n <= 2 * mirror + 1 else n
+
+
+#
+# Each block reflects perfectly about a vertical line (part 1) and about a horizontal line except for one smudge (part
+# 2).  We fill in one quadrant at random and mirror it, keeping the reflections short of the far edges so that there's
+# room for a smudge that's inside the horizontal reflection but outside the vertical one.  Half of the blocks get
+# transposed so that both kinds of answer turn up in each part.
+#
+def generate_block(rng):
+  width, height = rng.randint(5, 17), rng.randint(5, 17)
+  mirror_col = rng.randint(0, (width - 3) // 2)
+  mirror_row = rng.randint(0, (height - 2) // 2)
+  cells = {}
+  rows = []
+  for y in range(height):
+    row = []
+    for x in range(width):
+      key = (fold(y, mirror_row), fold(x, mirror_col))
+      if key not in cells:
+        cells[key] = rng.choice('#.')
+      row.append(cells[key])
+    rows.append(row)
+
+  y = rng.randint(0, 2 * mirror_row + 1)
+  x = rng.randint(2 * mirror_col + 2, width - 1)
+  rows[y][x] = '#' if rows[y][x] == '.' else '.'
+
+  if rng.random() < 0.5:
+    rows = [list(col) for col in zip(*rows)]
+  return '\n'.join(''.join(row) for row in rows)
+
+
+def generate(scale, rng):
+  return '\n\n'.join(generate_block(rng) for _ in range(scaled(100, scale))) + '\n'
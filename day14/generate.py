@@ -0,0 +1,9 @@
+from aoc.generate import scaled_dims
+
+
+def generate(scale, rng):
+  width, height = scaled_dims(100, 100, scale)
+  lines = []
+  for _ in range(height):
+    lines.append(''.join(rng.choices('O#.', weights = (20, 15, 65), k = width)))
+  return '\n'.join(lines) + '\n'
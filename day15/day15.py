@@ -1,22 +1,15 @@
+import os
 import sys
 import re
-import pprint
 from functools import reduce
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import reader
 
-debug_level = 1
 
-def debug_print(s, level = 1):
-  if level > debug_level: return
-  print(s)
-
-#
-# Print a more readable version of our maps
-#
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
+STEP_PATTERN = re.compile(r'^([a-z]*)(=|-)(\d*)')
 
 
 def hash_char(accumulator, c):
@@ -27,10 +20,12 @@ def hash(s):
   return reduce(hash_char, s, 0)
 
 
-def part_1(file_path):
-  with open(file_path, 'r') as lines:
-    tokens = ''.join((line.rstrip('\n') for line in lines)).split(',')
-    print(sum(map(hash, tokens)))
+def parse(data):
+  return ''.join(reader.text(data).splitlines()).split(',')
+
+
+def part_1(tokens):
+  return sum(map(hash, tokens))
 
 
 def op_dash(boxes, label, _):
@@ -54,31 +49,41 @@ def op_equals(boxes, label, focal_length):
   boxes[label_hash].append([label, int(focal_length)])
 
 
-def part_2(file_path):
-  with open(file_path, 'r') as lines:
-    tokens = ''.join((line.rstrip('\n') for line in lines)).split(',')
-    boxes = {}
-    for token in tokens:
-      label, op, focal_length = re.match(r'^([a-z]*)(=|-)(\d*)', token).groups()
-      { '-' : op_dash, '=' : op_equals }[op](boxes, label, focal_length)
-    answer = 0
-    for k, list in boxes.items():
-      for n, elem in enumerate(list):
-        answer += (int(k) + 1) * (n + 1) * elem[1]
-    print(answer)
-
-
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
-
-part = sys.argv[1]
-file_path = sys.argv[2]
-
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+def part_2(tokens):
+  boxes = {}
+  for token in tokens:
+    label, op, focal_length = STEP_PATTERN.match(token).groups()
+    { '-' : op_dash, '=' : op_equals }[op](boxes, label, focal_length)
+  answer = 0
+  for k, list in boxes.items():
+    for n, elem in enumerate(list):
+      answer += (int(k) + 1) * (n + 1) * elem[1]
+  return answer
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,21 @@
+import string
+
+from aoc.generate import scaled
+
+
+#
+# Steps are drawn from a fixed pool of labels so that the same lenses get replaced and removed, as in a real input.  The
+# pool drops repeats with a dict rather than a set so its order, and so the input for a seed, doesn't depend on the
+# hash seed.
+#
+def make_label(rng):
+  return ''.join(rng.choices(string.ascii_lowercase, k = rng.randint(2, 6)))
+
+
+def generate(scale, rng):
+  labels = list(dict.fromkeys(make_label(rng) for _ in range(scaled(500, scale))))
+  steps = []
+  for _ in range(scaled(4000, scale)):
+    label = rng.choice(labels)
+    steps.append(f'{label}-' if rng.random() < 0.3 else f'{label}={rng.randint(1, 9)}')
+  return ','.join(steps) + '\n'
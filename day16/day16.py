@@ -1,144 +1,215 @@
+import os
 import sys
-import pprint
-from copy import deepcopy
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import search
+from aoc import instrument
+from aoc.grid import Grid
 
-debug_level = 0
 
-def debug_print(s = '', level = 1, end = '\n'):
-  if level > debug_level: return
-  print(s, end=end)
+#
+# Directions are 0 to 3 for N, E, S, W so that they can index these tables and be bits in a mask
+#
+N, E, S, W = range(4)
+direction_names = 'NESW'
+delta_x = (0, 1, 0, -1)
+delta_y = (-1, 0, 1, 0)
+
+SPLIT_NS = ord('|')
+SPLIT_EW = ord('-')
+MIRROR_SLASH = ord('/')
+MIRROR_BACKSLASH = ord('\\')
+
+new_direction = {
+  MIRROR_SLASH : (E, N, W, S),
+  MIRROR_BACKSLASH : (W, S, E, N)
+}
+
+
+EMPTY = ord('.')
+
+
+#
+# The directions a beam heading in direction leaves a cell in
+#
+def out_directions(c, direction):
+  if c == SPLIT_EW and direction in (N, S):
+    return (E, W)
+  if c == SPLIT_NS and direction in (E, W):
+    return (N, S)
+  if c == MIRROR_SLASH or c == MIRROR_BACKSLASH:
+    return (new_direction[c][direction],)
+  return (direction,)
+
+
+#
+# Follow a beam from cell i heading in direction across empty cells.  Returns the cells it lights up and the state
+# (index * 4 + direction) at the next mirror or splitter it gets to, or None if it leaves the grid first.
+#
+def run(grid, i, direction):
+  width, height, cells = grid.width, grid.height, grid.cells
+  x, y = i % width, i // width
+  lit = []
+  while 0 <= x < width and 0 <= y < height:
+    i = y * width + x
+    if cells[i] != EMPTY:
+      return lit, i * 4 + direction
+    lit.append(i)
+    x, y = x + delta_x[direction], y + delta_y[direction]
+  return lit, None
+
+
+#
+# The beams as a graph.  A node is a beam getting to a mirror or splitter in a direction, as state index * 4 +
+# direction, and its neighbours are the nodes the beams leaving it get to next.  Each node also has the cells it lights
+# up: its own and the empty cells on the way to the next nodes.  Then the cells a beam energizes are the cells of the
+# nodes reachable from where it first meets a mirror or splitter (see aoc.search.reachable), and a beam that gets to a
+# node it has already been to is in a loop.  That's a few thousand nodes, rather than a step for every cell a beam goes
+# through, every time.
+#
+class BeamGraph():
+  def __init__(self, grid):
+    width, height, cells = grid.width, grid.height, grid.cells
+    self.grid = grid
+    self.size = width * height * 4
+    self.next_nodes = [()] * self.size
+    self.lit = [()] * self.size
+    for i, c in enumerate(cells):
+      if c == EMPTY: continue
+      x, y = i % width, i // width
+      for direction in range(4):
+        lit = [i]
+        next_nodes = []
+        for out_direction in out_directions(c, direction):
+          next_x, next_y = x + delta_x[out_direction], y + delta_y[out_direction]
+          if not (0 <= next_x < width and 0 <= next_y < height): continue
+          run_lit, node = run(grid, next_y * width + next_x, out_direction)
+          lit += run_lit
+          if node is not None: next_nodes.append(node)
+        self.next_nodes[i * 4 + direction] = next_nodes
+        self.lit[i * 4 + direction] = lit
+
+  #
+  # The number of cells energized by a beam coming in at (start_x, start_y) heading in direction
+  #
+  def count_energized(self, start_x, start_y, direction):
+    lit, node = run(self.grid, start_y * self.grid.width + start_x, direction)
+    energized = set(lit)
+    if node is not None:
+      for node in search.reachable([node], self.next_nodes.__getitem__, self.size):
+        energized.update(self.lit[node])
+    return len(energized)
+
+
+def read_grid(data):
+  grid = Grid.from_text(data)
+  trace.grid(1, grid.lines())
+  return grid
+
+
+#
+# Build the beam graph once for both parts.  The grid is there as graph.grid.
+#
+def parse(data):
+  return BeamGraph(read_grid(data))
 
+
+def part_1(graph):
+  return graph.count_energized(0, 0, E)
+
+
+#
+# The beams coming in from every edge cell, as (x, y, direction)
+#
+def edge_beams(grid):
+  width, height = grid.width, grid.height
+  for x in range(width):
+    yield x, 0, S
+    yield x, height - 1, N
+  for y in range(height):
+    yield 0, y, E
+    yield width - 1, y, W
+
+
+#
+# Try a beam coming in from every edge cell, all in the one beam graph
+#
+def part_2(graph):
+  count_energized = graph.count_energized
+  max_count = 0
+  for x, y, direction in edge_beams(graph.grid):
+    count = count_energized(x, y, direction)
+    trace.log(1, '%s, %s %s', x, y, count)
+    max_count = max(max_count, count)
+  return max_count
+
+
+#
+# How we used to do it, kept as the reference for aoc.check: follow each beam a cell at a time, with a stack of the
+# beams still to follow when one splits and a bit mask per cell of the directions beams have passed through it in, so a
+# beam that gets to a cell it has already been through in the same direction is in a loop and we can stop following it.
 #
-# Print a more readable version of our maps
-#
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
-
-
-def new_xy(x, y, direction):
-  delta_x = { 'N' : 0, 'E' : 1, 'S' : 0, 'W' : -1 }
-  delta_y = { 'N' : -1, 'E' : 0, 'S' : 1, 'W' : 0 }
-  return x + delta_x[direction], y + delta_y[direction]
-
-
-def new_direction(mirror, direction):
-  map = {
-    '/' : { 'N' : 'E', 'E' : 'N', 'S' : 'W', 'W' : 'S' },
-    '\\' : { 'N' : 'W', 'E' : 'S', 'S' : 'E', 'W' : 'N' }
-  }
-  return map[mirror][direction]
-
-
-def update_grid(grid, start_xy, direction, level = 0):
-  x, y = start_xy
-  while True:
-    if x < 0 or x == len(grid[0]) or y < 0 or y == len(grid):
-      debug_print('out of bounds', 2)
-      break
-
-    key = (x, y, direction)
-    cell = grid[y][x]
-    set = cell[2]
-    if key in set:
-      debug_print('loop', 2)
-      break
-
-    set.add(key)
-    cell[1] += 1
-    c = cell[0]
-  
-    debug_print(f"{level}: {x}, {y}, {direction} : '{c}'", 2)
-
-    if c == '-' and direction in ('N', 'S'):
-      update_grid(grid, new_xy(x, y, 'E'), 'E', level + 1)
-      update_grid(grid, new_xy(x, y, 'W'), 'W', level + 1)
-      break
-    elif c == '|' and direction in ('E', 'W'):
-      update_grid(grid, new_xy(x, y, 'N'), 'N', level + 1)
-      update_grid(grid, new_xy(x, y, 'S'), 'S', level + 1)
-      break
-    elif c in ('/', '\\'):
-      direction = new_direction(c, direction)
-      update_grid(grid, new_xy(x, y, direction), direction, level + 1)
-      break
-    else:
-      x, y = new_xy(x, y, direction)
-
-
-def debug_print_grid(grid):
-  for row in grid:
-    for cell in row:
-      debug_print(cell[0], end='')
-    debug_print()
-  debug_print()
-
-
-def count_energized(grid, start_xy, direction):
-  update_grid(grid, start_xy, direction)
-  count = 0
-  for row in grid:
-    for cell in row:
-      count += 1 if cell[1] > 0 else 0
-  return count
-
-
-def part_1(file_path):
-  with open(file_path, 'r') as lines:
-    rows = (line.rstrip('\n') for line in lines)
-    grid = [[[c, 0, set()] for c in row] for row in rows]
-
-    debug_print_grid(grid)
-
-    count = count_energized(grid, (0, 0), 'E')
-    print(count)
-
-
-def part_2(file_path):
-  with open(file_path, 'r') as lines:
-    rows = (line.rstrip('\n') for line in lines)
-    grid = [[[c, 0, set()] for c in row] for row in rows]
-
-    max_count = 0
-    width = len(grid)
-    height = len(grid[0])
-
-    for x in range(width):
-      grid2 = deepcopy(grid)
-      count = count_energized(grid2, (x, 0), 'S')
-      debug_print(f'{x}, {0} {count}')
-      max_count = max(max_count, count)
-      grid2 = deepcopy(grid)
-      count = count_energized(grid2, (x, height - 1), 'N')
-      debug_print(f'{x}, {height - 1} {count}')
-      max_count = max(max_count, count)
-
-    for y in range(height):
-      grid2 = deepcopy(grid)
-      count = count_energized(grid2, (0, y), 'E')
-      debug_print(f'{0}, {y} {count}')
-      max_count = max(max_count, count)
-      grid2 = deepcopy(grid)
-      count = count_energized(grid2, (width - 1, y), 'W')
-      debug_print(f'{width - 1}, {y} {count}')
-      max_count = max(max_count, count)
-
-    print(max_count)
-
-
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
-
-part = sys.argv[1]
-file_path = sys.argv[2]
-
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+def step_beams(grid, start_x, start_y, direction):
+  width, height, cells = grid.width, grid.height, grid.cells
+  seen = bytearray(width * height)
+  beams = [(start_x, start_y, direction)]
+  while beams:
+    if __debug__ and instrument.enabled: instrument.counters['beams'] += 1
+    x, y, direction = beams.pop()
+    while 0 <= x < width and 0 <= y < height:
+      i = y * width + x
+      bit = 1 << direction
+      if seen[i] & bit:
+        break
+      seen[i] |= bit
+      c = cells[i]
+      if c == SPLIT_EW and direction in (N, S):
+        beams.append((x + 1, y, E))
+        direction = W
+      elif c == SPLIT_NS and direction in (E, W):
+        beams.append((x, y + 1, S))
+        direction = N
+      elif c == MIRROR_SLASH or c == MIRROR_BACKSLASH:
+        direction = new_direction[c][direction]
+      x, y = x + delta_x[direction], y + delta_y[direction]
+  return len(seen) - seen.count(0)
+
+
+def solve_by_steps(part, data):
+  grid = read_grid(data)
+  if part == 1:
+    return step_beams(grid, 0, 0, E)
+  return max(step_beams(grid, x, y, direction) for x, y, direction in edge_beams(grid))
+
+ENGINES = { 'steps' : solve_by_steps }
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
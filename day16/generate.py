@@ -0,0 +1,9 @@
+from aoc.generate import scaled_dims
+
+
+def generate(scale, rng):
+  width, height = scaled_dims(110, 110, scale)
+  lines = []
+  for _ in range(height):
+    lines.append(''.join(rng.choices('./\\|-', weights = (90, 3, 3, 2, 2), k = width)))
+  return '\n'.join(lines) + '\n'
@@ -1,182 +1,188 @@
+import os
 import sys
-import pprint
 import heapq
 
-
-debug_level = 1
-
-def debug(level = 1):
-  if level > debug_level: return False
-  return True
-
-def debug_print(s = '', level = 1, end = '\n'):
-  if level > debug_level: return
-  print(s, end=end)
-
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
-
-def debug_print_grid(grid, level = 1):
-  if level > debug_level: return
-  for row in grid:
-    print(''.join(row))
-  print()
-
-
-def update_grid_with_path(grid, path, end_key):
-  key = end_key
-  r, c, _ = key
-  while (r, c) != (0, 0):
-    prev_key = path[key]
-    prev_r, prev_c, _ = prev_key
-    if prev_r == r and prev_c < c:
-      marker = '>'
-    elif prev_r == r and prev_c > c:
-      marker = '<'
-    elif prev_r < r and prev_c == c:
-      marker = 'v'
-    elif prev_r > r and prev_c == c:
-      marker = '^'
-    else:
-      marker = '?'
-    grid[r][c] = marker
-    key = prev_key
-    r, c = prev_r, prev_c
-
-
-def get_next_cells_n(grid, start_r, start_c, state, extra_tests_fn):
-  in_direction, straight_count = state
-  num_rows = len(grid)
-  num_cols = len(grid[0])
-  next_cells = []
-  directions = [ 'N', 'E', 'S', 'W' ]
-  direction_deltas = { 'N' : (0, -1), 'E' : (1, 0), 'S' : (0, 1), 'W' : (-1, 0) }
-  for new_direction, direction in enumerate(directions):
-    dr, dc = direction_deltas[direction]
-    new_r, new_c = start_r + dr, start_c + dc
-    new_straight_count = (1 if new_direction != in_direction else straight_count + 1)
-    new_state = (new_direction, new_straight_count)
-    if (new_direction + 2) % 4 == in_direction:
-      continue  # Can't go back the same way we came in
-    if new_r < 0 or new_r >= num_rows or new_c < 0 or new_c >= num_cols:
-      continue  # out of bounds
-    if extra_tests_fn(state, new_state):
-      continue
-    next_cells.append((new_r, new_c, new_state))
-  return next_cells
-
-
-def extra_tests_1(state, new_state):
-  _, new_straight_count = new_state
-  return new_straight_count > 3  # Can only go straight a max of 3 times
-
-
-def get_next_cells_1(grid, start_r, start_c, state):
-  return get_next_cells_n(grid, start_r, start_c, state, extra_tests_1)
-
-
-def extra_tests_2(state, new_state):
-  in_direction, straight_count = state
-  new_direction, new_straight_count = new_state
-  if new_direction != in_direction and straight_count < 4:
-    return True
-  if new_straight_count > 10:
-    return True
-
-
-def get_next_cells_2(grid, start_r, start_c, state):
-  return get_next_cells_n(grid, start_r, start_c, state, extra_tests_2)
-
-
-def modified_dijkstra(grid, start_r, start_c, initial_state, get_next_cells_fn):
-  distances = {}
-  path = {}
-  key = (start_r, start_c, initial_state)
-  path[(start_r, start_c)] = (0, -1)
-  distances[key] = 0
-  min_heap = [(0, *key)]
-
-  while len(min_heap) > 0:
-    min_distance, min_r, min_c, state = heapq.heappop(min_heap)
-    for new_r, new_c, new_state in get_next_cells_fn(grid, min_r, min_c, state):
-      cell_value = int(grid[new_r][new_c])
-      distance = min_distance + cell_value
-      key = (new_r, new_c, new_state)
-      if key not in distances: distances[key] = float('inf')
-      if distance < distances[key]:
-        distances[key] = distance
-        path[key] = (min_r, min_c, state)
-        heapq.heappush(min_heap, (distance, *key))
-  return distances, path
-
-
-def part_n(file_path, initial_state, get_next_cells_fn, calc_answer_fn):
-  with open(file_path, 'r') as lines:
-    rows = (line.rstrip('\n') for line in lines)
-    grid = [[c for c in row] for row in rows]
-
-    debug_print_grid(grid)
-
-    distances, path = modified_dijkstra(grid, 0, 0, initial_state, get_next_cells_fn)
-    answer, end_key = calc_answer_fn(grid, distances)
-
-    if debug(): update_grid_with_path(grid, path, end_key)
-    debug_print('')
-    debug_print_grid(grid)
-
-    print(f'{answer=}')
-
-
-def calc_answer_n(grid, distances, extra_tests_fn):
-  num_rows, num_cols = len(grid), len(grid[0])
-
-  # Find the min heat loss ('distance') over all paths that finish in the bottom right cell and also meet other tests
-  answer = float('inf')
-  end_key = None
-  for k, v in distances.items():
-    row, col, state = k
-    if row == num_rows - 1 and col == num_cols - 1 and extra_tests_fn(state):
-      if v < answer:
-        end_key = k
-      answer = min(answer, v)
-  return (answer, end_key)
-
-
-def calc_answer_1(grid, distances):
-  # No additional tests for part 1
-  return calc_answer_n(grid, distances, lambda state: True)
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
+from aoc import search
+from aoc.iters import pairwise
+from aoc.grid import Grid
 
 
-def part_1(file_path):
-  # in_direction for the starting cell (top left) = East and initial straight_count = 0
-  initial_state = ('E', 0)
-  part_n(file_path, initial_state, get_next_cells_1, calc_answer_1)
-    
+ZERO = ord('0')
 
-def calc_answer_2(grid, distances):
-  # For part 2 the path must terminate in the final cell with a run of at least 4 straight moves
-  return calc_answer_n(grid, distances, lambda state: state[1] >= 4)
+#
+# A state is where a straight run of moves ends and which way it went, as cell index * 2 + axis.  After a run the
+# crucible has to turn, so the next runs from a state are along the other axis, min_run to max_run cells in either
+# direction, and cost the heat loss of the cells they enter.  That takes care of the limits on going straight without
+# the straight count being part of the state, and the search never has to turn back the way it came.
+#
+HORIZONTAL, VERTICAL = 0, 1
 
 
-def part_2(file_path):
-  # in_direction for the starting cell (top left) = East and initial straight_count = 0
-  initial_state = ('E', 0)
-  part_n(file_path, initial_state, get_next_cells_2, calc_answer_2)
+def make_neighbours(grid, min_run, max_run):
+  width, height = grid.width, grid.height
+  heat = [cell - ZERO for cell in grid.cells]
 
-
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
-
-part = sys.argv[1]
-file_path = sys.argv[2]
-
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  def neighbours(state):
+    i, axis = state >> 1, state & 1
+    if axis == VERTICAL:
+      x = i % width
+      next_axis, directions = HORIZONTAL, ((1, width - 1 - x), (-1, x))
+    else:
+      y = i // width
+      next_axis, directions = VERTICAL, ((width, height - 1 - y), (-width, y))
+    result = []
+    for delta, room in directions:
+      j, cost = i, 0
+      for run in range(1, min(max_run, room) + 1):
+        j += delta
+        cost += heat[j]
+        if run >= min_run:
+          result.append((j * 2 + next_axis, cost))
+    return result
+
+  return neighbours
+
+
+def mark_path(grid, states):
+  cells, width = grid.cells, grid.width
+  for state, next_state in pairwise(states):
+    i, j = state >> 1, next_state >> 1
+    if next_state & 1 == HORIZONTAL:
+      delta, marker = (1, '>') if j > i else (-1, '<')
+    else:
+      delta, marker = (width, 'v') if j > i else (-width, '^')
+    while i != j:
+      i += delta
+      cells[i] = ord(marker)
+
+
+def parse(data):
+  grid = Grid.from_text(data)
+  trace.grid(1, grid.lines())
+  return grid
+
+
+#
+# The least heat loss from the top left cell to the bottom right one.  We start there as if we'd just run either way,
+# so the first run can go either way too.  Each run costs at most 9 per cell, so Dial's bucket queue does instead of a
+# heap (see aoc.search), and the search stops as soon as it gets to the bottom right cell.  A* (with the distance to
+# the bottom right cell as the heuristic, since every cell costs at least 1) and plain Dijkstra get the same answers,
+# a bit slower, and are kept as ENGINES for aoc.check.
+#
+def part_n(grid, min_run, max_run, algorithm = 'dial'):
+  width, height = grid.width, grid.height
+  goal = width * height - 1
+  starts, neighbours, size = [HORIZONTAL, VERTICAL], make_neighbours(grid, min_run, max_run), (goal + 1) * 2
+  is_goal = lambda state: state >> 1 == goal
+  if algorithm == 'dial':
+    result = search.dial(starts, neighbours, size, 9 * max_run, is_goal)
+  elif algorithm == 'astar':
+    heuristic = lambda state: width - 1 - (state >> 1) % width + height - 1 - (state >> 1) // width
+    result = search.astar(starts, neighbours, size, is_goal, heuristic)
+  else:
+    result = search.dijkstra(starts, neighbours, size, is_goal)
+  trace.log(1, '%s', result)
+
+  if trace.enabled():
+    grid = grid.copy()  # Mark the path on a copy, the grid is shared by both parts
+    mark_path(grid, result.path())
+    trace.log(1, '')
+    trace.grid(1, grid.lines())
+  return result.cost
+
+
+#
+# The crucible can go straight for at most 3 cells
+#
+def part_1(grid):
+  return part_n(grid, 1, 3)
+
+
+#
+# The ultra crucible has to go straight for at least 4 cells, and at most 10, before turning or stopping
+#
+def part_2(grid):
+  return part_n(grid, 4, 10)
+
+
+RUNS = { 1 : (1, 3), 2 : (4, 10) }
+
+
+#
+# How we used to do it, kept as the reference for aoc.check, since the A* and Dijkstra engines share the states and
+# neighbours above: a heap of (heat loss, row, col, direction, straight count), a move of one cell at a time, and the
+# answer the least heat loss of the states in the bottom right cell that have gone straight for long enough to stop.
+# We start in the top left cell as if we'd come in going east and going south, with no straight moves yet, so the first
+# move can go either way.
+#
+DIRECTION_DELTAS = ((-1, 0), (0, 1), (1, 0), (0, -1))  # N, E, S, W as (row, col) deltas
+
+def solve_by_cells(part, data):
+  grid = [[int(c) for c in row] for row in reader.text(data).split()]
+  num_rows, num_cols = len(grid), len(grid[0])
+  min_run, max_run = RUNS[part]
+
+  def next_cells(r, c, direction, straight_count):
+    for new_direction, (dr, dc) in enumerate(DIRECTION_DELTAS):
+      if (new_direction + 2) % 4 == direction:
+        continue  # Can't go back the same way we came in
+      if new_direction != direction and straight_count < min_run:
+        continue  # Can't turn yet
+      new_straight_count = 1 if new_direction != direction else straight_count + 1
+      new_r, new_c = r + dr, c + dc
+      if new_straight_count <= max_run and 0 <= new_r < num_rows and 0 <= new_c < num_cols:
+        yield new_r, new_c, new_direction, new_straight_count
+
+  distances = { (0, 0, 1, 0) : 0, (0, 0, 2, 0) : 0 }
+  min_heap = [(0, *key) for key in distances]
+  while min_heap:
+    distance, *key = heapq.heappop(min_heap)
+    if distance > distances[tuple(key)]:
+      continue  # Already got here with less heat loss
+    for new_key in next_cells(*key):
+      new_distance = distance + grid[new_key[0]][new_key[1]]
+      if new_distance < distances.get(new_key, new_distance + 1):
+        distances[new_key] = new_distance
+        heapq.heappush(min_heap, (new_distance, *new_key))
+
+  return min(distance for (r, c, _, straight_count), distance in distances.items()
+             if r == num_rows - 1 and c == num_cols - 1 and straight_count >= min_run)
+
+ENGINES = {
+  'astar' : lambda part, data: part_n(parse(data), *RUNS[part], algorithm = 'astar'),
+  'dijkstra' : lambda part, data: part_n(parse(data), *RUNS[part], algorithm = 'dijkstra'),
+  'cells' : solve_by_cells
+}
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
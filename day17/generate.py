@@ -0,0 +1,9 @@
+from aoc.generate import scaled_dims
+
+
+def generate(scale, rng):
+  width, height = scaled_dims(141, 141, scale)
+  lines = []
+  for _ in range(height):
+    lines.append(''.join(rng.choices('123456789', k = width)))
+  return '\n'.join(lines) + '\n'
@@ -1,27 +1,11 @@
+import os
 import sys
-import pprint
 
-
-debug_level = 0
-
-def debug(level = 1):
-  if level > debug_level: return False
-  return True
-
-def debug_print(s = '', level = 1, end = '\n'):
-  if level > debug_level: return
-  print(s, end=end)
-
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
-
-def debug_print_grid(grid, level = 1):
-  if level > debug_level: return
-  for row in grid:
-    print(''.join(row))
-  print()
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
 
 
 class point_t:
@@ -108,55 +92,61 @@ def calc_perimeter(shape):
     start_point = edge.start_point
     end_point = edge.end_point
     length = abs(end_point.c - start_point.c if start_point.r == end_point.r else end_point.r - start_point.r)
-    debug_print(f'({start_point=}, {end_point=}, {length=}')
+    trace.log(1, '(start_point=%r, end_point=%r, length=%r', start_point, end_point, length)
     perimiter += length
   return perimiter
 
 
-def part_n(file_path, extract_dir_dist_fn):
-  with open(file_path, 'r') as lines:
-    rows = (line.rstrip('\n') for line in lines)
-    shape = shape_t()
-    r, c = 0, 0
-    for row in rows:
-      direction, distance = extract_dir_dist_fn(row)
-      r, c = process_instruction(r, c, direction, int(distance), shape)
-
-    debug_print()
-    debug_print(shape)
-
-    #
-    # The answer isn't just the area of the polygon because we also have to account for the thick, blocky edge.  We need
-    # to account for the extra space along the straight part of each edge, and also the space around the outside of what
-    # I am calling 'outer' vertexes and the space inside what I am calling 'inner' vertextes.  The extra space is shown
-    # as '* here ...
-    #
-    #  *****  **            ##
-    #  #####  *##           #*
-    #          #           
-    #  Edge   Outer vertex  Inner vertex
-    #
-    area = calc_area(shape)
-    perimeter = calc_perimeter(shape)
-    num_vertexes = len(shape.vertexes)
-    num_inner_vertexes = (num_vertexes - 4) / 2
-    num_outer_vertexes = num_vertexes - num_inner_vertexes
-    result = int(area + ((perimeter - num_vertexes) / 2) + (num_inner_vertexes / 4) + (num_outer_vertexes * 3 / 4))
-    debug_print(f'{area=}, {perimeter=}, {num_vertexes=}, {num_inner_vertexes=}, {num_outer_vertexes=}, {result=}')
-    print(result)
+#
+# Each row split into its direction, distance and color.  Which of those we use depends on the part.
+#
+def parse(data):
+  return [row.split(' ') for row in reader.text(data).splitlines()]
+
+
+def part_n(rows, extract_dir_dist_fn):
+  shape = shape_t()
+  r, c = 0, 0
+  for row in rows:
+    direction, distance = extract_dir_dist_fn(row)
+    r, c = process_instruction(r, c, direction, int(distance), shape)
+
+  trace.log(1, '')
+  trace.log(1, '%s', shape)
+
+  #
+  # The answer isn't just the area of the polygon because we also have to account for the thick, blocky edge.  We need
+  # to account for the extra space along the straight part of each edge, and also the space around the outside of what
+  # I am calling 'outer' vertexes and the space inside what I am calling 'inner' vertextes.  The extra space is shown
+  # as '* here ...
+  #
+  #  *****  **            ##
+  #  #####  *##           #*
+  #          #           
+  #  Edge   Outer vertex  Inner vertex
+  #
+  area = calc_area(shape)
+  perimeter = calc_perimeter(shape)
+  num_vertexes = len(shape.vertexes)
+  num_inner_vertexes = (num_vertexes - 4) / 2
+  num_outer_vertexes = num_vertexes - num_inner_vertexes
+  result = int(area + ((perimeter - num_vertexes) / 2) + (num_inner_vertexes / 4) + (num_outer_vertexes * 3 / 4))
+  trace.log(1, 'area=%r, perimeter=%r, num_vertexes=%r, num_inner_vertexes=%r, num_outer_vertexes=%r, result=%r',
+            area, perimeter, num_vertexes, num_inner_vertexes, num_outer_vertexes, result)
+  return result
 
 
 def extract_dir_dist_1(row):
-  direction, distance, _ = row.split(' ')
+  direction, distance, _ = row
   return direction, distance
 
 
-def part_1(file_path):
-  part_n(file_path, extract_dir_dist_1)
+def part_1(rows):
+  return part_n(rows, extract_dir_dist_1)
 
 
 def extract_dir_dist_2(row):
-  _, _, color = row.split(' ')
+  _, _, color = row
   distance_string = color[2:7]
   direction_index = int(color[7])
   distance = int(distance_string, 16)   # Interpret as hex
@@ -164,21 +154,33 @@ def extract_dir_dist_2(row):
   return direction, distance
 
 
-def part_2(file_path):
-  part_n(file_path, extract_dir_dist_2)
+def part_2(rows):
+  return part_n(rows, extract_dir_dist_2)
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
 
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
+  part = sys.argv[1]
+  file_path = sys.argv[2]
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
 
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,41 @@
+from aoc.generate import scaled
+
+
+#
+# Both the part 1 and part 2 trenches are 'skylines': up the left hand side, along the tops of a row of columns of
+# alternately high and low heights, down the right hand side and back along the bottom.  They have the same number of
+# columns so they have the same number of instructions and we can zip them together, the part 2 one being encoded in the
+# hex color.  Each of its distances, including the width along the bottom, has to fit in 5 hex digits.
+#
+MAX_HEX_DISTANCE = 0xfffff
+
+hex_directions = { 'R' : 0, 'D' : 1, 'L' : 2, 'U' : 3 }
+
+
+def skyline(rng, num_columns, max_width, max_height):
+  widths = [rng.randint(1, max_width) for _ in range(num_columns)]
+  heights = []
+  for n in range(num_columns):
+    if n % 2 == 0:
+      heights.append(rng.randint(max_height // 2 + 1, max_height))
+    else:
+      heights.append(rng.randint(1, max_height // 2))
+
+  instructions = [('U', heights[0]), ('R', widths[0])]
+  for n in range(1, num_columns):
+    change = heights[n] - heights[n - 1]
+    instructions.append(('U' if change > 0 else 'D', abs(change)))
+    instructions.append(('R', widths[n]))
+  instructions.append(('D', heights[-1]))
+  instructions.append(('L', sum(widths)))
+  return instructions
+
+
+def generate(scale, rng):
+  num_columns = scaled(350, scale)
+  small = skyline(rng, num_columns, 10, 300)
+  large = skyline(rng, num_columns, max(1, MAX_HEX_DISTANCE // num_columns), MAX_HEX_DISTANCE)
+  lines = []
+  for (direction, distance), (hex_direction, hex_distance) in zip(small, large):
+    lines.append(f'{direction} {distance} (#{hex_distance:05x}{hex_directions[hex_direction]})')
+  return '\n'.join(lines) + '\n'
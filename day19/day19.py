@@ -1,76 +1,56 @@
+import os
 import sys
-import pprint
-import re
-from math import prod
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
+from aoc import parsing
+from aoc import intervals
 
-debug_level = 0
 
-def debug(level = 1):
-  if level > debug_level: return False
-  return True
-
-def debug_print(s = '', level = 1, end = '\n'):
-  if level > debug_level: return
-  print(s, end=end)
-
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
-
-def debug_print_grid(grid, level = 1):
-  if level > debug_level: return
-  for row in grid:
-    print(''.join(row))
-  print()
+#
+# A workflow like 'px{a<2006:qkq,m>2090:A,rfg}', each of its rules either 'a<2006:qkq' or just 'rfg', and a part like
+# '{x=787,m=2655,a=1222,s=2876}'
+#
+WORKFLOW = parsing.Record(r'(\w+)\{([^{}]+)\}')
+RULE = parsing.Record(r'(?:(\w+)([<>])(\d+):)?(\w+)', None, None, int, None)
+PART = parsing.Record(r'\{([^{}]+)\}')
+RATING = parsing.Record(r'(\w+)=(\d+)', None, int)
 
 
 def read_workflows(rows):
   workflows_by_name = {}
   for row in rows:
-    if re.match(r'^\s*$', row): break
+    if not row.strip(): break
 
-    rule_match = re.match(r'^(\w+){([^{}]+)}$', row)
-    if not rule_match: continue
+    workflow_match = WORKFLOW.match(row)
+    if not workflow_match: continue
 
-    workflow_name, rules_string = rule_match.groups()
+    workflow_name, rules_string = workflow_match
     workflow = []
     workflows_by_name[workflow_name] = workflow
-    rule_strings = rules_string.split(',')
-    for rule_string in rule_strings:
-      match_no_filter = re.match(r'^(\w+)$', rule_string)
-      rule = { 'workflow_name' : workflow_name }
-      if match_no_filter:
-        action = match_no_filter.groups()[0]
-        rule['action'] = action
+    for property_name, op, value, action in RULE.findall(rules_string):
+      if property_name is None:
+        rule = { 'workflow_name' : workflow_name, 'action' : action }
       else:
-        match_filter = re.match(r'^(\w+)(<|>)(\d+):(\w+)$', rule_string)
-        if match_filter:
-          property_name, op, value, action = match_filter.groups()
-          rule['property_name'] = property_name
-          rule['op'] = op
-          rule['value'] = int(value)
-          rule['action'] = action
+        rule = { 'workflow_name' : workflow_name, 'property_name' : property_name, 'op' : op, 'value' : value,
+                 'action' : action }
       workflow.append(rule)
 
   return workflows_by_name
 
 
 def parse_part_string(part_string):
-  part = {}
-  match = re.match(r'{([^{}]+)}', part_string)
+  match = PART.match(part_string)
   if not match: return None
-  kv_list = match.groups()[0]
-  for kv in kv_list.split(','):
-    k, v = kv.split('=')
-    part[k] = int(v)
-  return part
+  return dict(RATING.findall(match[0]))
 
 
 def apply_workflow(part, workflow):
   for rule in workflow:
-    debug_print(f'  {rule}')
+    if __debug__ and trace.level >= 1: trace.log(1, '  %s', rule)
     if 'property_name' not in rule:
       return rule['action']
     property_name = rule['property_name']
@@ -79,11 +59,11 @@ def apply_workflow(part, workflow):
     action = rule['action']
     if op == '<':
       if part[property_name] < value:
-        debug_print(f'  return {action}')
+        if __debug__ and trace.level >= 1: trace.log(1, '  return %s', action)
         return action
     else: # op == '>'
       if part[property_name] > value:
-        debug_print(f'  return {action}')
+        if __debug__ and trace.level >= 1: trace.log(1, '  return %s', action)
         return action
 
 
@@ -95,123 +75,145 @@ def apply_workflows(part, workflow, workflows_by_name):
     workflow = workflows_by_name[result]
 
 
-def part_1(file_path):
-  with open(file_path, 'r') as lines:
-    rows = (line.rstrip('\n') for line in lines)
-    workflows_by_name = read_workflows(rows)
-    debug_pretty_print(workflows_by_name)
-
-    answer = 0
-    for part_string in rows:
-      part = parse_part_string(part_string)
-      debug_print(f'{part} ...')
-      result = apply_workflows(part, workflows_by_name['in'], workflows_by_name)
-      debug_print(f'... {result=}')
-      if result == 'A':
-        answer += sum(part.values())
-    print(answer)
+#
+# The workflows and the parts.  Part 2 only needs the workflows.
+#
+def parse(data):
+  rows = iter(reader.text(data).splitlines())
+  workflows_by_name = read_workflows(rows)
+  trace.pprint(1, workflows_by_name)
+  parts = [part for part in map(parse_part_string, rows) if part is not None]
+  return workflows_by_name, parts
+
+
+def part_1(parsed):
+  workflows_by_name, parts = parsed
+  answer = 0
+  for part in parts:
+    trace.log(1, '%s ...', part)
+    result = apply_workflows(part, workflows_by_name['in'], workflows_by_name)
+    trace.log(1, '... result=%r', result)
+    if result == 'A':
+      answer += sum(part.values())
+  return answer
 
 
-def possibly_append_filter(filters, rule):
-  if 'property_name' in rule:
-    return [*filters, make_filter(rule)]
-  return filters
+#
+# The ratings of the parts in a box of rating ranges, one axis per property
+#
+AXES = { 'x' : 0, 'm' : 1, 'a' : 2, 's' : 3 }
 
 
-def make_negated_filter(rule):
-  op = rule['op']
-  new_op = '<=' if op == '>' else '>='
-  return [ rule['property_name'], new_op, rule['value'] ]
+#
+# The number of parts in a box of ratings that end up accepted if they go to the named workflow (or straight to 'A' or
+# 'R').  Each rule splits the box in two along its property (see aoc.intervals.split_box), the parts that match go on
+# to the rule's action and the rest to the next rule.
+#
+def accepted_count(workflow_name, box, workflows_by_name, level = 0):
+  if __debug__ and trace.level >= 1: trace.log(1, '%*s%s %s', 2 * level, '', workflow_name, box)
+  if workflow_name == 'R':
+    return 0
+  if workflow_name == 'A':
+    return intervals.volume(box)
+  count = 0
+  for rule in workflows_by_name[workflow_name]:
+    if 'property_name' not in rule:
+      return count + accepted_count(rule['action'], box, workflows_by_name, level + 1)
+    axis = AXES[rule['property_name']]
+    if rule['op'] == '<':
+      matched, box = intervals.split_box(box, axis, rule['value'])
+    else: # op == '>'
+      box, matched = intervals.split_box(box, axis, rule['value'] + 1)
+    if matched:
+      count += accepted_count(rule['action'], matched, workflows_by_name, level + 1)
+    if not box:
+      return count
+  return count
 
 
-def make_filter(rule):
-  return [ rule['property_name'], rule['op'], rule['value'] ]
+#
+# Rather than listing the filters along every path that leads to 'A' and then working out the range of each property
+# that gets through them, we push the whole box of possible ratings, 1 to 4000 for each property, through the
+# workflows, splitting it at each rule.  The boxes that reach 'A' don't overlap, so we just add up their volumes.
+#
+def part_2(parsed):
+  workflows_by_name, _ = parsed
+  box = (intervals.closed(1, 4000),) * len(AXES)
+  return accepted_count('in', box, workflows_by_name)
 
 
 #
-# Find all the paths (lists of filters on properties) that result in the part being accepted
+# A plain version of the above, with its own parsing and the ratings as a dict of closed ranges, kept as the reference
+# for aoc.check.  Part 1 asks the same of each part as a range of one rating per property.
 #
-def good_workflow_paths(workflow_name, workflows_by_name, filters_so_far, good_paths, level = 0):
-  pad = '  ' * level
-  debug_print(f'{pad}good_workflow_paths, {workflow_name=}, {filters_so_far=}')
+def solve_by_ranges(part, data):
+  workflow_text, _, parts_text = reader.text(data).replace('\r', '').partition('\n\n')
+  workflows = {}
+  for line in workflow_text.split():
+    name, rules = line.rstrip('}').split('{')
+    workflows[name] = [rule.split(':') for rule in rules.split(',')]
+
+  def accepted(name, ranges):
+    if name == 'R':
+      return 0
+    if name == 'A':
+      count = 1
+      for lo, hi in ranges.values():
+        count *= hi - lo + 1
+      return count
+    count = 0
+    for rule in workflows[name]:
+      if len(rule) == 1:
+        return count + accepted(rule[0], ranges)
+      condition, target = rule
+      property_name, op, value = condition[0], condition[1], int(condition[2:])
+      lo, hi = ranges[property_name]
+      if op == '<':
+        matched, rest = (lo, min(hi, value - 1)), (max(lo, value), hi)
+      else:
+        matched, rest = (max(lo, value + 1), hi), (lo, min(hi, value))
+      if matched[0] <= matched[1]:
+        count += accepted(target, { **ranges, property_name : matched })
+      if rest[0] > rest[1]:
+        return count
+      ranges = { **ranges, property_name : rest }
+    return count
 
-  workflow = workflows_by_name[workflow_name]
-  for rule in workflow:
-    action = rule['action']
-    debug_print(f'{pad}{rule=}')
-    debug_print(f'{pad}{action=}')
-
-    if action in ('A', 'R'):
-      if action == 'A':
-        good_paths.append(possibly_append_filter(filters_so_far, rule))
-        debug_print(f'{pad}{good_paths=}')
-      if 'property_name' in rule:
-        filters_so_far.append(make_negated_filter(rule))
-      continue
-
-    new_filters_so_far = [*filters_so_far]
-    if 'property_name' in rule:
-      new_filters_so_far.append(make_filter(rule))
-
-    good_workflow_paths(action, workflows_by_name, new_filters_so_far, good_paths, level + 1)
-
-    if 'property_name' in rule:
-      filters_so_far.append(make_negated_filter(rule))
-
-
-def part_2(file_path):
-  with open(file_path, 'r') as lines:
-    rows = (line.rstrip('\n') for line in lines)
-    workflows_by_name = read_workflows(rows)
-    debug_pretty_print(workflows_by_name)
-    debug_print()
-
-    good_paths = []
-    good_workflow_paths('in', workflows_by_name, [], good_paths)
-    debug_pretty_print(good_paths)
-    debug_print()
-
-    #
-    # For each path (list of filters) that leads to a part being accepted, trim down the range of possible values for
-    # each property.  Then count all the possible combinations of property values (product of property ranges).
-    #
-    # Then add these up over all the paths.
-    #
-    num_combinations = 0
-    for good_path in good_paths:
-      property_ranges = { 'x' : [1, 4000], 'm' : [1, 4000], 'a' : [1, 4000], 's' : [1, 4000] }
-      for filter in good_path:
-        property_name, op, value = filter
-        property_range = property_ranges[property_name]
-        debug_print(f'{property_name} {op} {value}')
-        if op == '<':
-          property_range[1] = value - 1
-        elif op == '>':
-          property_range[0] = value + 1
-        elif op == '<=':
-          property_range[1] = value
-        else:  # '>='
-          property_range[0] = value
-      debug_pretty_print(property_ranges)
-
-      product = prod(map(lambda v: v[1] - v[0] + 1, property_ranges.values()))
-      debug_print(f'{product=}')
-      num_combinations += product
-
-    print(num_combinations)
-
-
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
-
-part = sys.argv[1]
-file_path = sys.argv[2]
-
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  if part == 2:
+    return accepted('in', { property_name : (1, 4000) for property_name in 'xmas' })
+  total = 0
+  for line in parts_text.split():
+    ratings = { rating[0] : int(rating[2:]) for rating in line.strip('{}').split(',') }
+    if accepted('in', { property_name : (value, value) for property_name, value in ratings.items() }):
+      total += sum(ratings.values())
+  return total
+
+ENGINES = { 'ranges' : solve_by_ranges }
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,62 @@
+import string
+
+from aoc.generate import scaled
+
+
+#
+# The workflows form a tree rooted at 'in', so every part ends up accepted or rejected.  Each rule sends a part either
+# straight to 'A' or 'R' or on to a new workflow, until we've made as many workflows as we want.  Every workflow gets
+# at least one new workflow below it while there are names left, so the tree can't die out early.
+#
+# Names are 2 or 3 lowercase letters, as in the real input, while there are plenty of those.  There are only 18,251 of
+# them, so for bigger counts we allow longer names, up to the length where there are at least twice as many as we need,
+# which also keeps the retries for names we already have down.  The names are kept in a dict rather than a set so they
+# come out in the order we made them, whatever the hash seed, and a seed gives the same input every time.
+#
+def make_names(rng, count):
+  longest = 3
+  while len(string.ascii_lowercase) ** longest < 2 * count:
+    longest += 1
+  names = {}
+  while len(names) < count:
+    name = ''.join(rng.choices(string.ascii_lowercase, k = rng.randint(2, longest)))
+    if name != 'in':
+      names[name] = None
+  return list(names)
+
+
+def make_rule(rng):
+  category = rng.choice('xmas')
+  op = rng.choice('<>')
+  return f'{category}{op}{rng.randint(2, 3999)}'
+
+
+def generate_workflows(rng, num_workflows):
+  names = ['in'] + make_names(rng, num_workflows - 1)
+  next_name = 1
+  workflows = []
+  for name in names:
+    targets = []
+    for _ in range(rng.randint(2, 4)):
+      if next_name < num_workflows and rng.random() < 0.6:
+        targets.append(names[next_name])
+        next_name += 1
+      else:
+        targets.append(rng.choice('AR'))
+    if next_name < num_workflows and all(target in 'AR' for target in targets):
+      targets[rng.randrange(len(targets))] = names[next_name]
+      next_name += 1
+    rules = [f'{make_rule(rng)}:{target}' for target in targets[:-1]]
+    workflows.append(f"{name}{{{','.join(rules + targets[-1:])}}}")
+  rng.shuffle(workflows)
+  return workflows
+
+
+def generate_part(rng):
+  return '{' + ','.join(f'{category}={rng.randint(1, 4000)}' for category in 'xmas') + '}'
+
+
+def generate(scale, rng):
+  workflows = generate_workflows(rng, scaled(550, scale))
+  parts = [generate_part(rng) for _ in range(scaled(200, scale))]
+  return '\n'.join(workflows) + '\n\n' + '\n'.join(parts) + '\n'
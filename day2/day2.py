@@ -1,128 +1,295 @@
-import sys
+import os
 import re
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from operator import add, mul
+
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
+from aoc import parsing
+from aoc import optional
 
 
 cubes = { 'red' : 12, 'blue' : 14, 'green' : 13 }
 
-debug = 0
+COLORS = ('red', 'green', 'blue')
 
-def debug_print(s):
-  if debug:
-    print(s)
 
+#
+# All either part ever asks of a game is the most cubes of each color shown at once, so that's all we keep.  The table
+# is a fixed record (id, max red, max green, max blue) per game, stored as a column of 64 bit ints per field, so the
+# parts are reductions over whole columns rather than walks over dicts of draws, and NumPy can take the columns as
+# they are.
+#
+class GameTable():
+  def __init__(self):
+    self.ids = array('q')
+    self.red = array('q')
+    self.green = array('q')
+    self.blue = array('q')
 
-def process_game_1(line):
-  def process_color(color_data):
-    pattern = r'^(\d+)\s+(\w+)$'
-    match = re.match(pattern, color_data)
-    if match:
-      color_count, color = match.groups()
-      color_count = int(color_count)
-      debug_print(f"COLOR: '{color_count}' '{color}'")
-      if color_count > cubes[color]:
-        return False
-      return True
+  def __len__(self):
+    return len(self.ids)
+
+  def __repr__(self):
+    return f'GameTable({len(self)} games)'
+
+  def append(self, game_number, red, green, blue):
+    self.ids.append(game_number)
+    self.red.append(red)
+    self.green.append(green)
+    self.blue.append(blue)
+
+  def columns(self):
+    return self.ids, self.red, self.green, self.blue
+
+  def records(self):
+    return list(zip(*self.columns()))
+
+
+#
+# Parse lines like 'Game 3: 8 green, 6 blue, 20 red; 5 blue, 4 red, 13 green' into a GameTable, one line at a time, so
+# the lines can come from a stream such as stdin as well as a whole input.  The draws don't matter, only the largest
+# count of each color, so one findall over the line gets every (count, color) and we keep the maxima.  Blank lines,
+# e.g. a trailing one, are skipped.
+#
+GAME = parsing.Record(r'Game (\d+):(.*)', int, None)
+CUBES = re.compile(r'(\d+) (red|green|blue)')
+
+def parse_lines(lines):
+  table = GameTable()
+  for line in lines:
+    line = line.strip()
+    if not line:
+      continue
+    game_number, game_data = GAME.parse(line)
+    maxima = dict.fromkeys(COLORS, 0)
+    for count, color in CUBES.findall(game_data):
+      count = int(count)
+      if count > maxima[color]:
+        maxima[color] = count
+    if __debug__ and trace.level >= 1: trace.log(1, 'GAME %s: %s', game_number, maxima)
+    table.append(game_number, maxima['red'], maxima['green'], maxima['blue'])
+  return table
+
+
+def parse(data):
+  return parse_lines(reader.text(data).splitlines())
+
+
+#
+# NumPy is optional, and takes about as long to import as the pure Python reductions take over a million games, so we
+# only look for it for tables at least that big
+#
+NUMPY_MIN_GAMES = 1 << 20
+
+def use_numpy(table):
+  return len(table) >= NUMPY_MIN_GAMES and optional.available('numpy')
+
+
+def numpy_columns(table):
+  import numpy as np
+  return [np.frombuffer(column, dtype = np.int64) for column in table.columns()]
+
+
+#
+# The sum of the ids of the games that were possible with a bag of red, green and blue cubes
+#
+def possible_game_id_sum(table, red, green, blue):
+  if use_numpy(table):
+    return numpy_possible_game_id_sum(table, red, green, blue)
+  return sum(game_number for game_number, r, g, b in zip(*table.columns()) if r <= red and g <= green and b <= blue)
+
+
+def numpy_possible_game_id_sum(table, red, green, blue):
+  ids, reds, greens, blues = numpy_columns(table)
+  return int(ids[(reds <= red) & (greens <= green) & (blues <= blue)].sum())
+
+
+#
+# The sum of the powers, the product of the maxima, of the games
+#
+def power_sum(table):
+  if use_numpy(table):
+    return numpy_power_sum(table)
+  return sum(map(mul, map(mul, table.red, table.green), table.blue))
+
+
+def numpy_power_sum(table):
+  _, reds, greens, blues = numpy_columns(table)
+  return int((reds * greens * blues).sum())
+
+
+#
+# For asking about many bags of cubes, not just the one in the puzzle.  possible_game_id_sum() is a 3-D dominance sum,
+# the ids of the games whose maxima are all within the bag, so we precompute all of them.  Only the distinct maxima of
+# each color matter, and there are few of them (a game rarely shows more than 20 cubes of a color), so we sort those
+# and keep a table of prefix sums over the ranks, where cell (i, j, k) is the sum of the ids of the games whose maxima
+# are among the i smallest reds, j smallest greens and k smallest blues.  A query is then a bisect per color and one
+# lookup, however many games there are.
+#
+# If the table would have more than max_cells cells we keep the distinct (red, green, blue) maxima instead, with the
+# sum of the ids of the games that have them, sorted by red, and a query bisects on red and adds up the points below.
+#
+MAX_CELLS = 1 << 22
+
+class GameIndex():
+  def __init__(self, table, max_cells = MAX_CELLS):
+    self.reds, self.greens, self.blues = (sorted(set(column)) for column in table.columns()[1:])
+    self.shape = (len(self.reds) + 1, len(self.greens) + 1, len(self.blues) + 1)
+    self.cells = self.points = None
+    if self.shape[0] * self.shape[1] * self.shape[2] <= max_cells:
+      self.cells = self.prefix_sums(table)
     else:
-      raise Exception(f"color_data does not match regex: '{color_data}'")
+      points = {}
+      for game_number, red, green, blue in zip(*table.columns()):
+        points[red, green, blue] = points.get((red, green, blue), 0) + game_number
+      self.points = sorted((*maxima, id_sum) for maxima, id_sum in points.items())
+      self.point_reds = [red for red, _, _, _ in self.points]
+
+  def __repr__(self):
+    if self.cells is None:
+      return f'GameIndex({len(self.points)} points)'
+    return f"GameIndex({'x'.join(map(str, self.shape))} cells)"
+
+  def prefix_sums(self, table):
+    _, rows, columns = self.shape
+    cells = array('q', bytes(8 * rows * columns * self.shape[0]))
+    rank_red, rank_green, rank_blue = ({ value : n + 1 for n, value in enumerate(values) }
+                                       for values in (self.reds, self.greens, self.blues))
+    for game_number, red, green, blue in zip(*table.columns()):
+      cells[(rank_red[red] * rows + rank_green[green]) * columns + rank_blue[blue]] += game_number
+    # Accumulate along blue, then green, then red, a whole row or plane at a time
+    for start in range(0, len(cells), columns):
+      cells[start:start + columns] = array('q', accumulate(cells[start:start + columns]))
+    plane = rows * columns
+    for start in range(0, len(cells), plane):
+      for row in range(start + columns, start + plane, columns):
+        cells[row:row + columns] = array('q', map(add, cells[row:row + columns], cells[row - columns:row]))
+    for start in range(plane, len(cells), plane):
+      cells[start:start + plane] = array('q', map(add, cells[start:start + plane], cells[start - plane:start]))
+    return cells
+
+  #
+  # The sum of the ids of the games that were possible with a bag of red, green and blue cubes
+  #
+  def possible_game_id_sum(self, red, green, blue):
+    if self.cells is None:
+      n = bisect_right(self.point_reds, red)
+      return sum(id_sum for _, g, b, id_sum in self.points[:n] if g <= green and b <= blue)
+    _, rows, columns = self.shape
+    i, j, k = bisect_right(self.reds, red), bisect_right(self.greens, green), bisect_right(self.blues, blue)
+    return self.cells[(i * rows + j) * columns + k]
+
+  #
+  # The same for each of an iterable of (red, green, blue) bags
+  #
+  def possible_game_id_sums(self, bags):
+    if self.cells is None:
+      return [self.possible_game_id_sum(red, green, blue) for red, green, blue in bags]
+    reds, greens, blues, cells = self.reds, self.greens, self.blues, self.cells
+    _, rows, columns = self.shape
+    return [cells[(bisect_right(reds, red) * rows + bisect_right(greens, green)) * columns + bisect_right(blues, blue)]
+            for red, green, blue in bags]
 
-  def process_draw(draw_data):
-    colors = re.split(r',\s*', draw_data)
-    debug_print('DRAW:')
-    for color in colors:
-      if not process_color(color):
-        return False
-    return True
 
-  def process_game_data(game_data):
-    draws = re.split(r';\s*', game_data)
-    for draw in draws:
-      if not process_draw(draw):
+def part_1(table):
+  return possible_game_id_sum(table, cubes['red'], cubes['green'], cubes['blue'])
+
+
+def part_2(table):
+  return power_sum(table)
+
+
+#
+# How we used to do it, every draw of every game as a dict of cube counts, kept as the reference for aoc.check
+#
+def parse_draws(line):
+  game_number, game_data = GAME.parse(line)
+  draws = []
+  for draw_data in game_data.split(';'):
+    cube_counts = {}
+    for color_data in draw_data.split(','):
+      color_count, color = color_data.split()
+      cube_counts[color] = int(color_count)
+    draws.append(cube_counts)
+  return game_number, draws
+
+
+def is_possible(draws):
+  for draw in draws:
+    for color, color_count in draw.items():
+      if color_count > cubes[color]:
         return False
-    return True
-
-  pattern = r'^Game (\d+):\s+(.+)\s*$'
-  match = re.match(pattern, line)
-  if match:
-    game_number, game_data = match.groups()
-    game_number = int(game_number)
-    debug_print(f'GAME {game_number}: {game_data}')
-    if process_game_data(game_data):
-      return game_number
-    return 0
-  else:
-    raise Exception(f'Line does not match regex: {line}')
-
-
-def process_game_2(line):
-  def process_color(color_data):
-    pattern = r'^(\d+)\s+(\w+)$'
-    match = re.match(pattern, color_data)
-    if match:
-      color_count, color = match.groups()
-      color_count = int(color_count)
-      debug_print(f"COLOR: '{color_count}' '{color}'")
-      return (color, color_count)
-    else:
-      raise Exception(f"color_data does not match regex: '{color_data}'")
-
-  def process_draw(draw_data):
-    colors = re.split(r',\s*', draw_data)
-    debug_print('DRAW:')
-    cube_counts = { }
-    for color in colors:
-      color, color_count = process_color(color)
-      cube_counts[color] = color_count
-    return cube_counts
-
-  def process_game_data(game_data):
-    draws = re.split(r';\s*', game_data)
-    cube_counts = { 'red' : 0, 'blue' : 0, 'green' : 0 }
-    for draw in draws:
-      draw_cube_counts = process_draw(draw)
-      for key, value in draw_cube_counts.items():
-        cube_counts[key] = max(cube_counts[key], value)
-    return cube_counts
-
-  pattern = r'^Game (\d+):\s+(.+)\s*$'
-  match = re.match(pattern, line)
-  if match:
-    game_number, game_data = match.groups()
-    game_number = int(game_number)
-    debug_print(f'GAME {game_number}: {game_data}')
-    cube_counts = process_game_data(game_data)
-    product = 1
-    for count in cube_counts.values():
-      product *= count
-    return product
-  else:
-    raise Exception(f'Line does not match regex: {line}')
-
-
-def part_n(process_line_fn, file_path):
-  with open(file_path, 'r') as file:
-    result = sum(map(process_line_fn, file))
-    print(result)
+  return True
+
+
+def power(draws):
+  cube_counts = { 'red' : 0, 'blue' : 0, 'green' : 0 }
+  for draw in draws:
+    for color, color_count in draw.items():
+      cube_counts[color] = max(cube_counts[color], color_count)
+  product = 1
+  for count in cube_counts.values():
+    product *= count
+  return product
+
+
+def solve_by_draws(part, data):
+  games = [parse_draws(line) for line in reader.text(data).splitlines()]
+  if part == 1:
+    return sum(game_number for game_number, draws in games if is_possible(draws))
+  return sum(power(draws) for _, draws in games)
+
 
+def solve_with_numpy(part, data):
+  if not optional.available('numpy'):
+    return NotImplemented
+  table = parse(data)
+  if part == 1:
+    return numpy_possible_game_id_sum(table, cubes['red'], cubes['green'], cubes['blue'])
+  return numpy_power_sum(table)
 
-def part_1(file_path):
-  part_n(process_game_1, file_path)
+def solve_with_index(part, data):
+  if part != 1:
+    return NotImplemented
+  return GameIndex(parse(data)).possible_game_id_sum(cubes['red'], cubes['green'], cubes['blue'])
 
+ENGINES = { 'draws' : solve_by_draws, 'numpy' : solve_with_numpy, 'index' : solve_with_index }
 
-def part_2(_file_path):
-  part_n(process_game_2, file_path)
 
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+def solve(part, data):
+  return solve_parsed(part, parse(data))
 
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path or - for stdin>')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  if file_path == '-':
+    print(solve_parsed(int(part), parse_lines(sys.stdin)))
+    exit(0)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,17 @@
+from aoc.generate import scaled
+
+
+colors = ('red', 'green', 'blue')
+
+
+def generate_draw(rng):
+  draw_colors = rng.sample(colors, rng.randint(1, 3))
+  return ', '.join(f'{rng.randint(1, 20)} {color}' for color in draw_colors)
+
+
+def generate(scale, rng):
+  lines = []
+  for game_number in range(1, scaled(100, scale) + 1):
+    draws = '; '.join(generate_draw(rng) for _ in range(rng.randint(1, 6)))
+    lines.append(f'Game {game_number}: {draws}')
+  return '\n'.join(lines) + '\n'
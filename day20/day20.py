@@ -1,56 +1,22 @@
+import os
 import sys
-import pprint
 import re
 from collections import deque
+from copy import deepcopy
 from enum import Enum
 from math import lcm
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import instrument
+from aoc import reader
+from aoc import cycles
 
-debug_level = 0
 
-def debug(level = 1):
-  if level > debug_level: return False
-  return True
-
-def debug_print(s = '', level = 1, end = '\n'):
-  if level > debug_level: return
-  print(s, end=end)
-
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
-
-def debug_print_grid(grid, level = 1):
-  if level > debug_level: return
-  for row in grid:
-    print(''.join(row))
-  print()
-
-
-def partition_impl(iterable, bucket_size, offset):
-  buckets = deque()
-  n = 0
-  for item in iterable:
-    if n % offset == 0:
-      buckets.append([])
-    for bucket in buckets:
-      bucket.append(item)
-    if len(buckets[0]) == bucket_size:
-      yield buckets.popleft()
-    n += 1
-  while len(buckets) > 0:
-    yield buckets.popleft()
-
-
-#
-# Partition a list into an iterable of sublists of a certain size with a specific offset.  The last list may be
-# incomplete.
-# Examples
-#   partition([1, 2, 3, 4, 5], 2, 1) -> [[1, 2], [2, 3], [3, 4], [4, 5], [5]]
-#
-def partition(iterable, bucket_size, offset):
-  return partition_impl(iterable, bucket_size, offset)
+MODULE_PATTERN = re.compile(r'^([%&]*)(\w+) -> (.*)$')
+OUTPUTS_SEPARATOR = re.compile(r',\s*')
 
 
 class Pulse(Enum):
@@ -85,13 +51,12 @@ class Module():
       self.input_module_names = []
       return
     
-    pattern = r'^([%&]*)(\w+) -> (.*)$'
-    match = re.match(pattern, row)
+    match = MODULE_PATTERN.match(row)
     if not match: raise 'Bad module pattern'
     type, name, output_module_names_string = match.groups()
 
     self.name = name
-    self.output_module_names = re.split(r',\s*', output_module_names_string)
+    self.output_module_names = OUTPUTS_SEPARATOR.split(output_module_names_string)
     self.type, self.state = make_module_type_and_state(type)
     self.input_module_names = []
 
@@ -105,31 +70,30 @@ class Module():
     return s
 
 
-def init_modules(file_path):
+def init_modules(data):
   modules = {}
-  with open(file_path, 'r') as lines:
-    rows = (line.rstrip('\n') for line in lines)
-    for row in rows:
-      module = Module(row)
-      modules[module.name] = module
-
-    modules_to_add = []
-    for k, v in modules.items():
-      for module_name in v.output_module_names:
-        if module_name not in modules:
-          modules_to_add.append(module_name)
-    for module_name in modules_to_add:
-      module = Module(None)
-      module.name = module_name
-      modules[module_name] = module
+  rows = data.splitlines()
+  for row in rows:
+    module = Module(row)
+    modules[module.name] = module
+
+  modules_to_add = []
+  for k, v in modules.items():
+    for module_name in v.output_module_names:
+      if module_name not in modules:
+        modules_to_add.append(module_name)
+  for module_name in modules_to_add:
+    module = Module(None)
+    module.name = module_name
+    modules[module_name] = module
     
-    for k, v in modules.items():
-      for module_name in v.output_module_names:
-        target_module = modules[module_name]
-        target_module.input_module_names.append(k)
-        if target_module.type == ModuleType.Conjunction:
-          target_module.state[k] = Pulse.Low
-    return modules
+  for k, v in modules.items():
+    for module_name in v.output_module_names:
+      target_module = modules[module_name]
+      target_module.input_module_names.append(k)
+      if target_module.type == ModuleType.Conjunction:
+        target_module.state[k] = Pulse.Low
+  return modules
 
 
 def process_conjunction_module(module, input_module, input_pulse):
@@ -171,6 +135,7 @@ def process_end_module(module, _, input_pulse):
 
 
 def process_pulse(module, input_module, input_pulse):
+  if __debug__ and instrument.enabled: instrument.counters['pulses'] += 1
   handlers = {
     ModuleType.FlipFlop : process_flip_flop_module,
     ModuleType.Conjunction : process_conjunction_module,
@@ -200,52 +165,95 @@ def process_modules_1(modules):
 
 
 #
-# Simulate a lot of button presses and watch a given list of module names to see when they get a low input.  Save all
-# the button press counts and then calc the (hopefully constant) cycle length for each module.  Then return each of
-# those cycle lengths.
+# The names of the modules whose pulses can reach the named module, directly or not, and the module itself
 #
-def process_modules_2(modules, module_names):
-  queue = deque()
-  result = {}
-  button_press_counts = {}
-  # Keep pressing the button ...
-  n = 1
-  while True:
-    queue.append(['broadcaster', 'button', Pulse.Low])
-    while queue:
-      module_name, input_module_name, input_pulse = queue.popleft()
-      if module_name in module_names and input_pulse == Pulse.Low:
-        if module_name not in button_press_counts: button_press_counts[module_name] = []
-        button_press_counts[module_name].append(n)
-        # Are we done?  Wait until we have at least 5 button count samples for each module and have verified that the
-        # cycle length for each module is constant.
-        if len(button_press_counts.keys()) == len(module_names):                 # Got a sample for all modules
-          if all(map(lambda x: len(button_press_counts[x]) >= 5, module_names)): # Got enough samples for all modules
-            for k, v in button_press_counts.items():
-              cycle_lengths = [x[1] - x[0] for x in partition(v, 2, 1) if len(x) == 2]
-              if len(set(cycle_lengths)) > 1:
-                raise(f'Non-constant cycle length for module {k}')
-              result[k] = cycle_lengths[0]
-            return result
+def upstream_modules(modules, name):
+  names = { name }
+  stack = [name]
+  while stack:
+    for input_module_name in modules[stack.pop()].input_module_names:
+      if input_module_name not in names:
+        names.add(input_module_name)
+        stack.append(input_module_name)
+  return names
 
-      module = modules[module_name]
-      input_module = modules[input_module_name] if input_module_name != 'button' else None
-      for output_module_name, output_pulse in process_pulse(module, input_module, input_pulse):
+
+#
+# The state of some of the modules as a tuple, so it can be compared and hashed: each flip-flop's state and the memory
+# of each conjunction
+#
+def fingerprint(modules, names):
+  result = []
+  for name in sorted(names):
+    module = modules[name]
+    if module.type == ModuleType.FlipFlop:
+      result.append(module.state.value)
+    elif module.type == ModuleType.Conjunction:
+      result.append(tuple(pulse.value for pulse in module.state.values()))
+  return tuple(result)
+
+
+#
+# Press the button once, only following the pulses to the named modules, and return whether the watched module got a
+# low pulse
+#
+def press_watching(modules, names, watched):
+  if __debug__ and instrument.enabled: instrument.counters['button_presses'] += 1
+  got_low = False
+  queue = deque()
+  queue.append(['broadcaster', 'button', Pulse.Low])
+  while queue:
+    module_name, input_module_name, input_pulse = queue.popleft()
+    if module_name == watched and input_pulse == Pulse.Low:
+      got_low = True
+    module = modules[module_name]
+    input_module = modules[input_module_name] if input_module_name != 'button' else None
+    for output_module_name, output_pulse in process_pulse(module, input_module, input_pulse):
+      if output_module_name in names:
         queue.append([output_module_name, module_name, output_pulse])
-    n += 1
+  return got_low
+
+
+#
+# The modules upstream of a watched module are a machine of their own, since nothing else can change them, so they must
+# get back to a state they've been in before (see aoc.cycles).  The state after n presses is the fingerprint of those
+# modules and whether the watched module got a low pulse during press n.  Returns the Cycle and the presses at which it
+# did.
+#
+def watch_cycle(modules, watched):
+  modules = deepcopy(modules)
+  names = upstream_modules(modules, watched)
+
+  def step(state):
+    got_low = press_watching(modules, names, watched)
+    return fingerprint(modules, names), got_low
+
+  cycle = cycles.find_cycle(step, (fingerprint(modules, names), False))
+  presses = [n for n, (_, got_low) in enumerate(cycle.states) if got_low]
+  trace.log(1, '%s: %d modules, %s, low at %s', watched, len(names), cycle, presses)
+  return cycle, presses
+
+
+#
+# The module graph, which is what we cache (see aoc.cache).  The simulations change the state of the modules so they
+# work on a copy of it.
+#
+def parse(data):
+  return init_modules(reader.text(data))
 
 
 #
 # Press the button 1000 times and measure how many low and high pulses we see.  This is just a simple simulation.
 #
-def part_1(file_path):
-  modules = init_modules(file_path)
+def part_1(modules):
+  modules = deepcopy(modules)
   total_low_count = total_high_count = 0
   for _ in range(1000):
     low_count, high_count = process_modules_1(modules)
     total_low_count += low_count
     total_high_count += high_count
-  print(f'{total_low_count=}, {total_high_count=}, product={total_low_count * total_high_count}')
+  trace.log(1, 'total_low_count=%r, total_high_count=%r', total_low_count, total_high_count)
+  return total_low_count * total_high_count
 
 
 #
@@ -266,32 +274,78 @@ def part_1(file_path):
 #               <-high- &sh <-low- &cn
 #               <-high- &mz <-low- &hz
 #
-# I am going to assume that each of the inputs to 'mf' ('bh', 'jf', 'sh' and 'mz') will receive a low pulse on a cycle
-# of fixed length.  If we can calculate those cycle lengths (number of button presses to get to a low input pulse) then
-# we can calculate the length of the cycle on which 'all' of the inputs will receive a low pulse at the same time as the
-# lowest common multiple (LCM) of the four input cycle lengths.
+# I used to assume that each of the inputs to 'mf' ('bh', 'jf', 'sh' and 'mz') receives a low pulse on a cycle of fixed
+# length, and that the answer was the lowest common multiple (LCM) of those lengths.  The assumption held, but rather
+# than rely on it we find the actual cycle of the sub-circuit feeding each of them (see watch_cycle) and the presses in
+# it at which it gets a low pulse, and then the first press at which they all do (see aoc.cycles.first_common_step).
+# For our input that's the LCM anyway.
+#
+def part_2(modules):
+  watched = modules[modules['rx'].input_module_names[0]].input_module_names
+  return cycles.first_common_step([watch_cycle(modules, name) for name in watched])
+
+
 #
-# BTW, the above assumption of constant cycle length was true.  How convenient.
+# How we used to do part 2, kept as the reference for aoc.check: press the button on the whole machine until each of the
+# watched modules has had a low pulse twice, and take the LCM of the presses to the first.  That's only right if each
+# gets a low pulse every so many presses from the start, as in our input and the generated ones, so we check the second
+# comes that many presses after the first.
 #
-def part_2(file_path):
-  modules = init_modules(file_path)
-  module_names = ['bh', 'jf', 'sh', 'mz']
-  result = process_modules_2(modules, module_names)
-  print(result)
-  print(lcm(*(result.values())))
-
-
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
-
-part = sys.argv[1]
-file_path = sys.argv[2]
-
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+def first_low_presses(modules, watched):
+  modules = deepcopy(modules)
+  presses = { name : [] for name in watched }
+  n = 0
+  while any(len(presses[name]) < 2 for name in watched):
+    n += 1
+    queue = deque()
+    queue.append(['broadcaster', 'button', Pulse.Low])
+    while queue:
+      module_name, input_module_name, input_pulse = queue.popleft()
+      if module_name in presses and input_pulse == Pulse.Low:
+        presses[module_name].append(n)
+      module = modules[module_name]
+      input_module = modules[input_module_name] if input_module_name != 'button' else None
+      for output_module_name, output_pulse in process_pulse(module, input_module, input_pulse):
+        queue.append([output_module_name, module_name, output_pulse])
+  for name, (first, second, *_) in presses.items():
+    if second != 2 * first:
+      raise ValueError(f'{name} gets a low pulse at presses {first} and {second}, not every {first}')
+  return [presses[name][0] for name in watched]
+
+
+def solve_by_lcm(part, data):
+  if part != 2:
+    return NotImplemented
+  modules = parse(data)
+  watched = modules[modules['rx'].input_module_names[0]].input_module_names
+  return lcm(*first_low_presses(modules, watched))
+
+ENGINES = { 'lcm' : solve_by_lcm }
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
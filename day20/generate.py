@@ -0,0 +1,74 @@
+import string
+from math import log2
+
+
+#
+# Like the real inputs, this is four binary counters built out of flip-flops.  The broadcaster feeds the lowest bit of
+# each counter and each bit feeds the next.  The bits that are set in the counter's target value feed a conjunction
+# module (the 'hub') which sends a low pulse once they are all high, i.e. once the counter reaches the target.  The hub
+# resets the counter by flipping the bits that aren't set in the target and the lowest bit, and it sends a low pulse to
+# an inverter.  The inverters all feed 'mf' which feeds 'rx'.
+#
+# Part 2 watches the inverters by name, so the hubs and inverters always have the same names as in our real input.  The
+# counter lengths are distinct primes with about 12 bits at scale 1, and each extra factor of 2 in the scale adds a bit.
+#
+hub_names = ['gh', 'xc', 'cn', 'hz']
+inverter_names = ['bh', 'jf', 'sh', 'mz']
+
+
+def is_prime(n):
+  if n < 2: return False
+  factor = 2
+  while factor * factor <= n:
+    if n % factor == 0: return False
+    factor += 1
+  return True
+
+
+def make_names(rng, count, reserved):
+  names = []
+  while len(names) < count:
+    name = ''.join(rng.choices(string.ascii_lowercase, k = 2))
+    if name not in reserved and name not in names:
+      names.append(name)
+  return names
+
+
+def generate_counter(target, bit_names, hub_name, inverter_name):
+  lines = []
+  num_bits = len(bit_names)
+  hub_outputs = []
+  for n, name in enumerate(bit_names):
+    outputs = []
+    if n + 1 < num_bits:
+      outputs.append(bit_names[n + 1])
+    if target >> n & 1:
+      outputs.append(hub_name)
+    if n == 0 or not target >> n & 1:
+      hub_outputs.append(name)
+    lines.append(f"%{name} -> {', '.join(outputs)}")
+  lines.append(f"&{hub_name} -> {', '.join(hub_outputs + [inverter_name])}")
+  lines.append(f'&{inverter_name} -> mf')
+  return lines
+
+
+def generate(scale, rng):
+  num_bits = max(4, 12 + round(log2(scale)))
+  targets = []
+  while len(targets) < 4:
+    n = rng.randrange(2 ** (num_bits - 1) + 1, 2 ** num_bits, 2)
+    if is_prime(n) and n not in targets:
+      targets.append(n)
+
+  reserved = set(hub_names + inverter_names + ['mf', 'rx'])
+  names = make_names(rng, 4 * num_bits, reserved)
+  lines = []
+  first_bits = []
+  for n, target in enumerate(targets):
+    bit_names = names[n * num_bits:(n + 1) * num_bits]
+    first_bits.append(bit_names[0])
+    lines += generate_counter(target, bit_names, hub_names[n], inverter_names[n])
+  lines.append(f"broadcaster -> {', '.join(first_bits)}")
+  lines.append(f"&mf -> rx")
+  rng.shuffle(lines)
+  return '\n'.join(lines) + '\n'
@@ -1,28 +1,14 @@
+import os
 import sys
-import pprint
-from collections import deque
+from bisect import insort
+from collections import deque, defaultdict
 
-
-debug_level = 0
-
-def debug(level = 1):
-  if level > debug_level: return False
-  return True
-
-def debug_print(s = '', level = 1, end = '\n'):
-  if level > debug_level: return
-  print(s, end=end)
-
-def debug_pretty_print(x, level = 1):
-  if level > debug_level: return
-  pp = pprint.PrettyPrinter(indent = 4)
-  pp.pprint(x)
-
-def debug_print_grid(grid, level = 1):
-  if level > debug_level: return
-  for row in grid:
-    print(''.join(row))
-  print()
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
+from aoc import intervals
 
 
 def init_empty_rows(bricks):
@@ -57,83 +43,46 @@ def y_projection(bricks):
 
 
 def print_projection(rows, label):
-  print(f' {label} ')
-  print('012')
+  trace.log(1, ' %s ', label)
+  trace.log(1, '012')
   for z in range(len(rows) - 1, -1, -1):
-    row = ''.join(rows[z])
-    print(f'{row} {z}')
+    trace.log(1, '%s %s', ''.join(rows[z]), z)
 
 
 def print_projections(bricks):
-  print('-----'  )
+  trace.log(1, '-----')
   print_projection(x_projection(bricks), 'x')
-  print()
+  trace.log(1, '')
   print_projection(y_projection(bricks), 'y')
-  print()
+  trace.log(1, '')
 
 
 #
-# Assume that x11 <= x12 and x21 <= x22
-#
-# No             Yes            Yes          Yes       Yes        Yes       Yes         Yes           No
-# x11 x12        x11 x12        x11 x12      x11 x12    x11 x12     x11 x12     x11 x12       x11 x12         x11 x12
-# v   v          v   v          v   v        v   v      v   v       v   v       v   v         v   v           v   v
-# xxxxx          xxxxx          xxxxx        xxxxx      xxxxx       xxxxx       xxxxx         xxxxx           xxxxx
-#       xxxxxxx      xxxxxxx       xxxxxxx   xxxxxxx   xxxxxxx    xxxxxxx   xxxxxxx     xxxxxxx       xxxxxxx
-#       ^     ^      ^     ^       ^     ^   ^     ^   ^     ^    ^     ^   ^     ^     ^     ^       ^     ^
-#       x21   x22    x21   x22     x21   x22 x21   x22 x21   x22  x21   x22 x21   x22  x21   x22     x21   x22
+# brick: [name, [x1, y1, z1], [x2, y2, z2]], the bottom-left and top-right corners, both inclusive.  Two bricks can only
+# rest on one another if their footprints in the x-y plane, which don't change as they fall, overlap.
 #
-# They overlap iff x12 >= x21 and x11 <= x22
-#
-def lines_overlap(x11, x12, x21, x22):
-  return x12 >= x21 and x11 <= x22
+def footprint(brick):
+  _, (x1, y1, _), (x2, y2, _) = brick
+  return intervals.closed(x1, x2), intervals.closed(y1, y2)
 
 
 #
-# brick:  [<bottom-left-coord>, <top-right-coord>]
-#
-# brick1: [[x11, y11, z11], [x12, y12, z12]]
-# brick2: [[x21, y21, z21], [x22, y22, z22]]
-#
-# Assume that x11 <= x12, y11 <= y12 and z11 <= z12
-# and that    x21 <= x22, y21 <= y22 and z21 <= z22
-#
-# In the x-y plane ...
-#
-#     xxxxx <- brick2
-#     x   x
-#     x   x xxxxx
-#     x   x x   x
-#     xxxxx x   x
-#           x   x
-#           xxxxx <- brick1
-#   
-#     xxxxx <- brick2
-#     x   x
-#   xxxxx x
-#   x x x x
-#   x xxxxx
-#   x   x
-#   xxxxx <- brick1
+# Drop the bricks, lowest first.  The bricks that have landed are kept in order of their tops, highest first, so the
+# first of them a falling brick's footprint overlaps is the one it lands on.
 #
-def bricks_overlap(brick1, brick2):
-  _, (x11, y11, _), (x12, y12, _) = brick1
-  _, (x21, y21, _), (x22, y22, _) = brick2
-  return lines_overlap(x11, x12, x21, x22) and lines_overlap(y11, y12, y21, y22)
-
-
 def fall(bricks):
+  landed = []   # (-top z, n)
+  footprints = [footprint(brick) for brick in bricks]
   for n, brick in enumerate(bricks):
     base_z = 0
-    if n > 0:
-      # Examine all the bricks that are lower than 'brick' ...
-      for lower_brick in bricks[:n]:
-        if bricks_overlap(brick, lower_brick):
-          # lower_brick's upper corner will be the floor
-          base_z = max(base_z, lower_brick[2][2])
+    for negative_top_z, m in landed:
+      if intervals.boxes_overlap(footprints[n], footprints[m]):
+        base_z = -negative_top_z
+        break
     fall_distance = brick[1][2] - (base_z + 1)
     brick[2][2] -= fall_distance
     brick[1][2] -= fall_distance
+    insort(landed, (-brick[2][2], n))
 
 
 def init_dict(bricks):
@@ -143,44 +92,50 @@ def init_dict(bricks):
 def calc_support_network(bricks):
   supports = init_dict(bricks)
   rests_on = init_dict(bricks)
+  footprints = [footprint(brick) for brick in bricks]
+  # A brick can only rest on the bricks whose tops are just below its bottom
+  bricks_by_bottom_z = defaultdict(list)
+  for brick_n, brick in enumerate(bricks):
+    bricks_by_bottom_z[brick[1][2]].append(brick_n)
   for brick_n, brick in enumerate(bricks):
-    for m, upper_brick in enumerate(bricks[(brick_n + 1)::]):
-      upper_brick_n = m + brick_n + 1
-      if bricks_overlap(upper_brick, brick):
-        z_offset = upper_brick[1][2] - brick[2][2]
-        if z_offset == 1:
-          rests_on[upper_brick_n].add(brick_n)
-          supports[brick_n].add(upper_brick_n)
+    for upper_brick_n in bricks_by_bottom_z[brick[2][2] + 1]:
+      if intervals.boxes_overlap(footprints[upper_brick_n], footprints[brick_n]):
+        rests_on[upper_brick_n].add(brick_n)
+        supports[brick_n].add(upper_brick_n)
   return supports, rests_on
 
 
-def init_bricks(file_path):
-  with open(file_path, 'r') as lines:
-    rows = (line.rstrip('\n') for line in lines)
-    bricks = []
-    for r, row in enumerate(rows):
-      name = chr(ord('A') + r) if r <= 6 else ''
-      brick = [name, *[[int(n) for n in coordinate.split(',')] for coordinate in row.split('~')]]
-      bricks.append(brick)
-    return bricks
+def init_bricks(data):
+  rows = data.splitlines()
+  bricks = []
+  for r, row in enumerate(rows):
+    name = chr(ord('A') + r) if r <= 6 else ''
+    brick = [name, *[[int(n) for n in coordinate.split(',')] for coordinate in row.split('~')]]
+    bricks.append(brick)
+  return bricks
 
 
-def part_n(file_path, fn):
-  bricks = init_bricks(file_path)
+#
+# Drop the bricks and work out which bricks support which.  This is the expensive bit, and both parts need the same
+# result, so it's what we cache (see aoc.cache).  Returns (bricks, supports, rests_on), which the part functions only
+# read.
+#
+def parse(data):
+  bricks = init_bricks(reader.text(data))
 
   # Sort so that the bricks are in increasing order of first corner z coordinate
   bricks.sort(key = lambda brick: brick[1][2])
   
-  if(debug(2)): print_projections(bricks)
+  if trace.enabled(2): print_projections(bricks)
   fall(bricks)
-  if(debug()): print_projections(bricks)
+  if trace.enabled(): print_projections(bricks)
 
   # Some of the bricks may have fallen past lower bricks so we need to sort again
   bricks.sort(key = lambda brick: brick[1][2])
 
   supports, rests_on = calc_support_network(bricks)
-  debug_print(f'{supports=}\n{rests_on=}')
-  fn(bricks, supports, rests_on)
+  trace.log(1, 'supports=%r\nrests_on=%r', supports, rests_on)
+  return bricks, supports, rests_on
 
 
 #
@@ -193,7 +148,7 @@ def part1_fn(bricks, supports, rests_on):
   for n in range(len(bricks)):
     if all(len(rests_on[m]) >= 2 for m in supports[n]):
       count += 1
-  print(f'result = {count}')
+  return count
 
 
 #
@@ -217,7 +172,7 @@ def part2_fn(bricks, supports, rests_on):
 
     count += len(falling) - 1               # Don't count the brick that disintegrated
 
-  print(f'result = {count}')
+  return count
 
 
 #
@@ -229,25 +184,71 @@ def part2_fn(bricks, supports, rests_on):
 #
 
 
-def part_1(file_path):
-  part_n(file_path, part1_fn)
+#
+# How we used to drop the bricks and find which support which, comparing every pair of bricks, kept as the reference for
+# aoc.check.  The corners are inclusive, so two footprints overlap iff each starts at or before the other ends on both
+# axes.
+#
+def footprints_overlap(brick1, brick2):
+  _, (x11, y11, _), (x12, y12, _) = brick1
+  _, (x21, y21, _), (x22, y22, _) = brick2
+  return x12 >= x21 and x11 <= x22 and y12 >= y21 and y11 <= y22
+
+
+def solve_pairwise(part, data):
+  bricks = sorted(init_bricks(reader.text(data)), key = lambda brick: brick[1][2])
+  for n, brick in enumerate(bricks):
+    base_z = max((lower_brick[2][2] for lower_brick in bricks[:n] if footprints_overlap(brick, lower_brick)),
+                 default = 0)
+    fall_distance = brick[1][2] - (base_z + 1)
+    brick[1][2] -= fall_distance
+    brick[2][2] -= fall_distance
+  bricks.sort(key = lambda brick: brick[1][2])
+
+  supports = init_dict(bricks)
+  rests_on = init_dict(bricks)
+  for brick_n, brick in enumerate(bricks):
+    for upper_brick_n in range(brick_n + 1, len(bricks)):
+      upper_brick = bricks[upper_brick_n]
+      if upper_brick[1][2] == brick[2][2] + 1 and footprints_overlap(upper_brick, brick):
+        rests_on[upper_brick_n].add(brick_n)
+        supports[brick_n].add(upper_brick_n)
+  return (part1_fn if part == 1 else part2_fn)(bricks, supports, rests_on)
+
+ENGINES = { 'pairwise' : solve_pairwise }
+
+
+def part_1(parsed):
+  return part1_fn(*parsed)
+
+
+def part_2(parsed):
+  return part2_fn(*parsed)
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
 
+def solve(part, data):
+  return solve_parsed(part, parse(data))
 
-def part_2(file_path):
-  part_n(file_path, part2_fn)
 
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
+  part = sys.argv[1]
+  file_path = sys.argv[2]
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
 
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,29 @@
+from aoc.generate import scaled
+
+
+#
+# Drop bricks one at a time onto a 10x10 footprint, keeping track of the height of the stack at each (x, y).  Each brick
+# starts a random distance above whatever is below it so the stack has somewhere to fall, and the lines are shuffled so
+# the solver can't rely on them being in order.  Brick lengths roughly follow our real input.
+#
+SIZE = 10
+
+
+def generate(scale, rng):
+  heights = [[0] * SIZE for _ in range(SIZE)]
+  lines = []
+  for _ in range(scaled(1400, scale)):
+    length = rng.choices((1, 2, 3, 4, 5), weights = (2, 25, 50, 22, 2))[0]
+    axis = rng.randrange(3)
+    x_length = length if axis == 0 else 1
+    y_length = length if axis == 1 else 1
+    z_length = length if axis == 2 else 1
+    x = rng.randrange(SIZE - x_length + 1)
+    y = rng.randrange(SIZE - y_length + 1)
+    cells = [(x + dx, y + dy) for dx in range(x_length) for dy in range(y_length)]
+    z = max(heights[cx][cy] for cx, cy in cells) + 1 + rng.randint(0, 2)
+    for cx, cy in cells:
+      heights[cx][cy] = z + z_length - 1
+    lines.append(f'{x},{y},{z}~{x + x_length - 1},{y + y_length - 1},{z + z_length - 1}')
+  rng.shuffle(lines)
+  return '\n'.join(lines) + '\n'
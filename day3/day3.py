@@ -1,41 +1,29 @@
+import os
 import sys
 import re
-from itertools import tee, islice
+from itertools import chain
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
+from aoc.iters import windows
 
-debug = 0
 
-def debug_print(s):
-  if debug:
-    print(s)
+NUMBER_PATTERN = re.compile(r'\d+')
+GEAR_PATTERN = re.compile(r'\*')
 
 
+#
+# Each line along with the lines either side of it, (lag_line, current_line, lead_line).  The first and last lines get a
+# blank line of '.' as their missing neighbour.
+#
 def generate_lines_window(lines):
-  iter_current, iter_lead, iter_lag = tee(enumerate(lines), 3)
-
-  while True:
-    try:
-      blank_line = ''
-      current_line_index, current_line = next(iter_current)
-      current_line = current_line.rstrip('\n')
-      if len(blank_line) == 0:
-        blank_line = '.' * len(current_line)
-
-      if current_line_index == 0:
-        lag_line = blank_line
-        _ = next(iter_lead)
-      else:
-        _, lag_line = next(iter_lag)
-        lag_line = lag_line.rstrip('\n')
-
-      _, lead_line = next(iter_lead)
-      lead_line = lead_line.rstrip('\n')
-
-      yield lag_line, current_line, lead_line
-
-    except StopIteration:
-      yield lag_line, current_line, blank_line
-      return
+  if not lines:
+    return iter(())
+  blank_line = '.' * len(lines[0])
+  return windows(chain([blank_line], lines, [blank_line]), 3)
 
 
 def check_line(line, start_index, end_index):
@@ -49,8 +37,7 @@ def check_line(line, start_index, end_index):
 
 def get_adjacent_numbers(line, start_index, end_index):
   numbers = []
-  pattern = r'\d+'
-  for match in re.finditer(pattern, line):
+  for match in NUMBER_PATTERN.finditer(line):
     number = int(match.group())
     number_start_index = match.start()
     number_end_index = match.end()
@@ -106,61 +93,76 @@ def get_gear_info(lag_line, current_line, lead_line, start_index, end_index):
   return (False, 0, 0)
 
 
-def part_1(file_path):
+#
+# Both parts look at each line along with its neighbours
+#
+def parse(data):
+  return list(generate_lines_window(reader.text(data).splitlines()))
+
+
+def part_1(windows):
   part_numbers = []
-  with open(file_path, 'r') as file:
-    for lag_line, current_line, lead_line in generate_lines_window(file):
-      debug_print('')
-      debug_print(lag_line)
-      debug_print(current_line)
-      debug_print(lead_line)
-      pattern = r'\d+'
-      for match in re.finditer(pattern, current_line):
-        number = match.group()
-        start_index = match.start()
-        end_index = match.end()
-        debug_print(f'{number} {start_index} {end_index}')
-        if is_part_number(lag_line, current_line, lead_line, start_index, end_index):
-          debug_print('Is part')
-          part_numbers.append(int(number))
+  for lag_line, current_line, lead_line in windows:
+    trace.log(1, '')
+    trace.log(1, '%s', lag_line)
+    trace.log(1, '%s', current_line)
+    trace.log(1, '%s', lead_line)
+    for match in NUMBER_PATTERN.finditer(current_line):
+      number = match.group()
+      start_index = match.start()
+      end_index = match.end()
+      if __debug__ and trace.level >= 1: trace.log(1, '%s %s %s', number, start_index, end_index)
+      if is_part_number(lag_line, current_line, lead_line, start_index, end_index):
+        if __debug__ and trace.level >= 1: trace.log(1, 'Is part')
+        part_numbers.append(int(number))
   result = sum(part_numbers)
-  debug_print('')
-  print(result)
+  trace.log(1, '')
+  return result
 
 
-def part_2(_file_path):
+def part_2(windows):
   gears = []
-  with open(file_path, 'r') as file:
-    for lag_line, current_line, lead_line in generate_lines_window(file):
-      debug_print('')
-      debug_print(lag_line)
-      debug_print(current_line)
-      debug_print(lead_line)
-      pattern = r'\*'
-      for match in re.finditer(pattern, current_line):
-        start_index = match.start()
-        end_index = match.end()
-        debug_print(f'* {start_index} {end_index}')
-        gear_info = get_gear_info(lag_line, current_line, lead_line, start_index, end_index)
-        if gear_info[0]:
-          debug_print('Is gear')
-          gears.append((gear_info[1], gear_info[2]))
-  debug_print(gears)
+  for lag_line, current_line, lead_line in windows:
+    trace.log(1, '')
+    trace.log(1, '%s', lag_line)
+    trace.log(1, '%s', current_line)
+    trace.log(1, '%s', lead_line)
+    for match in GEAR_PATTERN.finditer(current_line):
+      start_index = match.start()
+      end_index = match.end()
+      if __debug__ and trace.level >= 1: trace.log(1, '* %s %s', start_index, end_index)
+      gear_info = get_gear_info(lag_line, current_line, lead_line, start_index, end_index)
+      if gear_info[0]:
+        if __debug__ and trace.level >= 1: trace.log(1, 'Is gear')
+        gears.append((gear_info[1], gear_info[2]))
+  trace.log(1, '%s', gears)
   result = sum(map(lambda x: x[0] * x[1], gears))
-  print(result)
+  return result
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
 
+def solve(part, data):
+  return solve_parsed(part, parse(data))
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
 
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,31 @@
+from aoc.generate import scaled_dims
+
+
+symbols = '*#+$/@=%&-'
+
+
+#
+# An engine schematic of '.' with numbers of 1 to 3 digits and symbols scattered around.  Numbers are always followed by
+# something that isn't a digit so that neighbouring numbers don't run together.
+#
+def generate_row(rng, width):
+  row = []
+  while len(row) < width:
+    choice = rng.random()
+    if choice < 0.08:
+      number = str(rng.randint(1, 999))
+      if len(row) + len(number) + 1 > width:
+        row.append('.')
+        continue
+      row.extend(number)
+      row.append('.' if rng.random() < 0.8 else rng.choice(symbols))
+    elif choice < 0.12:
+      row.append(rng.choice(symbols))
+    else:
+      row.append('.')
+  return ''.join(row[:width])
+
+
+def generate(scale, rng):
+  width, height = scaled_dims(140, 140, scale)
+  return '\n'.join(generate_row(rng, width) for _ in range(height)) + '\n'
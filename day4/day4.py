@@ -1,43 +1,43 @@
+import os
 import sys
-import re
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
+from aoc import parsing
 
-debug = 0
-
-def debug_print(s):
-  if debug:
-    print(s)
 
+#
+# A line like 'Card   1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53' -> (1, {41, 48, 83, 86, 17}, [83, 86, 6, ...])
+#
+CARD = parsing.Record(r'Card\s+(\d+)\s*:([\d\s]+)\|([\d\s]+)', int, parsing.int_set, parsing.int_list)
 
 def parse_card_data(line):
-  bits = re.split(r'\s*:\s*', line)
-  card_number = re.split(r'\s+', bits[0])[1]
-  winning_numbers_string, numbers_string = re.split(r'\s*\|\s*', bits[1])
-  winning_numbers = set()
-  for n in re.split(r'\s+', winning_numbers_string):
-    winning_numbers.add(int(n))
-  numbers = list(map(lambda n: int(n), re.split(r'\s+', numbers_string)))
-  debug_print(winning_numbers)
-  debug_print(numbers)
-  return int(card_number), winning_numbers, numbers
-
-
-def part_1(file_path):  
-  with open(file_path, 'r') as lines:
-    points = 0
-    data = (parse_card_data(line.rstrip('\n')) for line in lines)
-    for card_number, winning_numbers, numbers in data:
-      my_winning_numbers = []
-      card_points = 0
-      for number in numbers:
-        if number in winning_numbers:
-          my_winning_numbers.append(number)
-      count = len(my_winning_numbers)
-      if count > 0:
-        card_points = pow(2, count - 1)
-      debug_print(f'For card {card_number}: My winning numbers = {my_winning_numbers}, points = {card_points}')
-      points += card_points
-    print(points)
+  card_number, winning_numbers, numbers = CARD.parse(line)
+  if __debug__ and trace.level >= 1: trace.log(1, '%s\n%s', winning_numbers, numbers)
+  return card_number, winning_numbers, numbers
+
+
+def parse(data):
+  return [parse_card_data(line) for line in reader.text(data).splitlines()]
+
+
+def part_1(cards):
+  points = 0
+  for card_number, winning_numbers, numbers in cards:
+    my_winning_numbers = []
+    card_points = 0
+    for number in numbers:
+      if number in winning_numbers:
+        my_winning_numbers.append(number)
+    count = len(my_winning_numbers)
+    if count > 0:
+      card_points = pow(2, count - 1)
+    trace.log(1, 'For card %s: My winning numbers = %s, points = %s', card_number, my_winning_numbers, card_points)
+    points += card_points
+  return points
 
 
 def process_card(card_number, winning_numbers, numbers):
@@ -48,32 +48,42 @@ def process_card(card_number, winning_numbers, numbers):
   return len(my_winning_numbers)
 
 
-def part_2(file_path):
-  with open(file_path, 'r') as lines:
-    winning_card_counts = {}
-    data = (parse_card_data(line.rstrip('\n')) for line in lines)
-    for card_number, winning_numbers, numbers in data:
-      count = winning_card_counts[card_number] = winning_card_counts.get(card_number, 0) + 1
-      for n in range(count):
-        winning_numbers_count = process_card(card_number, winning_numbers, numbers)
-        if winning_numbers_count > 0:
-          for n in range(card_number + 1, card_number + winning_numbers_count + 1):
-            winning_card_counts[n] = winning_card_counts.get(n, 0) + 1
-      debug_print(f'Card {card_number}: Count of this card = {winning_card_counts[card_number]}')
-    print(sum(winning_card_counts.values()))
-
-
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
-
-part = sys.argv[1]
-file_path = sys.argv[2]
-
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+def part_2(cards):
+  winning_card_counts = {}
+  for card_number, winning_numbers, numbers in cards:
+    count = winning_card_counts[card_number] = winning_card_counts.get(card_number, 0) + 1
+    for n in range(count):
+      winning_numbers_count = process_card(card_number, winning_numbers, numbers)
+      if winning_numbers_count > 0:
+        for n in range(card_number + 1, card_number + winning_numbers_count + 1):
+          winning_card_counts[n] = winning_card_counts.get(n, 0) + 1
+    trace.log(1, 'Card %s: Count of this card = %s', card_number, winning_card_counts[card_number])
+  return sum(winning_card_counts.values())
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,30 @@
+from aoc.generate import scaled
+
+
+#
+# Part 2 makes copies of the cards after each winning card, so with random numbers the copy counts grow exponentially.
+# We track the copy counts as we go and give a card no matches once its count gets above this.
+#
+MAX_COPIES = 100
+
+
+def format_numbers(numbers):
+  return ' '.join(f'{n:>2}' for n in numbers)
+
+
+def generate(scale, rng):
+  num_cards = scaled(190, scale)
+  copies = [1] * num_cards
+  lines = []
+  for n in range(num_cards):
+    max_matches = min(10, num_cards - n - 1)
+    matches = 0 if copies[n] > MAX_COPIES else rng.randint(0, max_matches)
+    for m in range(n + 1, n + matches + 1):
+      copies[m] += copies[n]
+
+    pool = rng.sample(range(1, 100), 35)
+    winning_numbers = pool[:10]
+    numbers = winning_numbers[:matches] + pool[10:10 + 25 - matches]
+    rng.shuffle(numbers)
+    lines.append(f'Card {n + 1:>3}: {format_numbers(winning_numbers)} | {format_numbers(numbers)}')
+  return '\n'.join(lines) + '\n'
@@ -0,0 +1,41 @@
+from aoc.generate import scaled
+
+
+things = ['seed', 'soil', 'fertilizer', 'water', 'light', 'temperature', 'humidity', 'location']
+
+MAX_VALUE = 4_294_967_296
+
+
+#
+# Cut [0, MAX_VALUE) into num_ranges blocks and map each block onto a shuffled, contiguous layout of the same blocks.
+# Leave some of the blocks out so that parts of the space fall through unmapped.
+#
+def generate_map(rng, num_ranges):
+  cuts = sorted(rng.sample(range(1, MAX_VALUE), num_ranges))
+  blocks = [(start, end - start) for start, end in zip([0] + cuts, cuts + [MAX_VALUE])]
+  dest_order = blocks[:]
+  rng.shuffle(dest_order)
+  dest_starts = {}
+  dest_start = 0
+  for block in dest_order:
+    dest_starts[block] = dest_start
+    dest_start += block[1]
+  lines = []
+  for block in blocks:
+    if rng.random() < 0.9:
+      source_start, length = block
+      lines.append(f'{dest_starts[block]} {source_start} {length}')
+  rng.shuffle(lines)
+  return lines
+
+
+def generate(scale, rng):
+  seeds = []
+  for _ in range(scaled(10, scale)):
+    start = rng.randrange(MAX_VALUE // 2)
+    seeds.extend([start, rng.randint(1, MAX_VALUE // 20)])
+  blocks = ['seeds: ' + ' '.join(map(str, seeds))]
+  for source, dest in zip(things, things[1:]):
+    lines = generate_map(rng, scaled(30, scale))
+    blocks.append('\n'.join([f'{source}-to-{dest} map:', *lines]))
+  return '\n\n'.join(blocks) + '\n'
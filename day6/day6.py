@@ -1,23 +1,14 @@
+import os
 import sys
 import re
-import pprint
 from functools import reduce
 from math import sqrt
 
-
-debug = 0
-
-def debug_print(s):
-  if debug:
-    print(s)
-
-#
-# Print a more readable version of our maps
-#
-def debug_pretty_print(x):
-  if debug:
-    pp = pprint.PrettyPrinter(indent=4)
-    pp.pprint(x)
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
 
 
 #
@@ -51,53 +42,68 @@ def process_race(race):
   mid_t = total_time / 2
   t1 = mid_t - delta
   t2 = mid_t + delta
-  debug_print(f't1 = {t1}, t2 = {t2}')
+  trace.log(1, 't1 = %s, t2 = %s', t1, t2)
 
   t1 = int(t1) + 1
   t2 = int(t2) - 1 if t2 % 10 == 0 else int(t2)
   count = t2 - t1 + 1
-  debug_print(f't1 = {t1}, t2 = {t2}, count = {count}')
+  trace.log(1, 't1 = %s, t2 = %s, count = %s', t1, t2, count)
   
   return count
 
 
 def parse_line(line):
-  _, s = re.split(r':\s*', line.rstrip('\n'))
+  _, s = re.split(r':\s*', line)
   return list(map(int, re.split(r'\s+', s)))
 
 
-def part_1(file_path):
-  with open(file_path, 'r') as lines:
-    times = parse_line(next(lines))
-    distances = parse_line(next(lines))
+def parse(data):
+  lines = iter(reader.text(data).splitlines())
+  times = parse_line(next(lines))
+  distances = parse_line(next(lines))
+  return times, distances
+
+
+def part_1(parsed):
+  times, distances = parsed
   races = list(zip(times, distances))
   counts = []
   for race in races:
     counts.append(process_race(race))
-  debug_print(counts)
-  print(reduce(lambda accumulator, x: accumulator * x, counts))
+  trace.log(1, '%s', counts)
+  return reduce(lambda accumulator, x: accumulator * x, counts)
 
 
-def part_2(file_path):
-  with open(file_path, 'r') as lines:
-    times = parse_line(next(lines))
-    distances = parse_line(next(lines))
+def part_2(parsed):
+  times, distances = parsed
   time = int(''.join(map(str, times)))
   distance = int(''.join(map(str, distances)))
-  print(process_race((time, distance)))
+  return process_race((time, distance))
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
 
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
+  part = sys.argv[1]
+  file_path = sys.argv[2]
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
 
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
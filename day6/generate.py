@@ -0,0 +1,22 @@
+#
+# Part 2 concatenates all the times and all the distances and then works in floating point, so more races doesn't make
+# for a bigger problem, it just overflows.  We cap the number of races and only let the scale pick how many up to that.
+#
+MAX_RACES = 8
+
+
+def generate(scale, rng):
+  num_races = min(MAX_RACES, max(1, round(4 * scale)))
+  times = []
+  distances = []
+  for _ in range(num_races):
+    time = rng.randint(40, 99)
+    # Keep distances to 3 digits so the concatenated part 2 record is always beatable
+    high = min(time * time // 4 - 1, 999)
+    low = min(high, time * time // 8)
+    times.append(time)
+    distances.append(rng.randint(low, high))
+  return (
+    'Time:     ' + ''.join(f'{t:>7}' for t in times) + '\n' +
+    'Distance: ' + ''.join(f'{d:>7}' for d in distances) + '\n'
+  )
@@ -1,22 +1,11 @@
+import os
 import sys
-import re
-import pprint
 from functools import cmp_to_key
 
-
-debug = 0
-
-def debug_print(s):
-  if debug:
-    print(s)
-
-#
-# Print a more readable version of our maps
-#
-def debug_pretty_print(x):
-  if debug:
-    pp = pprint.PrettyPrinter(indent=4)
-    pp.pprint(x)
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import reader
 
 
 card_values_1 = {
@@ -80,8 +69,8 @@ def calc_hand_type_2(card_counts):
   return calc_hand_type_1(card_counts_ex)
   
 
-def parse_line(line, calc_hand_type):
-  cards_string, bid = re.split(r'\s+', line)
+def parse_line(line):
+  cards_string, bid = line.split()
   bid = int(bid)
   cards = list(cards_string)
   card_counts = {}
@@ -89,8 +78,14 @@ def parse_line(line, calc_hand_type):
     n = card_counts.get(card, 0)
     n += 1
     card_counts[card] = n
-  type = calc_hand_type(card_counts)
-  return { 'cards' : cards, 'card_counts' : card_counts, 'type' : type, 'bid' : bid }
+  return { 'cards' : cards, 'card_counts' : card_counts, 'bid' : bid }
+
+
+#
+# The hands without their types, which depend on the part
+#
+def parse(data):
+  return [parse_line(line) for line in reader.text(data).splitlines()]
 
 
 def compare_hands(hand1, hand2, card_values):
@@ -115,35 +110,45 @@ def calc_winnings(tuple):
   return rank * hand['bid']
 
 
-def part_n(file_path, calc_hand_type, card_values):
-  with open(file_path, 'r') as lines:
-    lines = (line.rstrip('\n') for line in lines)
-    hands = (parse_line(line, calc_hand_type) for line in lines)
-    compare_hands_fn = lambda hand1, hand2 : compare_hands(hand1, hand2, card_values)
-    hands_ranked = enumerate(sorted(hands, key = cmp_to_key(compare_hands_fn)), 1)
-    products = map(calc_winnings, hands_ranked)
-    print(sum(products))
+def part_n(hands, calc_hand_type, card_values):
+  hands = ({ **hand, 'type' : calc_hand_type(hand['card_counts']) } for hand in hands)
+  compare_hands_fn = lambda hand1, hand2 : compare_hands(hand1, hand2, card_values)
+  hands_ranked = enumerate(sorted(hands, key = cmp_to_key(compare_hands_fn)), 1)
+  products = map(calc_winnings, hands_ranked)
+  return sum(products)
+
+
+def part_1(hands):
+  return part_n(hands, calc_hand_type_1, card_values_1)
+
+
+def part_2(hands):
+  return part_n(hands, calc_hand_type_2, card_values_2)
+
 
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
 
-def part_1(file_path):
-  part_n(file_path, calc_hand_type_1, card_values_1)
 
+def solve(part, data):
+  return solve_parsed(part, parse(data))
 
-def part_2(file_path):
-  part_n(file_path, calc_hand_type_2, card_values_2)
 
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
 
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
+  part = sys.argv[1]
+  file_path = sys.argv[2]
 
-part = sys.argv[1]
-file_path = sys.argv[2]
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
 
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
@@ -0,0 +1,12 @@
+from aoc.generate import scaled
+
+
+cards = '23456789TJQKA'
+
+
+def generate(scale, rng):
+  lines = []
+  for _ in range(scaled(1000, scale)):
+    hand = ''.join(rng.choice(cards) for _ in range(5))
+    lines.append(f'{hand} {rng.randint(1, 1000)}')
+  return '\n'.join(lines) + '\n'
@@ -1,47 +1,36 @@
+import os
 import sys
-import re
-import pprint
-from functools import cmp_to_key
 from math import lcm
 
+if __package__ in (None, ''):
+  # Running as a script from the day directory, so make the aoc package importable
+  sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoc import trace
+from aoc import reader
+from aoc import parsing
+from aoc import cycles
 
-debug_level = 1
 
-def debug_print(s, level):
-  if level <= debug_level:
-    print(s)
-
-#
-# Print a more readable version of our maps
-#
-def debug_pretty_print(x, level):
-  if level <= debug_level:
-    pp = pprint.PrettyPrinter(indent = 4)
-    pp.pprint(x)
+NODE = parsing.Record(r'^([0-9A-Z]{3})[ \t]+=[ \t]+\(([0-9A-Z]{3}),[ \t]+([0-9A-Z]{3})\)\r?$')
 
 
 #
-# Parse each line, build up the network and return the path, network and the names of all the xxA nodes (for part 2)
+# Parse the nodes, build up the network and return the path, network and the names of all the xxA nodes (for part 2).
+# The path is the first line and every node line after it is found in one pass over the text.
 #
-def init(file_path):
-  with open(file_path, 'r') as lines:
-    network = {}
-    a_nodes = []
-    lines = (line.rstrip('\n') for line in lines)
-    path = next(lines)
-    _ = next(lines)
-    pattern = r'^([0-9A-Z]{3})\s+=\s+\(([0-9A-Z]{3}),\s+([0-9A-Z]{3})\)$'
-    for line in lines:
-      result = re.search(pattern, line)
-      if result:
-        node_name, left, right = result.groups() 
-        network[node_name] = { 'L' : left, 'R' : right}
-        if node_name[2] == 'A': a_nodes.append(node_name)
-
-    debug_pretty_print(path, 2)
-    debug_pretty_print(network, 2)
-    debug_print(f'Node names ending in A: {a_nodes}', 2)
-    return (path, network, a_nodes)
+def parse(data):
+  path, _, nodes_text = reader.text(data).partition('\n')
+  path = path.rstrip()
+  network = {}
+  a_nodes = []
+  for node_name, left, right in NODE.findall(nodes_text):
+    network[node_name] = { 'L' : left, 'R' : right}
+    if node_name[2] == 'A': a_nodes.append(node_name)
+
+  trace.pprint(2, path)
+  trace.pprint(2, network)
+  trace.log(2, 'Node names ending in A: %s', a_nodes)
+  return (path, network, a_nodes)
 
 
 #
@@ -51,7 +40,7 @@ def init(file_path):
 def follow_path(network, path, start_node_name, is_end_node_fn):
   node_name = start_node_name
   node = network[node_name]
-  debug_print(f'start_node_name: {start_node_name}', 2)
+  trace.log(2, 'start_node_name: %s', start_node_name)
   done = False
   count = 0
   while not done:
@@ -59,59 +48,90 @@ def follow_path(network, path, start_node_name, is_end_node_fn):
       count += 1
       node_name = node[c]
       node = network[node_name]
-      debug_print(f'Step: {c} -> {node_name} : {node}', 3)
+      if __debug__ and trace.level >= 3: trace.log(3, 'Step: %s -> %s : %s', c, node_name, node)
       if is_end_node_fn(node_name):
         end_node_name = node_name
-        debug_print(f'({count}) end_node: {node_name} : {node}', 2)
+        if __debug__ and trace.level >= 2: trace.log(2, '(%s) end_node: %s : %s', count, node_name, node)
         done = True
         break
   return count, end_node_name
 
 
-def part_1(file_path):
-  path, network, _ = init(file_path)
+def part_1(parsed):
+  path, network, _ = parsed
   is_end_fn = lambda node_name: node_name == 'ZZZ'
   path_length, _ = follow_path(network, path, 'AAA', is_end_fn)
-  print(path_length)
+  return path_length
 
 
-def part_2(file_path):
-  path, network, a_nodes = init(file_path)
+#
+# Where a ghost is is the node it's on and how far along the path it is, so once it's back on the same node at the same
+# point of the path it goes round the same loop forever.  Returns the Cycle of (node, path index) states and the steps
+# at which the ghost is on an xxZ node.
+#
+def ghost_cycle(network, path, start_node_name):
+  path_length = len(path)
+
+  def step(state):
+    node_name, i = state
+    return network[node_name][path[i]], (i + 1) % path_length
+
+  cycle = cycles.find_cycle(step, (start_node_name, 0))
+  end_steps = [n for n, (node_name, _) in enumerate(cycle.states) if node_name[2] == 'Z']
+  trace.log(1, '%s: %s, ends at %s', start_node_name, cycle, end_steps)
+  return cycle, end_steps
+
+
+#
+# I noticed that the path length to get from an xxA node to an zzZ node is the same as to get from the xxZ node back to
+# an xxZ node, and the cycle from each xxZ node takes us back to the same xxZ node, so the answer was just the Lowest
+# Common Multiple of the cycle lengths.  But that's a property of our input rather than the puzzle, so find each ghost's
+# actual loop and the steps in it that are on an xxZ node, and then the first step at which they all are, with the
+# Chinese Remainder Theorem (see aoc.cycles.first_common_step).  For our input that comes to the LCM anyway.
+#
+def part_2(parsed):
+  path, network, a_nodes = parsed
+  return cycles.first_common_step([ghost_cycle(network, path, node) for node in a_nodes])
+
 
-  # For each node that ends with 'A' follow the path until we reach a node that ends with 'Z'
+#
+# How we used to do part 2, kept as the reference for aoc.check: the LCM of the steps from each xxA node to its first
+# xxZ node.  That's only right for inputs like ours (and the generated ones), where each ghost then loops back to the
+# same xxZ node in the same number of steps.
+#
+def solve_by_lcm(part, data):
+  if part != 2:
+    return NotImplemented
+  path, network, a_nodes = parse(data)
   is_end_fn = lambda node_name: node_name[2] == 'Z'
-  paths = {node : follow_path(network, path, node, is_end_fn) for node in a_nodes}
-
-  # For each node ending in 'Z' that we reached, follow the path again until we reach another node that ends with 'Z'
-  # and add that info to our existing paths object
-  for k, v in paths.items():
-    info = follow_path(network, path, v[1], is_end_fn)
-    paths[k] = ( v[0], { v[1] : info } )
-
-  # Now paths object contains the cycle length to get from xxA to xxZ and then around again to xxZ
-  debug_pretty_print(paths, 1)
-
-  #
-  # I notice that the path length to get from an xxA node to an zzZ node is the same as to get from the xxZ node back to
-  # an xxZ node, and in fact the cycle from each xxZ node takes us back to the same xxZ node in all cases as well.
-  # So, we have a number of cycles that we need to synchronize the end points of (the point when they get to an xxZ
-  # node).  This is just the Lowest Common Multiple of all the cycle lengths.  Math!
-  #
-  lengths = [v[0] for _, v in paths.items()]
-  print(lcm(*lengths))
-
-
-if len(sys.argv) != 3:
-  print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
-  exit(1)
-
-part = sys.argv[1]
-file_path = sys.argv[2]
-
-if part == '1':
-  part_1(file_path)
-elif part == '2':
-  part_2(file_path)
-else:
-  print('Unknown part')
-  exit(1)
+  return lcm(*(follow_path(network, path, node, is_end_fn)[0] for node in a_nodes))
+
+ENGINES = { 'lcm' : solve_by_lcm }
+
+
+def solve_parsed(part, parsed):
+  if part == 1:
+    return part_1(parsed)
+  if part == 2:
+    return part_2(parsed)
+  raise ValueError(f'Unknown part: {part}')
+
+
+def solve(part, data):
+  return solve_parsed(part, parse(data))
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    print(f'Usage: python3 {sys.argv[0]} <part> <file_path>')
+    exit(1)
+
+  part = sys.argv[1]
+  file_path = sys.argv[2]
+
+  if part not in ('1', '2'):
+    print('Unknown part')
+    exit(1)
+
+  with open(file_path, 'r') as file:
+    print(solve(int(part), file.read()))
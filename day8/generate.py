@@ -0,0 +1,61 @@
+from itertools import product
+
+
+name_chars = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+MAX_NODES = len(name_chars) ** 3
+
+
+def is_prime(n):
+  return n > 1 and all(n % d for d in range(2, int(n ** 0.5) + 1))
+
+
+def primes_near(n, count, rng):
+  primes = []
+  candidate = n
+  while len(primes) < count:
+    if is_prime(candidate) and candidate not in primes:
+      primes.append(candidate)
+    candidate += rng.randint(1, 6)
+  return primes
+
+
+#
+# Each ghost starts at an xxA node which leads into a ring of nodes that ends at an xxZ node and then loops around
+# again, so the xxA -> xxZ distance is the same as the xxZ -> xxZ distance (as in the real input).  Both the 'L' and the
+# 'R' of a ring node lead on to the next node in the ring.  Ring lengths are distinct primes so part 2 is the product of
+# them.  Filler nodes that no ghost ever visits make up the rest.  Node names are only 3 characters so the scale is
+# capped by the number of names we can make.
+#
+def generate(scale, rng):
+  num_ghosts = 6
+  ring_length = max(2, min(round(60 * scale), MAX_NODES // (num_ghosts + 2)))
+  ring_lengths = primes_near(ring_length, num_ghosts, rng)
+
+  names = [''.join(chars) for chars in product(name_chars, repeat = 3) if chars[2] not in 'AZ']
+  rng.shuffle(names)
+  names = iter(names)
+  prefixes = [''.join(chars) for chars in product(name_chars, repeat = 2) if chars not in (('A', 'A'), ('Z', 'Z'))]
+  prefixes = iter(rng.sample(prefixes, num_ghosts))
+
+  nodes = []
+  for ghost_n, length in enumerate(ring_lengths):
+    if ghost_n == 0:
+      start_name, end_name = 'AAA', 'ZZZ'
+    else:
+      prefix = next(prefixes)
+      start_name, end_name = prefix + 'A', prefix + 'Z'
+    ring = [next(names) for _ in range(length - 1)] + [end_name]
+    nodes.append((start_name, ring[0], ring[0]))
+    for n, node_name in enumerate(ring):
+      next_name = ring[(n + 1) % length]
+      nodes.append((node_name, next_name, next_name))
+
+  all_names = [node[0] for node in nodes]
+  for _ in range(ring_length):
+    name = next(names)
+    nodes.append((name, rng.choice(all_names), rng.choice(all_names)))
+
+  rng.shuffle(nodes)
+  path = ''.join(rng.choice('LR') for _ in range(rng.randint(250, 300)))
+  lines = [path, ''] + [f'{name} = ({left}, {right})' for name, left, right in nodes]
+  return '\n'.join(lines) + '\n'
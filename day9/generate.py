@@ -0,0 +1,15 @@
+from aoc.generate import scaled
+
+
+#
+# Each line is 21 values of a random polynomial, so repeated differences always get down to all zeros
+#
+def generate_line(rng):
+  degree = rng.randint(1, 10)
+  coefficients = [rng.randint(-3, 3) for _ in range(degree)] + [rng.choice((-1, 1)) * rng.randint(1, 3)]
+  values = [sum(c * x ** n for n, c in enumerate(coefficients)) for x in range(rng.randint(-10, 0), 21)][-21:]
+  return ' '.join(map(str, values))
+
+
+def generate(scale, rng):
+  return '\n'.join(generate_line(rng) for _ in range(scaled(200, scale))) + '\n'